@@ -0,0 +1,200 @@
+"""Latency/throughput benchmarks for the inference and enrichment hot paths.
+
+Payloads come from `demo.mock_data.build_payloads` and enrichment runs against a
+`demo.mock_data.synthetic_repo` history, both seeded, so two runs with the same
+arguments measure the same work. Results are printed (or written with `--output`)
+as JSON; pass an earlier result file to `--compare` to add per-benchmark ratios.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT / "src"
+for path in (ROOT, SRC_DIR):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+import httpx
+import numpy
+
+from demo.mock_data import build_payloads, synthetic_repo
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.enricher import AsyncContextEnricher, ContextEnricher
+from prob_pipeline.models import AssessmentRequest
+from prob_pipeline.persistence import BufferedOutcomeLogger, OutcomeLogger
+from prob_pipeline.router import LANE_TRIGGERS
+
+
+def _summary(samples: List[int]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    total = sum(ordered) / 1e9
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1e3
+
+    return {
+        "calls": len(ordered),
+        "total_seconds": total,
+        "ops_per_second": len(ordered) / total if total else 0.0,
+        "mean_us": statistics.fmean(ordered) / 1e3,
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "max_us": ordered[-1] / 1e3,
+    }
+
+
+def _measure(
+    fn: Callable[[Any], Any], items: Sequence, repeat: int, before_each: Optional[Callable[[], None]] = None
+) -> Dict[str, float]:
+    for item in items[: min(len(items), 32)]:
+        fn(item)
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            if before_each is not None:
+                before_each()
+            start = time.perf_counter_ns()
+            fn(item)
+            samples.append(time.perf_counter_ns() - start)
+    return _summary(samples)
+
+
+async def _measure_async(fn: Callable[[Any], Awaitable[Any]], items: Sequence, repeat: int) -> Dict[str, float]:
+    for item in items[: min(len(items), 32)]:
+        await fn(item)
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter_ns()
+            await fn(item)
+            samples.append(time.perf_counter_ns() - start)
+    return _summary(samples)
+
+
+async def _api_benchmark(repo: Path, payloads: List[dict], repeat: int, cached: bool = False) -> Dict[str, float]:
+    from prob_pipeline import api
+    from prob_pipeline.result_cache import ResultCache
+
+    api.async_enricher = AsyncContextEnricher(ContextEnricher(repo_path=repo))
+    # Uncached runs measure the full path; cached runs are all hits after the warmup pass.
+    api.result_cache = ResultCache(maxsize=len(payloads) if cached else 0)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def post(payload: dict) -> None:
+            response = await client.post("/assess", json=payload)
+            response.raise_for_status()
+
+        return await _measure_async(post, payloads, repeat)
+
+
+def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Dict[str, float]]:
+    payloads = build_payloads(args.payloads, seed=args.seed)
+    repo = synthetic_repo(workdir / "repo", commits=args.commits, authors=args.authors, seed=args.seed)
+    requests = [AssessmentRequest.from_payload(payload) for payload in payloads]
+    engine = RiskInferenceEngine()
+    responses = [engine.assess(request) for request in requests]
+    author_files = [
+        (payload["request"]["author"]["id"], payload["request"]["change_metadata"]["files_modified"])
+        for payload in payloads
+    ]
+    enricher = ContextEnricher(repo_path=repo)
+    porcelain = ContextEnricher(repo_path=repo, index=False)
+
+    results = {
+        "AssessmentRequest.from_payload": _measure(AssessmentRequest.from_payload, payloads, args.repeat),
+        "RiskInferenceEngine.assess": _measure(engine.assess, requests, args.repeat),
+        "ContextEnricher.derive_author_scores[cold]": _measure(
+            lambda item: enricher.derive_author_scores(*item), author_files, args.repeat, enricher.cache.clear
+        ),
+        "ContextEnricher.derive_author_scores[warm]": _measure(
+            lambda item: enricher.derive_author_scores(*item), author_files, args.repeat
+        ),
+        "ContextEnricher.derive_author_scores[porcelain]": _measure(
+            lambda item: porcelain.derive_author_scores(*item),
+            author_files[: args.porcelain_sample],
+            1,
+            porcelain.cache.clear,
+        ),
+    }
+    logger = OutcomeLogger(workdir / "outcomes.jsonl")
+    results["OutcomeLogger.log"] = _measure(
+        lambda response: logger.log(response, LANE_TRIGGERS[response.assigned_lane]), responses, args.repeat
+    )
+    with BufferedOutcomeLogger(workdir / "buffered.jsonl") as buffered:
+        results["BufferedOutcomeLogger.log"] = _measure(
+            lambda response: buffered.log(response, LANE_TRIGGERS[response.assigned_lane]), responses, args.repeat
+        )
+    if not args.skip_api:
+        results["POST /assess"] = asyncio.run(_api_benchmark(repo, payloads, args.repeat))
+        results["POST /assess[cached]"] = asyncio.run(_api_benchmark(repo, payloads, args.repeat, cached=True))
+    return results
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline_path: Path) -> Dict[str, Dict[str, float]]:
+    baseline = json.loads(baseline_path.read_text())["results"]
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous and previous["p50_us"] and previous["ops_per_second"]:
+            comparison[name] = {
+                "p50_ratio": current["p50_us"] / previous["p50_us"],
+                "throughput_ratio": current["ops_per_second"] / previous["ops_per_second"],
+            }
+    return comparison
+
+
+def _revision() -> Optional[str]:
+    result = subprocess.run(["git", "-C", str(ROOT), "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=1000, help="Synthetic payloads per pass")
+    parser.add_argument("--commits", type=int, default=2000, help="Commits in the synthetic repo")
+    parser.add_argument("--authors", type=int, default=20, help="Distinct authors in the synthetic repo")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the payloads")
+    parser.add_argument("--porcelain-sample", type=int, default=50, help="Payloads timed on the git-subprocess path")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for payloads and repo history")
+    parser.add_argument("--skip-api", action="store_true", help="Skip the end-to-end /assess benchmark")
+    parser.add_argument("--output", type=Path, help="Write results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compute ratios against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args, Path(workdir))
+    report = {
+        "meta": {
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy.__version__,
+            "params": {
+                key: getattr(args, key)
+                for key in ("payloads", "commits", "authors", "repeat", "porcelain_sample", "seed")
+            },
+        },
+        "results": results,
+    }
+    if args.compare:
+        report["comparison"] = _compare(results, args.compare)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measure the per-invocation startup cost that `prob_pipeline.worker` removes.
+
+Compares one `python -m prob_pipeline.cli` / `prob_pipeline.router` process per item
+with a single warm worker handling the same items, and prints the timings as JSON.
+Runs in a scratch directory so the outcome logs it writes are discarded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
+
+from prob_pipeline.worker import WorkerClient
+
+PAYLOAD = ROOT / "demo" / "sample_payload_medium.json"
+
+
+def _per_process(module: str, path: Path, count: int, cwd: str, env: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run([sys.executable, "-m", module, str(path)], cwd=cwd, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def _worker(count: int, payload: dict, cwd: str, env: dict) -> dict:
+    start = time.perf_counter()
+    client = WorkerClient.spawn(env=env, cwd=cwd)
+    client.request("ping")
+    ready = time.perf_counter() - start
+    for _ in range(count):
+        response = client.assess(payload)
+        client.route(response)
+    client.close()
+    return {"startup_seconds": ready, "total_seconds": time.perf_counter() - start}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20, help="Items to assess and route")
+    args = parser.parse_args()
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    payload = json.loads(PAYLOAD.read_text())
+    with tempfile.TemporaryDirectory() as cwd:
+        response_path = Path(cwd) / "response.json"
+        with WorkerClient.spawn(env=env, cwd=cwd) as client:
+            response_path.write_text(json.dumps(client.assess(payload)))
+        cli_seconds = _per_process("prob_pipeline.cli", PAYLOAD, args.count, cwd, env)
+        router_seconds = _per_process("prob_pipeline.router", response_path, args.count, cwd, env)
+        worker = _worker(args.count, payload, cwd, env)
+
+    per_process = cli_seconds + router_seconds
+    print(
+        json.dumps(
+            {
+                "count": args.count,
+                "per_process_seconds": {"cli": cli_seconds, "router": router_seconds, "total": per_process},
+                "worker_seconds": worker,
+                "per_item_ms": {
+                    "per_process": per_process / args.count * 1000,
+                    "worker": worker["total_seconds"] / args.count * 1000,
+                },
+                "speedup": per_process / worker["total_seconds"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
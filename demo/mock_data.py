@@ -1,69 +1,307 @@
-"""Generate synthetic payloads for the Probabilistic Pipeline."""
+"""Generate synthetic payloads for the Probabilistic Pipeline.
+
+By default a handful of pretty-printed payload files are written to `demo/synthetic/`.
+For load and backtest corpora, `--ndjson PATH` (or `-` for stdout) streams one compact
+payload per line instead, gzip-compressed when PATH ends in `.gz` or `--compress` is
+given. Generation runs on `--workers` processes, and `--shard K/N` emits only the Kth
+of N slices so separate machines can split a corpus.
+
+Payloads are generated in blocks of `BLOCK_SIZE`, each from its own RNG seeded by
+`(seed, block)`. The corpus for a given seed is therefore identical however it is
+split across workers or shards, and concatenating the N shard outputs in order gives
+the unsharded file. Compressed chunks are independent gzip members, so workers
+compress in parallel and the concatenation is still a valid `.gz` file.
+
+`--distributions FILE` reads a JSON object of `Distributions` fields (churn ranges
+and shape, file counts, hotspot rate, health weights, author count and skew, ...).
+`--repo PATH` also builds a git history for the same authors and files with
+`synthetic_repo`, for enrichment benchmarks.
+"""
 import argparse
+import gzip
+import itertools
 import json
+import math
+import multiprocessing
 import random
-import uuid
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, fields
 from pathlib import Path
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
 
 STATUS_CHOICES = ["healthy", "degraded", "critical"]
 CRITICAL_FILES = ["src/critical/auth.py", "src/critical/data.py", "src/critical/cache.py"]
 MODULES = ["payment", "shipping", "user", "auth", "analytics"]
 OUTPUT_DIR = Path(__file__).parent / "synthetic"
+BLOCK_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class Distributions:
+    lines_added: Tuple[int, int] = (5, 300)
+    lines_removed: Tuple[int, int] = (0, 120)
+    # "uniform" draws line counts evenly from the ranges above; "lognormal" draws a
+    # heavy tail around the ranges' geometric midpoints, clipped to the ranges.
+    churn: str = "uniform"
+    churn_sigma: float = 1.0
+    complexity: Tuple[float, float] = (0.0, 3.5)
+    files: Tuple[int, int] = (1, 4)
+    # Share of touched files drawn from CRITICAL_FILES; the rest come from one module.
+    hotspot_rate: float = 0.75
+    modules: Tuple[str, ...] = tuple(MODULES)
+    files_per_module: int = 1
+    health_weights: Tuple[float, float, float] = (0.6, 0.3, 0.1)
+    max_incidents: int = 5
+    authors: int = 20
+    # Zipf exponent over `synthetic-1..authors`; 0 picks authors uniformly.
+    author_skew: float = 0.0
+    familiarity: Tuple[float, float] = (0.25, 0.95)
+    success_rate: Tuple[float, float] = (0.2, 0.98)
+    security_pass_rate: float = 2 / 3
+
+    @classmethod
+    def from_json(cls, path: Path) -> "Distributions":
+        config = json.loads(Path(path).read_text())
+        known = {field.name for field in fields(cls)}
+        unknown = set(config) - known
+        if unknown:
+            raise ValueError(f"Unknown distribution fields: {', '.join(sorted(unknown))}")
+        return cls(**{key: tuple(value) if isinstance(value, list) else value for key, value in config.items()})
+
+    def module_files(self, module: str) -> List[str]:
+        return [f"src/{module}/module.py"] + [f"src/{module}/module_{n}.py" for n in range(1, self.files_per_module)]
+
+    def all_files(self) -> List[str]:
+        return CRITICAL_FILES + [path for module in self.modules for path in self.module_files(module)]
 
+    def author_weights(self) -> Optional[List[float]]:
+        if not self.author_skew:
+            return None
+        return [1 / rank**self.author_skew for rank in range(1, self.authors + 1)]
 
-def _random_change() -> dict:
-    files = random.choices(CRITICAL_FILES + [f"src/{random.choice(MODULES)}/module.py"], k=random.randint(1, 4))
-    return {
-        "lines_added": random.randint(5, 300),
-        "lines_removed": random.randint(0, 120),
-        "files_modified": files,
-        "cyclomatic_complexity_delta": round(random.uniform(0.0, 3.5), 2),
-    }
-
-
-def _random_health() -> dict:
-    status = random.choices(STATUS_CHOICES, weights=[0.6, 0.3, 0.1])[0]
-    return {
-        "status": status,
-        "open_incidents": random.randint(0, 5 if status != "healthy" else 0),
-    }
-
-
-def _payload_template(index: int) -> dict:
-    return {
-        "request": {
-            "commit_id": f"mock-{index}-{uuid.uuid4().hex[:6]}",
-            "author": {
-                "id": f"synthetic-{random.randint(1, 20)}",
-                "domain_familiarity_score": round(random.uniform(0.25, 0.95), 2),
-                "past_success_rate": round(random.uniform(0.2, 0.98), 2),
+
+DEFAULT_DISTRIBUTIONS = Distributions()
+
+
+class _Sampler:
+    def __init__(self, rng: random.Random, distributions: Distributions):
+        self.rng = rng
+        self.dist = distributions
+        self.author_ids = [f"synthetic-{n}" for n in range(1, distributions.authors + 1)]
+        self.author_weights = list(itertools.accumulate(distributions.author_weights() or [])) or None
+        self.module_files = {module: distributions.module_files(module) for module in distributions.modules}
+
+    def author(self) -> str:
+        return self.rng.choices(self.author_ids, cum_weights=self.author_weights)[0]
+
+    def lines(self, bounds: Tuple[int, int]) -> int:
+        low, high = bounds
+        if self.dist.churn == "lognormal":
+            median = math.sqrt(max(low, 1) * max(high, 1))
+            return min(high, max(low, int(self.rng.lognormvariate(math.log(median), self.dist.churn_sigma))))
+        return self.rng.randint(low, high)
+
+    def payload(self, index: int) -> dict:
+        rng, dist = self.rng, self.dist
+        module_files = self.module_files[rng.choice(dist.modules)]
+        files = [
+            rng.choice(CRITICAL_FILES) if rng.random() < dist.hotspot_rate else rng.choice(module_files)
+            for _ in range(rng.randint(*dist.files))
+        ]
+        status = rng.choices(STATUS_CHOICES, weights=dist.health_weights)[0]
+        return {
+            "request": {
+                "commit_id": f"mock-{index}-{rng.getrandbits(24):06x}",
+                "author": {
+                    "id": self.author(),
+                    "domain_familiarity_score": round(rng.uniform(*dist.familiarity), 2),
+                    "past_success_rate": round(rng.uniform(*dist.success_rate), 2),
+                },
+                "change_metadata": {
+                    "lines_added": self.lines(dist.lines_added),
+                    "lines_removed": self.lines(dist.lines_removed),
+                    "files_modified": files,
+                    "cyclomatic_complexity_delta": round(rng.uniform(*dist.complexity), 2),
+                },
+                "environment_health": {
+                    "status": status,
+                    "open_incidents": rng.randint(0, dist.max_incidents if status != "healthy" else 0),
+                },
             },
-            "change_metadata": _random_change(),
-            "environment_health": _random_health(),
-        },
-        "security_scan_passed": random.choice([True, True, False]),
-    }
+            "security_scan_passed": rng.random() < dist.security_pass_rate,
+        }
+
+
+def iter_payloads(
+    count: int, seed: int = 0, distributions: Distributions = DEFAULT_DISTRIBUTIONS, start: int = 0
+) -> Iterator[dict]:
+    """Payloads `start..start+count` of the corpus for `seed`; each block has its own RNG."""
+    for block in range(start // BLOCK_SIZE, -(-(start + count) // BLOCK_SIZE)):
+        sampler = _Sampler(random.Random((seed << 32) | block), distributions)
+        first = block * BLOCK_SIZE
+        for index in range(first, min(start + count, first + BLOCK_SIZE)):
+            # Payloads before `start` are still drawn so every slice of a block agrees.
+            payload = sampler.payload(index)
+            if index >= start:
+                yield payload
 
 
-def generate(count: int = 5) -> list[Path]:
+def build_payloads(
+    count: int, seed: Optional[int] = None, distributions: Distributions = DEFAULT_DISTRIBUTIONS
+) -> list[dict]:
+    if seed is None:
+        seed = random.getrandbits(32)
+    return list(iter_payloads(count, seed, distributions))
+
+
+def generate(
+    count: int = 5, seed: Optional[int] = None, distributions: Distributions = DEFAULT_DISTRIBUTIONS
+) -> list[Path]:
     OUTPUT_DIR.mkdir(exist_ok=True)
     paths = []
-    for index in range(count):
-        payload = _payload_template(index)
+    for index, payload in enumerate(build_payloads(count, seed, distributions)):
         path = OUTPUT_DIR / f"mock_payload_{index}.json"
         path.write_text(json.dumps(payload, indent=2))
         paths.append(path)
     return paths
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Generate synthetic Probabilistic Pipeline payloads.")
+def shard_range(count: int, shard: int, shards: int) -> Tuple[int, int]:
+    """`[start, end)` of shard `shard` of `shards`, cut on block boundaries."""
+    blocks = -(-count // BLOCK_SIZE)
+    start = blocks * shard // shards * BLOCK_SIZE
+    end = blocks * (shard + 1) // shards * BLOCK_SIZE
+    return min(start, count), min(end, count)
+
+
+def write_ndjson(
+    output: IO[bytes],
+    count: int,
+    seed: int,
+    distributions: Distributions = DEFAULT_DISTRIBUTIONS,
+    workers: int = 1,
+    shard: Tuple[int, int] = (0, 1),
+    compress: bool = False,
+) -> int:
+    """Stream this shard's payloads to `output` in order; returns the number written."""
+    start, end = shard_range(count, *shard)
+    tasks = [
+        (first, min(BLOCK_SIZE, end - first), seed, distributions, compress)
+        for first in range(start, end, BLOCK_SIZE)
+    ]
+    if workers <= 1:
+        for data in map(_encode_chunk, tasks):
+            output.write(data)
+        return end - start
+    with multiprocessing.Pool(workers) as pool:
+        for data in pool.imap(_encode_chunk, tasks, chunksize=4):
+            output.write(data)
+    return end - start
+
+
+def _encode_chunk(task: Tuple[int, int, int, Distributions, bool]) -> bytes:
+    start, count, seed, distributions, compress = task
+    payloads = iter_payloads(count, seed, distributions, start)
+    data = "".join(json.dumps(payload, separators=(",", ":")) + "\n" for payload in payloads).encode("utf-8")
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
+def synthetic_repo(
+    path: Path,
+    commits: int = 500,
+    authors: int = 20,
+    days: int = 60,
+    seed: Optional[int] = None,
+    distributions: Optional[Distributions] = None,
+) -> Path:
+    """Create a git repo whose history matches the payload authors and files.
+
+    Commits by `synthetic-1..authors` (or the authors, skew and file layout of
+    `distributions`) are spread over the last `days` days, touch one to three of the
+    payload files, and roughly one in ten is a revert. The history is streamed into
+    `git fast-import`, so large repos build in seconds without holding it in memory.
+    """
+    rng = random.Random(seed)
+    distributions = distributions or Distributions(authors=authors)
+    sampler = _Sampler(rng, distributions)
+    path = Path(path)
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    files = distributions.all_files()
+    now = int(time.time())
+    importer = subprocess.Popen(["git", "-C", str(path), "fast-import", "--quiet"], stdin=subprocess.PIPE)
+    try:
+        for index in range(commits):
+            author = sampler.author()
+            when = now - (commits - index) * days * 86400 // max(commits, 1)
+            subject = f"Revert change {index - 1}" if rng.random() < 0.1 else f"Update modules ({index})"
+            stream = bytearray(f"commit refs/heads/main\nmark :{index + 1}\n".encode())
+            for role in ("author", "committer"):
+                stream += f"{role} {author} <{author}@example.com> {when} +0000\n".encode()
+            stream += _fast_import_data(subject.encode())
+            for touched in rng.sample(files, k=min(len(files), rng.randint(1, 3))):
+                stream += f"M 100644 inline {touched}\n".encode()
+                stream += _fast_import_data(f"{index}\n".encode())
+            stream += b"\n"
+            importer.stdin.write(stream)
+    finally:
+        importer.stdin.close()
+        if importer.wait() != 0:
+            raise subprocess.CalledProcessError(importer.returncode, importer.args)
+    subprocess.run(["git", "-C", str(path), "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+    return path
+
+
+def _fast_import_data(data: bytes) -> bytes:
+    return f"data {len(data)}\n".encode() + data + b"\n"
+
+
+def _shard(text: str) -> Tuple[int, int]:
+    shard, _, shards = text.partition("/")
+    shard, shards = int(shard), int(shards)
+    if not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError(f"shard must be K/N with 0 <= K < N, not {text!r}")
+    return shard, shards
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0], formatter_class=argparse.RawDescriptionHelpFormatter
+    )
     parser.add_argument("--count", type=int, default=5, help="Number of payloads to emit")
-    args = parser.parse_args()
-    generated = generate(args.count)
-    print("Generated mock payloads:")
-    for p in generated:
-        print(f"  - {p}")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible payloads")
+    parser.add_argument("--ndjson", metavar="PATH", help="Stream NDJSON to PATH ('-' for stdout) instead of files")
+    parser.add_argument("--compress", action="store_true", help="Gzip the NDJSON output (implied by a .gz PATH)")
+    parser.add_argument("--workers", type=int, default=1, help="Generator processes for --ndjson")
+    parser.add_argument("--shard", type=_shard, default=(0, 1), help="Emit only slice K of N (K/N, zero-based)")
+    parser.add_argument("--distributions", type=Path, help="JSON file of Distributions fields")
+    parser.add_argument("--repo", type=Path, help="Also build a matching synthetic git repository here")
+    parser.add_argument("--commits", type=int, default=500, help="Commits in the --repo history")
+    args = parser.parse_args(argv)
+    distributions = Distributions.from_json(args.distributions) if args.distributions else DEFAULT_DISTRIBUTIONS
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+
+    if args.ndjson:
+        compress = args.compress or args.ndjson.endswith(".gz")
+        started = time.perf_counter()
+        output = sys.stdout.buffer if args.ndjson == "-" else open(args.ndjson, "wb")
+        try:
+            written = write_ndjson(output, args.count, seed, distributions, args.workers, args.shard, compress)
+        finally:
+            output.flush()
+            if args.ndjson != "-":
+                output.close()
+        elapsed = time.perf_counter() - started
+        print(f"Wrote {written} payloads (seed {seed}) in {elapsed:.1f}s", file=sys.stderr)
+    else:
+        generated = generate(args.count, seed, distributions)
+        print("Generated mock payloads:")
+        for p in generated:
+            print(f"  - {p}")
+    if args.repo:
+        synthetic_repo(args.repo, commits=args.commits, seed=seed, distributions=distributions)
+        print(f"Built synthetic repository at {args.repo}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,32 @@
-"""Drive traffic through the inference proxy and router for demos."""
+"""Drive traffic through the inference proxy and router for demos.
+
+With `--load`, the script instead load-tests `/assess`. It uses one pooled
+`httpx.AsyncClient`, either against `--url` or against the API app in-process through
+`httpx.ASGITransport` (`--in-process`, no server or network needed). Two arrival
+models are available:
+
+- closed loop: `--concurrency` clients each send their next request as soon as the
+  previous one finishes, optionally paced to an aggregate `--rps`.
+- open loop: requests arrive at a fixed `--rps` whether or not earlier ones have
+  finished, with at most `--concurrency` in flight. Latency is measured from each
+  request's scheduled start, so queueing behind a slow server shows up in the
+  percentiles instead of silently lowering the offered rate.
+
+Requests issued during `--warmup` are not measured. The JSON report has achieved
+throughput, error rate, status counts and p50/p95/p99 latency.
+
+Both clients get the same connection limits and `--timeout`. httpx does not apply
+either to an ASGI transport, so `run_load` also enforces the timeout itself, and the
+in-flight cap is `--concurrency` in both setups.
+"""
 import argparse
+import asyncio
 import json
 import os
-import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 import httpx
 
@@ -13,8 +34,11 @@ ROOT = Path(__file__).resolve().parent.parent
 SRC_DIR = ROOT / "src"
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
 
-from demo.mock_data import generate
+from demo.mock_data import build_payloads, generate
+from prob_pipeline.worker import WorkerClient
 
 API_URL = "http://localhost:8001/assess"
 OUTPUT_DIR = Path(__file__).parent / "traffic"
@@ -32,13 +56,143 @@ def _send_payload(path: Path) -> Path:
 
 
 def _run_router(response_paths: Iterable[Path]) -> None:
-    for path in response_paths:
-        env = os.environ.copy()
-        env["PYTHONPATH"] = str(SRC_DIR)
-        subprocess.run(
-            ["python", "-m", "prob_pipeline.router", str(path)],
-            check=True,
-            env=env,
+    # One warm worker routes every response instead of a router process per file.
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    with WorkerClient.spawn(env=env) as worker:
+        for path in response_paths:
+            print(worker.route(json.loads(path.read_text()))["report"])
+
+
+def _latency_report(latencies: List[float], errors: int, statuses: Dict[str, int], elapsed: float) -> dict:
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    total = len(ordered)
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(ordered[-1] * 1000, 3) if ordered else None,
+        },
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    payloads: List[dict],
+    model: str = "closed",
+    concurrency: int = 16,
+    rps: Optional[float] = None,
+    duration: float = 10.0,
+    warmup: float = 2.0,
+    timeout: Optional[float] = None,
+) -> dict:
+    """Post `payloads` round-robin to `/assess` for `warmup + duration` seconds."""
+    if model == "open" and not rps:
+        raise ValueError("The open-loop model needs a target --rps")
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    sent = 0
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def send(scheduled: float) -> None:
+        nonlocal errors, sent
+        payload = payloads[sent % len(payloads)]
+        sent += 1
+        try:
+            response = await asyncio.wait_for(client.post("/assess", json=payload), timeout)
+            status = str(response.status_code)
+            failed = response.status_code >= 400
+        except (httpx.HTTPError, asyncio.TimeoutError) as exc:
+            status = type(exc).__name__
+            failed = True
+        if scheduled < measure_from:
+            return
+        latencies.append(loop.time() - scheduled)
+        statuses[status] = statuses.get(status, 0) + 1
+        errors += failed
+
+    def slot(index: int) -> float:
+        return started + index / rps
+
+    if model == "closed":
+        issued = 0
+
+        async def client_loop() -> None:
+            nonlocal issued
+            while True:
+                if rps:
+                    scheduled = slot(issued)
+                    issued += 1
+                    await asyncio.sleep(max(0.0, scheduled - loop.time()))
+                scheduled = loop.time()
+                if scheduled >= stop_at:
+                    return
+                await send(scheduled)
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    else:
+        limit = asyncio.Semaphore(concurrency)
+        tasks = set()
+
+        async def bounded(scheduled: float) -> None:
+            async with limit:
+                await send(scheduled)
+
+        index = 0
+        while True:
+            scheduled = slot(index)
+            if scheduled >= stop_at:
+                break
+            await asyncio.sleep(max(0.0, scheduled - loop.time()))
+            task = asyncio.ensure_future(bounded(scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            index += 1
+        await asyncio.gather(*tasks)
+    report = _latency_report(latencies, errors, statuses, max(loop.time(), stop_at) - measure_from)
+    report.update({"model": model, "concurrency": concurrency, "target_rps": rps})
+    return report
+
+
+def _client(args: argparse.Namespace) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.in_process:
+        from prob_pipeline.api import app
+
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://load-test", limits=limits, timeout=args.timeout)
+    return httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout)
+
+
+async def _load(args: argparse.Namespace) -> dict:
+    payloads = build_payloads(args.payloads, seed=args.seed)
+    async with _client(args) as client:
+        return await run_load(
+            client,
+            payloads,
+            model=args.model,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            duration=args.duration,
+            warmup=args.warmup,
+            timeout=args.timeout,
         )
 
 
@@ -52,7 +206,32 @@ def main(count: int = DEFAULT_COUNT) -> None:
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Send enriched payloads through the inference proxy and router")
+    parser = argparse.ArgumentParser(
+        description="Send enriched payloads through the inference proxy and router",
+        epilog=__doc__.split("\n\n", 1)[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
     parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Number of payloads to emit and post")
+    load = parser.add_argument_group("load testing")
+    load.add_argument("--load", action="store_true", help="Load-test /assess instead of running the demo")
+    load.add_argument("--url", default=API_URL.rsplit("/", 1)[0], help="Base URL of the API")
+    load.add_argument("--in-process", action="store_true", help="Drive prob_pipeline.api:app through ASGI, offline")
+    load.add_argument("--model", choices=("closed", "open"), default="closed", help="Arrival model")
+    load.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients / open-loop in-flight cap")
+    load.add_argument("--rps", type=float, help="Target requests per second (required for --model open)")
+    load.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    load.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before the measurement")
+    load.add_argument("--payloads", type=int, default=200, help="Distinct synthetic payloads to cycle through")
+    load.add_argument("--seed", type=int, default=1234, help="Seed for the synthetic payloads")
+    load.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    load.add_argument("--output", type=Path, help="Write the JSON report here as well as to stdout")
     args = parser.parse_args()
-    main(args.count)
+    if args.load:
+        if args.model == "open" and not args.rps:
+            parser.error("--model open requires --rps")
+        report = json.dumps(asyncio.run(_load(args)), indent=2)
+        print(report)
+        if args.output:
+            args.output.write_text(report + "\n")
+    else:
+        main(args.count)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import sys
-from collections import Counter
+from dataclasses import asdict
 from pathlib import Path
 from typing import Tuple
 
@@ -17,6 +17,7 @@ from prob_pipeline.core import RiskInferenceEngine
 from prob_pipeline.enricher import ContextEnricher
 from prob_pipeline.models import AssessmentRequest, AssessmentResponse
 from prob_pipeline.persistence import OutcomeLogger
+from prob_pipeline.store import OutcomeStore
 
 PAYLOAD_DIR = Path(__file__).resolve().parent
 SAMPLE_FILES = sorted(PAYLOAD_DIR.glob("sample_payload_*.json"))
@@ -25,6 +26,13 @@ SYNTHETIC_DIR = PAYLOAD_DIR / "synthetic"
 ENGINE = RiskInferenceEngine()
 ENRICHER = ContextEnricher()
 LOGGER = OutcomeLogger()
+STORE = OutcomeStore()
+
+
+def _sync_store() -> None:
+    # The router and worker append to the JSONL log only; pull in whatever is new.
+    if LOGGER.path.exists():
+        STORE.import_jsonl(LOGGER.path)
 
 LANE_TRIGGERS = {
     "low_risk": [
@@ -74,18 +82,6 @@ def _run_inference(payload_text: str) -> Tuple[AssessmentRequest, AssessmentResp
     return request, response, lane_triggers
 
 
-def _load_feedback_log(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    lines = [line for line in path.read_text().splitlines() if line.strip()]
-    return [json.loads(line) for line in lines]
-
-
-def _summarize_lanes(entries: list[dict]) -> dict[str, int]:
-    counter = Counter(entry.get("lane", "unknown") for entry in entries)
-    return {lane: counter.get(lane, 0) for lane in ["low_risk", "medium_risk", "high_risk"]}
-
-
 st.set_page_config(page_title="Probabilistic Pipeline Simulator", layout="wide")
 st.title("Probabilistic Pipeline Simulation")
 
@@ -131,7 +127,7 @@ if last_result:
     )
 
     with st.expander("Request metadata"):
-        st.json(request.__dict__)
+        st.json(asdict(request))
 
     st.write("### Risk factors")
     st.table(
@@ -158,19 +154,20 @@ if last_result:
         st.write(f"- {task}")
 
     if st.button("Persist to feedback log"):
-        LOGGER.log(response, lane_triggers or response.recommended_actions)
+        triggers = lane_triggers or response.recommended_actions
+        LOGGER.log(response, triggers, commit_id=request.commit_id, files=request.change_metadata.files_modified)
         st.info(f"Appended entry to {LOGGER.path}")
 
     st.write("### Feedback log summary")
-    log_entries = _load_feedback_log(LOGGER.path)
-    if log_entries:
-        lane_counts = _summarize_lanes(log_entries)
-        st.bar_chart(lane_counts)
+    _sync_store()
+    recent_entries = STORE.history(limit=5)
+    if recent_entries:
+        st.bar_chart(STORE.lane_counts())
         st.write("Recent entries")
         st.table(
             [
                 {"timestamp": entry["timestamp"], "lane": entry["lane"], "confidence": entry["confidence_score"]}
-                for entry in log_entries[-5:]
+                for entry in reversed(recent_entries)
             ]
         )
     else:
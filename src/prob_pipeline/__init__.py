@@ -2,11 +2,13 @@
 
 from .core import RiskInferenceEngine
 from .enricher import ContextEnricher
+from .history import CommitIndex
 from .models import AssessmentRequest, AssessmentResponse
 
 __all__ = [
     "RiskInferenceEngine",
     "ContextEnricher",
+    "CommitIndex",
     "AssessmentRequest",
     "AssessmentResponse",
 ]
@@ -0,0 +1,167 @@
+"""Signal adapter registry: each adapter turns an `AssessmentRequest` into one signal.
+
+Adapters declare the request fields they read, an optional timeout and the minimum
+completeness below which the engine applies the pessimism bias instead of their
+delta. CPU-only adapters (the built-in four) run inline; adapters marked `blocking`
+(CMDB, incident or telemetry lookups) are submitted to a shared thread pool first so
+they overlap with each other and with the inline ones. Outcomes are always returned
+in registration order.
+
+An adapter that misses its timeout or the per-request deadline, or raises, yields a
+`requires_pessimism` outcome, so the assessment proceeds with the usual missing-data
+penalty. Both are measured from the start of collection. Nothing is interrupted: a
+blocking adapter's worker thread keeps running, and an inline adapter that starts
+after or finishes past its limit has its result discarded. Adapters doing I/O should
+also bound their own calls. `collect` waits on blocking adapters, so async callers
+should run it (or `engine.assess`) off the event loop when `registry.blocking` is set.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .models import AssessmentRequest
+
+MIN_COMPLETENESS = 0.6
+
+
+@dataclass
+class SignalOutcome:
+    name: str
+    delta: float
+    completeness: float
+    description: str
+    requires_pessimism: bool = False
+    # Deferred explanation: when `render` is set, `explain()` returns `render(*details)`
+    # and `description` may be left empty, so score-only callers never format text.
+    render: Optional[Callable[..., str]] = None
+    details: Tuple[Any, ...] = ()
+
+    def explain(self) -> str:
+        return self.render(*self.details) if self.render is not None else self.description
+
+
+@dataclass(frozen=True)
+class SignalAdapter:
+    name: str
+    compute: Callable[[AssessmentRequest], SignalOutcome]
+    inputs: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    min_completeness: float = MIN_COMPLETENESS
+    blocking: bool = False
+
+
+class AdapterRegistry:
+    def __init__(self, adapters: Optional[List[SignalAdapter]] = None, max_workers: int = 8):
+        self._adapters: Dict[str, SignalAdapter] = {}
+        # Bumped on every register/unregister so result caches notice replaced adapters.
+        self.version = 0
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        for adapter in adapters or ():
+            self.register(adapter)
+
+    def register(self, adapter: SignalAdapter, replace_existing: bool = False) -> None:
+        if adapter.name in self._adapters and not replace_existing:
+            raise ValueError(f"Signal adapter {adapter.name!r} is already registered")
+        self._adapters[adapter.name] = adapter
+        self.version += 1
+
+    def unregister(self, name: str) -> SignalAdapter:
+        adapter = self._adapters.pop(name)
+        self.version += 1
+        return adapter
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._adapters)
+
+    def __iter__(self) -> Iterator[SignalAdapter]:
+        return iter(list(self._adapters.values()))
+
+    def __len__(self) -> int:
+        return len(self._adapters)
+
+    @property
+    def blocking(self) -> bool:
+        """True when any adapter runs on the pool, so `collect` may wait on it."""
+        return any(adapter.blocking for adapter in self._adapters.values())
+
+    def collect(self, request: AssessmentRequest, deadline: Optional[float] = None) -> List[SignalOutcome]:
+        """Run every adapter for `request`; `deadline` caps the whole collection in seconds."""
+        adapters = list(self._adapters.values())
+        started = time.monotonic()
+        futures = {}
+        for adapter in adapters:
+            if adapter.blocking:
+                futures[adapter.name] = self._pool().submit(adapter.compute, request)
+        outcomes = []
+        for adapter in adapters:
+            if adapter.blocking:
+                outcome = self._await(adapter, futures[adapter.name], started, deadline)
+            else:
+                outcome = self._run_inline(adapter, request, started, deadline)
+            if not outcome.requires_pessimism and outcome.completeness < adapter.min_completeness:
+                outcome = replace(outcome, requires_pessimism=True)
+            outcomes.append(outcome)
+        return outcomes
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _await(self, adapter: SignalAdapter, future, started: float, deadline: Optional[float]) -> SignalOutcome:
+        limit = _limit(adapter, deadline)
+        remaining = None
+        if limit is not None:
+            remaining = max(0.0, limit - (time.monotonic() - started))
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeout:
+            future.cancel()
+            return _timed_out(adapter.name, limit)
+        except Exception as exc:
+            return _failed(adapter.name, exc)
+
+    def _run_inline(
+        self, adapter: SignalAdapter, request: AssessmentRequest, started: float, deadline: Optional[float]
+    ) -> SignalOutcome:
+        limit = _limit(adapter, deadline)
+        if limit is not None and time.monotonic() - started >= limit:
+            return _timed_out(adapter.name, limit)
+        try:
+            outcome = adapter.compute(request)
+        except Exception as exc:
+            return _failed(adapter.name, exc)
+        if limit is not None and time.monotonic() - started > limit:
+            return _timed_out(adapter.name, limit)
+        return outcome
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="signal-adapter")
+            return self._executor
+
+
+def _limit(adapter: SignalAdapter, deadline: Optional[float]) -> Optional[float]:
+    limits = [limit for limit in (adapter.timeout, deadline) if limit is not None]
+    return min(limits) if limits else None
+
+
+def _timed_out(name: str, limit: float) -> SignalOutcome:
+    return _unavailable(name, f"timed out after {limit:.3f}s")
+
+
+def _failed(name: str, exc: Exception) -> SignalOutcome:
+    return _unavailable(name, f"failed: {type(exc).__name__}: {exc}")
+
+
+def _unavailable(name: str, reason: str) -> SignalOutcome:
+    return SignalOutcome(name=name, delta=0.0, completeness=0.0, description=f"{name} {reason}", requires_pessimism=True)
@@ -1,14 +1,29 @@
 """FastAPI proxy for the risk inference engine."""
 from __future__ import annotations
 
-from typing import List, Literal
+import asyncio
+import json
+import math
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
+from json.encoder import encode_basestring
+from typing import Any, AsyncIterator, Callable, List, Literal, Optional, Tuple
 
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.openapi.utils import get_openapi
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, ValidationError
 
 from .core import RiskInferenceEngine
-from .enricher import ContextEnricher
+from .enricher import AsyncContextEnricher, ContextEnricher
+from .metrics import METRICS, request_breakdown, server_timing
 from .models import AssessmentRequest, AssessmentResponse
+from .priors import priors_from_env
+from .result_cache import ResultCache
 
 
 class AuthorPayload(BaseModel):
@@ -55,17 +70,136 @@ class AssessmentResponsePayload(BaseModel):
     is_security_compliant: bool
 
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BATCH_MAX_SIZE = int(os.environ.get("PROB_PIPELINE_BATCH_MAX_SIZE", "1000"))
+BATCH_CONCURRENCY = int(os.environ.get("PROB_PIPELINE_BATCH_CONCURRENCY", "16"))
+BATCH_MAX_BYTES = int(os.environ.get("PROB_PIPELINE_BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+BATCH_MAX_LINE_BYTES = int(os.environ.get("PROB_PIPELINE_BATCH_MAX_LINE_BYTES", str(1024 * 1024)))
+TIMING_REQUEST_HEADER = "x-server-timing"
+ASSESS_STAGES = ("validate", "enrich", "from_payload", "assess", "encode")
+HEALTH_STATUSES = frozenset(("healthy", "degraded", "critical"))
+
+
+class InstrumentedRoute(APIRoute):
+    """Times each request when metrics are enabled or the client sends `X-Server-Timing: 1`.
+
+    The request histogram and counter are labelled with the route path. Opted-in
+    responses carry a `Server-Timing` header with the stages recorded while handling
+    the request, `respond` (what the handler spent outside those stages: response
+    routing and response sending) and `total`. For streaming responses only the
+    work done before the first byte is covered.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def instrumented(request: Request) -> Response:
+            wants_header = request.headers.get(TIMING_REQUEST_HEADER) == "1"
+            if not (METRICS.enabled or wants_header):
+                return await handler(request)
+            started = time.perf_counter()
+            status = 500
+            try:
+                with request_breakdown() if wants_header else nullcontext() as breakdown:
+                    response = await handler(request)
+                status = response.status_code
+            except HTTPException as exc:
+                status = exc.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                total = time.perf_counter() - started
+                if METRICS.enabled:
+                    METRICS.observe("request", route, total)
+                    METRICS.inc("requests", route=route, status=str(status))
+            if breakdown is not None:
+                stages = sum(seconds for name, seconds in breakdown.items() if name in ASSESS_STAGES)
+                breakdown["respond"] = max(0.0, total - stages)
+                breakdown["total"] = total
+                response.headers["Server-Timing"] = server_timing(breakdown)
+            return response
+
+        return instrumented
+
+
 app = FastAPI(title="Probabilistic Pipeline Inference Proxy", version="0.1.0")
-engine = RiskInferenceEngine()
+app.router.route_class = InstrumentedRoute
+
+
+def _openapi() -> dict:
+    # `/assess` validates its body itself, so register the envelope schema it references.
+    if app.openapi_schema is None:
+        schema = get_openapi(title=app.title, version=app.version, routes=app.routes)
+        envelope = AssessmentEnvelope.model_json_schema(ref_template="#/components/schemas/{model}")
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        components.update(envelope.pop("$defs", {}))
+        components["AssessmentEnvelope"] = envelope
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+app.openapi = _openapi
+engine = RiskInferenceEngine(priors=priors_from_env())
 enricher = ContextEnricher()
+async_enricher = AsyncContextEnricher(enricher)
+result_cache = ResultCache.from_env()
+CACHE_HEADER = "x-assessment-cache"
+
+
+@app.post(
+    "/assess",
+    response_model=AssessmentResponsePayload,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/AssessmentEnvelope"}}},
+        }
+    },
+)
+async def assess(request: Request) -> Response:
+    """Score one `AssessmentEnvelope`.
+
+    The body is decoded and validated directly (pydantic only runs for payloads that
+    need coercion or fail validation, so errors are unchanged) and the response is
+    encoded straight to bytes with `AssessmentResponse.to_json`. Repeated requests are
+    answered from `result_cache`; the `X-Assessment-Cache` header says `hit` or `miss`.
+    """
+    body = await request.body()
+    with METRICS.stage("validate"):
+        payload = _decode_envelope(body)
+    response, cached = await _assess_payload(payload)
+    with METRICS.stage("encode"):
+        content = response.to_json()
+    headers = {CACHE_HEADER: "hit" if cached else "miss"} if result_cache.enabled else None
+    return Response(content, media_type="application/json", headers=headers)
+
 
+@app.post("/assess_batch")
+async def assess_batch(request: Request) -> StreamingResponse:
+    """Score a JSON array or NDJSON stream of envelopes, streaming one NDJSON line per result.
 
-@app.post("/assess", response_model=AssessmentResponsePayload)
-def assess(payload: AssessmentEnvelope) -> AssessmentResponsePayload:
-    enriched = enricher.enrich_payload(payload.dict())
-    request = AssessmentRequest.from_payload(enriched)
-    response = engine.assess(request)
-    return AssessmentResponsePayload(**_flatten_response(response))
+    The body is read (and size-checked) before the response starts, since Starlette
+    consumes `receive` for disconnect detection once streaming begins. Lines are
+    emitted in completion order and carry the zero-based `index` of the envelope in
+    the request plus its `commit_id`; envelopes that are malformed or fail validation
+    produce an `error` line instead of aborting the batch.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        items = await _read_ndjson(request)
+    else:
+        try:
+            items = json.loads(await _read_body(request))
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {exc}") from exc
+        if not isinstance(items, list):
+            raise HTTPException(status_code=422, detail="Batch body must be a JSON array of envelopes")
+    if len(items) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_SIZE} envelopes")
+    return StreamingResponse(_stream_assessments(items), media_type="application/x-ndjson")
 
 
 @app.get("/health")
@@ -73,14 +207,232 @@ def health() -> dict[str, str]:
     return {"status": "ok", "description": "Inference engine online"}
 
 
-def _flatten_response(response: AssessmentResponse) -> dict:
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text format: stage, git and request latency histograms plus cache counters."""
+    counters = {}
+    gauges = {}
+    results = result_cache.stats()
+    enricher_stats = asdict(async_enricher.enricher.cache.stats())
+    for prefix, stats in (("enricher_cache", enricher_stats), ("result_cache", asdict(results.memory))):
+        counters.update({f"{prefix}_{name}": stats[name] for name in ("hits", "misses", "evictions", "expirations")})
+        gauges.update({f"{prefix}_size": stats["size"], f"{prefix}_maxsize": stats["maxsize"]})
+    counters["result_cache_disk_hits"] = results.disk_hits
+    return PlainTextResponse(
+        METRICS.render(gauges=gauges, counters=counters), media_type="text/plain; version=0.0.4"
+    )
+
+
+async def _assess_payload(payload: dict) -> Tuple[AssessmentResponse, bool]:
+    """Enrich and score one validated envelope; returns `(response, served_from_cache)`."""
+    with METRICS.stage("enrich"):
+        enriched = await async_enricher.enrich_payload(payload)
+    with METRICS.stage("from_payload"):
+        request = AssessmentRequest.from_payload(enriched)
+    with METRICS.stage("assess"):
+        if engine.registry.blocking:
+            # Blocking adapters wait on the pool (up to the deadline); keep that off the loop.
+            return await asyncio.to_thread(result_cache.assess, engine, request)
+        return result_cache.assess(engine, request)
+
+
+def _decode_envelope(body: bytes) -> dict:
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as exc:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exc.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exc.msg},
+                }
+            ],
+            body=exc.doc,
+        ) from exc
+    try:
+        return _validate_envelope(data)
+    except ValidationError as exc:
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)]
+        raise RequestValidationError(errors, body=data) from exc
+
+
+def _validate_envelope(data: Any) -> dict:
+    """`data` normalized like `AssessmentEnvelope(**data).dict()`; raises `ValidationError`."""
+    payload = _fast_envelope(data)
+    if payload is None:
+        payload = AssessmentEnvelope.model_validate(data).dict()
+    return payload
+
+
+def _fast_envelope(data: Any) -> Optional[dict]:
+    # Accepts only payloads that are already exactly typed and in range; anything
+    # else (coercible strings, bools as numbers, bad values) is left to pydantic.
+    if type(data) is not dict or type(request := data.get("request")) is not dict:
+        return None
+    author = request.get("author")
+    change = request.get("change_metadata")
+    health = request.get("environment_health")
+    if type(author) is not dict or type(change) is not dict or type(health) is not dict:
+        return None
+    commit_id = request.get("commit_id")
+    author_id = author.get("id")
+    familiarity = author.get("domain_familiarity_score", 0.0)
+    success_rate = author.get("past_success_rate", 0.0)
+    lines_added = change.get("lines_added")
+    lines_removed = change.get("lines_removed")
+    files = change.get("files_modified")
+    complexity = change.get("cyclomatic_complexity_delta")
+    status = health.get("status")
+    open_incidents = health.get("open_incidents")
+    passed = data.get("security_scan_passed", True)
+    if (
+        type(commit_id) is not str
+        or type(author_id) is not str
+        or type(familiarity) not in (int, float)
+        or not 0.0 <= familiarity <= 1.0
+        or type(success_rate) not in (int, float)
+        or not 0.0 <= success_rate <= 1.0
+        or type(lines_added) is not int
+        or type(lines_removed) is not int
+        or type(files) is not list
+        or any(type(path) is not str for path in files)
+        or type(complexity) not in (int, float)
+        or not math.isfinite(complexity)
+        or type(status) is not str
+        or status not in HEALTH_STATUSES
+        or type(open_incidents) is not int
+        or type(passed) is not bool
+    ):
+        return None
     return {
-        "confidence_score": response.confidence_score,
-        "assigned_lane": response.assigned_lane,
-        "risk_factors": [
-            RiskFactorResponse(**factor.__dict__).dict()
-            for factor in response.risk_factors
-        ],
-        "recommended_actions": response.recommended_actions,
-        "is_security_compliant": response.is_security_compliant,
+        "request": {
+            "commit_id": commit_id,
+            "author": {
+                "id": author_id,
+                "domain_familiarity_score": float(familiarity),
+                "past_success_rate": float(success_rate),
+            },
+            "change_metadata": {
+                "lines_added": lines_added,
+                "lines_removed": lines_removed,
+                "files_modified": files,
+                "cyclomatic_complexity_delta": float(complexity),
+            },
+            "environment_health": {"status": status, "open_incidents": open_incidents},
+        },
+        "security_scan_passed": passed,
     }
+
+
+async def _stream_assessments(items: List[Any]) -> AsyncIterator[str]:
+    # A slot is held until the result line is queued, so at most BATCH_CONCURRENCY
+    # envelopes are scored or buffered ahead of a slow client. If the client goes away
+    # the generator is closed, and every task still scoring or waiting to queue its
+    # line is cancelled rather than left blocked on the full queue.
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    lines: asyncio.Queue = asyncio.Queue(maxsize=BATCH_CONCURRENCY)
+    tasks: List[asyncio.Task] = []
+
+    async def score(index: int, item: Any) -> None:
+        try:
+            await lines.put(await _score_item(index, item))
+        finally:
+            slots.release()
+
+    async def feed() -> None:
+        for index, item in enumerate(items):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(score(index, item)))
+        await asyncio.gather(*tasks)
+        await lines.put(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (line := await lines.get()) is not None:
+            yield line
+    finally:
+        for task in (feeder, *tasks):
+            task.cancel()
+
+
+async def _score_item(index: int, item: Any) -> str:
+    if isinstance(item, _InvalidLine):
+        return _error_line(index, item.message)
+    if not isinstance(item, dict):
+        return _error_line(index, "Envelope must be a JSON object")
+    try:
+        with METRICS.stage("validate"):
+            payload = _validate_envelope(item)
+    except ValidationError as exc:
+        return _error_line(index, str(exc))
+    except Exception as exc:
+        return _error_line(index, f"Invalid envelope: {exc}")
+    try:
+        commit_id = payload["request"]["commit_id"]
+        response, _ = await _assess_payload(payload)
+        return f'{{"index":{index},"commit_id":{encode_basestring(commit_id)},{response.json_fields()}}}\n'
+    except Exception as exc:
+        return _error_line(index, f"Assessment failed: {exc}")
+
+
+def _error_line(index: int, message: str) -> str:
+    return json.dumps({"index": index, "error": message}) + "\n"
+
+
+class _InvalidLine:
+    def __init__(self, message: str):
+        self.message = message
+
+
+async def _read_body(request: Request) -> bytes:
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BATCH_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Batch body exceeds {BATCH_MAX_BYTES} bytes")
+    return bytes(body)
+
+
+async def _read_ndjson(request: Request) -> List[Any]:
+    items: List[Any] = []
+    line = bytearray()
+    oversized = False
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > BATCH_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Batch body exceeds {BATCH_MAX_BYTES} bytes")
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            segment = chunk[start:] if newline == -1 else chunk[start:newline]
+            if not oversized:
+                line += segment
+                if len(line) > BATCH_MAX_LINE_BYTES:
+                    oversized = True
+                    line = bytearray()
+            if newline == -1:
+                break
+            _append_line(items, line, oversized)
+            line = bytearray()
+            oversized = False
+            start = newline + 1
+        if len(items) > BATCH_MAX_SIZE:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_SIZE} envelopes")
+    _append_line(items, line, oversized)
+    return items
+
+
+def _append_line(items: List[Any], line: bytearray, oversized: bool) -> None:
+    if oversized:
+        items.append(_InvalidLine(f"NDJSON line exceeds {BATCH_MAX_LINE_BYTES} bytes"))
+        return
+    if not line.strip():
+        return
+    try:
+        items.append(json.loads(line))
+    except json.JSONDecodeError as exc:
+        items.append(_InvalidLine(f"Invalid NDJSON line: {exc}"))
@@ -0,0 +1,272 @@
+"""Stream historical payloads and outcomes through a grid of engine settings.
+
+Each input line is a JSON object holding an assessment payload (an envelope with
+`request`, a bare request, or either under `payload`) and optionally its real-world
+outcome: `outcome` (`rollback`, `incident`, `success`, ... as understood by
+`prob_pipeline.learner`) or a boolean `failed`. Files ending in `.gz` are
+decompressed on the fly and `-` reads stdin.
+
+Lines are read in chunks of `chunk_size`. Each chunk becomes one column batch
+(`prob_pipeline.batch`), which is scored under every setting in the grid, so the
+corpus is read once and memory is bounded by the chunk size. Payloads are scored as
+recorded, without re-running the enricher. For every setting the report gives:
+
+- lane counts and shares, the shift in share against the baseline (the engine's
+  current defaults) and a baseline-to-setting lane transition matrix;
+- for rows with an outcome: the failure rate per lane, the Brier score, expected
+  calibration error and a ten-bin reliability table of predicted risk against the
+  observed failure rate.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import itertools
+import json
+import sys
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch import LANES, PRIOR_FIELD, assess_columns, columns_from_requests
+from .core import HIGH_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD, RiskInferenceEngine
+from .learner import FAILURE_OUTCOMES, SUCCESS_OUTCOMES
+from .models import AssessmentRequest
+from .priors import priors_from_env
+
+CALIBRATION_BINS = 10
+_DEFAULTS = RiskInferenceEngine()
+
+
+@dataclass(frozen=True)
+class Setting:
+    base_prior: float = _DEFAULTS.base_prior
+    pessimism_bias: float = _DEFAULTS.pessimism_bias
+    high_threshold: float = HIGH_RISK_THRESHOLD
+    medium_threshold: float = MEDIUM_RISK_THRESHOLD
+
+    @property
+    def label(self) -> str:
+        return (
+            f"base_prior={self.base_prior:g},pessimism_bias={self.pessimism_bias:g},"
+            f"high={self.high_threshold:g},medium={self.medium_threshold:g}"
+        )
+
+
+BASELINE = Setting()
+
+
+class _Accumulator:
+    def __init__(self):
+        lanes = len(LANES)
+        self.lanes = np.zeros(lanes, dtype=np.int64)
+        self.transitions = np.zeros((lanes, lanes), dtype=np.int64)
+        self.lane_labelled = np.zeros(lanes, dtype=np.int64)
+        self.lane_failures = np.zeros(lanes, dtype=np.int64)
+        self.bin_count = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.bin_predicted = np.zeros(CALIBRATION_BINS)
+        self.bin_failures = np.zeros(CALIBRATION_BINS)
+        self.brier = 0.0
+
+    def add(self, risk: np.ndarray, lanes: np.ndarray, baseline_lanes: np.ndarray, failed: np.ndarray) -> None:
+        size = len(LANES)
+        self.lanes += np.bincount(lanes, minlength=size)
+        np.add.at(self.transitions, (baseline_lanes, lanes), 1)
+        labelled = ~np.isnan(failed)
+        risk, lanes, failed = risk[labelled], lanes[labelled], failed[labelled]
+        self.lane_labelled += np.bincount(lanes, minlength=size)
+        self.lane_failures += np.bincount(lanes, weights=failed, minlength=size).astype(np.int64)
+        bins = np.minimum((risk * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1)
+        self.bin_count += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.bin_predicted += np.bincount(bins, weights=risk, minlength=CALIBRATION_BINS)
+        self.bin_failures += np.bincount(bins, weights=failed, minlength=CALIBRATION_BINS)
+        self.brier += float(np.sum((risk - failed) ** 2))
+
+    def report(self, baseline: "_Accumulator") -> dict:
+        total = int(self.lanes.sum())
+        labelled = int(self.bin_count.sum())
+        share = self.lanes / total if total else np.zeros(len(LANES))
+        baseline_share = baseline.lanes / total if total else np.zeros(len(LANES))
+        reliability = []
+        ece = 0.0
+        for index in range(CALIBRATION_BINS):
+            count = int(self.bin_count[index])
+            if not count:
+                continue
+            predicted = self.bin_predicted[index] / count
+            observed = self.bin_failures[index] / count
+            ece += count / labelled * abs(predicted - observed)
+            reliability.append(
+                {
+                    "bin": f"{index / CALIBRATION_BINS:.1f}-{(index + 1) / CALIBRATION_BINS:.1f}",
+                    "count": count,
+                    "mean_predicted": round(float(predicted), 4),
+                    "observed_failure_rate": round(float(observed), 4),
+                }
+            )
+        lanes = [str(lane) for lane in LANES]
+        return {
+            "lanes": {lane: int(count) for lane, count in zip(lanes, self.lanes)},
+            "lane_share": {lane: round(float(value), 4) for lane, value in zip(lanes, share)},
+            "lane_shift": {
+                lane: round(float(value), 4) for lane, value in zip(lanes, share - baseline_share)
+            },
+            "transitions_from_baseline": {
+                source: {target: int(count) for target, count in zip(lanes, row)}
+                for source, row in zip(lanes, self.transitions)
+            },
+            "calibration": {
+                "labelled": labelled,
+                "brier": round(self.brier / labelled, 4) if labelled else None,
+                "ece": round(ece, 4) if labelled else None,
+                "lane_failure_rate": {
+                    lane: round(float(failures / count), 4) if count else None
+                    for lane, failures, count in zip(lanes, self.lane_failures, self.lane_labelled)
+                },
+                "reliability": reliability,
+            },
+        }
+
+
+def grid(
+    base_priors: Sequence[float] = (BASELINE.base_prior,),
+    pessimism_biases: Sequence[float] = (BASELINE.pessimism_bias,),
+    high_thresholds: Sequence[float] = (BASELINE.high_threshold,),
+    medium_thresholds: Sequence[float] = (BASELINE.medium_threshold,),
+) -> List[Setting]:
+    values = itertools.product(base_priors, pessimism_biases, high_thresholds, medium_thresholds)
+    return [Setting(*combination) for combination in values]
+
+
+def read_records(paths: Iterable[Path | str]) -> Iterator[dict]:
+    """JSON objects from JSONL files (`.gz` decompressed, `-` for stdin); blank lines are skipped."""
+    for path in paths:
+        with _open(path) as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def outcome_label(record: dict) -> float:
+    """1.0 for a failed deployment, 0.0 for a successful one, NaN when unknown."""
+    failed = record.get("failed")
+    if isinstance(failed, bool):
+        return float(failed)
+    outcome = str(record.get("outcome", "")).lower()
+    if outcome in FAILURE_OUTCOMES:
+        return 1.0
+    if outcome in SUCCESS_OUTCOMES:
+        return 0.0
+    return float("nan")
+
+
+def backtest(
+    records: Iterable[dict],
+    settings: Sequence[Setting],
+    priors=None,
+    chunk_size: int = 4096,
+    limit: Optional[int] = None,
+) -> dict:
+    """Score `records` under every setting in one pass; returns the JSON-ready report."""
+    engines = {
+        setting: RiskInferenceEngine(setting.base_prior, setting.pessimism_bias, priors=priors)
+        for setting in (BASELINE, *settings)
+    }
+    accumulators = {setting: _Accumulator() for setting in engines}
+    reference = engines[BASELINE]
+    rows = skipped = 0
+    records = itertools.islice(records, limit) if limit is not None else records
+    for chunk in _chunks(records, chunk_size):
+        requests, failed = [], []
+        for record in chunk:
+            try:
+                requests.append(AssessmentRequest.from_payload(record.get("payload", record)))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                skipped += 1
+                continue
+            failed.append(outcome_label(record))
+        if not requests:
+            continue
+        rows += len(requests)
+        columns = columns_from_requests(requests, reference)
+        module_priors = _module_priors(requests, reference)
+        failed_column = np.asarray(failed, dtype=np.float64)
+        scored = {}
+        for setting, engine in engines.items():
+            if module_priors is not None:
+                columns[PRIOR_FIELD] = np.where(np.isnan(module_priors), setting.base_prior, module_priors)
+            scored[setting] = assess_columns(engine, columns, setting.high_threshold, setting.medium_threshold)
+        baseline_lanes = scored[BASELINE].lane_codes
+        for setting, result in scored.items():
+            risk = result.confidence_scores / 100
+            accumulators[setting].add(risk, result.lane_codes, baseline_lanes, failed_column)
+    baseline = accumulators[BASELINE]
+    return {
+        "rows": rows,
+        "skipped": skipped,
+        "baseline": {"setting": asdict(BASELINE), **baseline.report(baseline)},
+        "settings": [
+            {"setting": asdict(setting), "label": setting.label, **accumulators[setting].report(baseline)}
+            for setting in settings
+        ],
+    }
+
+
+def _module_priors(requests: List[AssessmentRequest], engine: RiskInferenceEngine) -> Optional[np.ndarray]:
+    if not engine.priors.has_priors:
+        return None
+    priors = (engine.priors.prior_for(request.change_metadata.files_modified) for request in requests)
+    return np.asarray([np.nan if prior is None else prior for prior in priors], dtype=np.float64)
+
+
+def _chunks(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _open(path: Path | str):
+    if str(path) == "-":
+        return nullcontext(sys.stdin)
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def _floats(text: str) -> Tuple[float, ...]:
+    return tuple(float(value) for value in text.split(","))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="+", help="JSONL or JSONL.gz files of payloads and outcomes ('-' for stdin)")
+    for name in ("base_prior", "pessimism_bias", "high_threshold", "medium_threshold"):
+        flag = "--" + name.replace("_", "-")
+        default = getattr(BASELINE, name)
+        help_text = f"Comma-separated grid values (default {default:g})"
+        parser.add_argument(flag, type=_floats, default=(default,), help=help_text)
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Rows scored per batch")
+    parser.add_argument("--limit", type=int, help="Stop after this many input lines")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    settings = grid(args.base_prior, args.pessimism_bias, args.high_threshold, args.medium_threshold)
+    report = backtest(
+        read_records(args.corpus), settings, priors=priors_from_env(), chunk_size=args.chunk_size, limit=args.limit
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
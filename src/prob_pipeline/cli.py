@@ -1,26 +1,154 @@
 """CLI entry point for the probabilistic pipeline regression."""
+import argparse
 import json
+import multiprocessing
+import os
 import sys
+import time
+from dataclasses import asdict
 from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from .core import RiskInferenceEngine
 from .enricher import ContextEnricher
 from .models import AssessmentRequest
+from .priors import priors_from_env
+from .result_cache import CACHE_DIR_ENV, CACHE_TTL_ENV, ResultCache
 
+# Per-process state for batch mode; each pool worker builds its own warm enricher.
+_ENRICHER: Optional[ContextEnricher] = None
+_ENGINE: Optional[RiskInferenceEngine] = None
+_CACHE: Optional[ResultCache] = None
 
-def main() -> int:
-    payload = _read_payload()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if _is_batch(args):
+        return _run_batch(args)
+    payload = _read_payload(args.payloads)
+    socket_path = os.environ.get("PROB_PIPELINE_WORKER_SOCKET")
+    if socket_path and Path(socket_path).exists():
+        from .worker import WorkerClient
+
+        with WorkerClient.connect(socket_path) as client:
+            print(json.dumps(client.assess(payload), indent=2))
+        return 0
     enricher = ContextEnricher()
     enriched = enricher.enrich_payload(payload)
     request = AssessmentRequest.from_payload(enriched)
-    engine = RiskInferenceEngine()
-    response = engine.assess(request)
-    print(json.dumps(response, default=lambda o: o.__dict__, indent=2))
+    engine = RiskInferenceEngine(priors=priors_from_env())
+    if args.cache_dir is None:
+        print(json.dumps(asdict(engine.assess(request)), indent=2))
+        return 0
+    response, cached = _result_cache(args.cache_dir).assess(engine, request)
+    print(json.dumps({**asdict(response), "cached": cached}, indent=2))
     return 0
 
 
-def _read_payload():
-    if len(sys.argv) > 1:
-        path = Path(sys.argv[1])
-        return json.loads(path.read_text())
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="probabilistic-pipeline",
+        description="Assess one payload (pretty JSON) or many payloads (NDJSON, one line per payload).",
+    )
+    parser.add_argument("payloads", nargs="*", type=Path, help="Payload files or directories of *.json payloads")
+    parser.add_argument("--ndjson", action="store_true", help="Read NDJSON payloads from stdin")
+    parser.add_argument("--batch", action="store_true", help="Emit NDJSON even for a single payload")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes in batch mode")
+    parser.add_argument("--chunksize", type=int, default=16, help="Payloads handed to a worker at a time")
+    parser.add_argument("--unordered", action="store_true", help="Emit results as they finish instead of input order")
+    parser.add_argument("--progress", action="store_true", help="Report progress and throughput on stderr")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=os.environ.get(CACHE_DIR_ENV) or None,
+        help="Reuse results for identical enriched payloads across runs; adds a `cached` field to the output",
+    )
+    return parser.parse_args(argv)
+
+
+def _is_batch(args: argparse.Namespace) -> bool:
+    return args.batch or args.ndjson or len(args.payloads) > 1 or any(path.is_dir() for path in args.payloads)
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    items = _batch_items(args)
+    started = time.perf_counter()
+    processed = failures = 0
+    pool = None
+    if args.workers <= 1:
+        _init_worker(args.cache_dir)
+        results: Iterable[dict] = map(_assess_item, items)
+    else:
+        pool = multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(args.cache_dir,))
+        mapper = pool.imap_unordered if args.unordered else pool.imap
+        results = mapper(_assess_item, items, chunksize=args.chunksize)
+    try:
+        for result in results:
+            sys.stdout.write(json.dumps(result) + "\n")
+            processed += 1
+            failures += "error" in result
+            if args.progress and processed % 100 == 0:
+                _report(processed, failures, started)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    sys.stdout.flush()
+    if args.progress:
+        _report(processed, failures, started)
+    return 1 if failures else 0
+
+
+def _batch_items(args: argparse.Namespace) -> Iterator[Tuple[str, str, str]]:
+    if args.ndjson:
+        for number, line in enumerate(sys.stdin, start=1):
+            if line.strip():
+                yield f"stdin:{number}", "json", line
+    for path in args.payloads:
+        if path.is_dir():
+            for child in sorted(path.glob("*.json")):
+                yield str(child), "path", str(child)
+        else:
+            yield str(path), "path", str(path)
+
+
+def _init_worker(cache_dir: Optional[Path] = None) -> None:
+    global _ENRICHER, _ENGINE, _CACHE
+    _ENRICHER = ContextEnricher()
+    _ENGINE = RiskInferenceEngine(priors=priors_from_env())
+    _CACHE = _result_cache(cache_dir) if cache_dir is not None else None
+
+
+def _result_cache(directory: Path) -> ResultCache:
+    # The directory is the tier shared across runs; the in-memory one only dedupes within a run.
+    ttl = float(os.environ.get(CACHE_TTL_ENV, "86400"))
+    return ResultCache(maxsize=1024, ttl=ttl, directory=directory)
+
+
+def _assess_item(item: Tuple[str, str, str]) -> dict:
+    source, kind, data = item
+    try:
+        payload = json.loads(Path(data).read_text() if kind == "path" else data)
+        request = AssessmentRequest.from_payload(_ENRICHER.enrich_payload(payload))
+        if _CACHE is None:
+            return {"source": source, "commit_id": request.commit_id, **asdict(_ENGINE.assess(request))}
+        response, cached = _CACHE.assess(_ENGINE, request)
+        return {"source": source, "commit_id": request.commit_id, **asdict(response), "cached": cached}
+    except Exception as exc:
+        return {"source": source, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _report(processed: int, failures: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"processed {processed} payloads ({failures} failed) in {elapsed:.1f}s, {rate:.1f}/s", file=sys.stderr)
+
+
+def _read_payload(paths: List[Path]):
+    if paths:
+        return json.loads(paths[0].read_text())
     return json.load(sys.stdin)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""Scoring specialized to one engine configuration, for callers that only need the lane.
+
+`compile_scorer(engine)` folds the engine's base prior, pessimism bias, the signal
+weights and caps from `prob_pipeline.core` and the lane thresholds into closure
+constants of one flat function over an `AssessmentRequest`. A call builds no
+`SignalOutcome`, dict or list, dispatches no adapter and formats no text; it returns
+`(confidence_score, assigned_lane)`, bit-for-bit what `engine.assess` reports.
+`CompiledScorer.response` wraps that in a score-only `AssessmentResponse`, which is
+how `assess(..., explanations="none")` answers.
+
+Only the built-in signals compile. An engine with custom or replaced adapters, or a
+subclass that overrides a signal, keeps the general `assess` path. Per-module priors
+are still looked up per call (a `ReloadingPriorIndex` or `LearnedPriors` can change
+underneath); an engine whose `PriorIndex` sets no priors scores from `base_prior`
+directly.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+from .adapters import MIN_COMPLETENESS
+from .core import (
+    AUTHOR_FLOOR,
+    AUTHOR_WEIGHT,
+    CHURN_CAP,
+    CHURN_LINES_CAP,
+    CHURN_LINES_SCALE,
+    COMPLEXITY_CAP,
+    COMPLEXITY_WEIGHT,
+    HARD_FLOOR_ACTIONS,
+    HEALTH_RISK,
+    HIGH_RISK_THRESHOLD,
+    HOTSPOT_RISK,
+    INCIDENT_CAP,
+    INCIDENT_WEIGHT,
+    LANE_ACTIONS,
+    MEDIUM_RISK_THRESHOLD,
+    REGULAR_FILE_RISK,
+    UNKNOWN_HEALTH_RISK,
+    RiskInferenceEngine,
+)
+from .models import AssessmentRequest, AssessmentResponse, DeploymentLane
+from .priors import PriorIndex
+
+_BUILTIN_SIGNALS = {
+    "code_churn": RiskInferenceEngine._code_churn_signal,
+    "system_health": RiskInferenceEngine._system_health_signal,
+    "author_persona": RiskInferenceEngine._author_persona_signal,
+    "file_history": RiskInferenceEngine._file_history_signal,
+}
+
+
+@dataclass(frozen=True)
+class CompiledScorer:
+    score: Callable[[AssessmentRequest], Tuple[float, str]]
+    response: Callable[[AssessmentRequest], AssessmentResponse]
+
+
+def is_compilable(engine: RiskInferenceEngine) -> bool:
+    """True when `engine` scores with exactly the built-in signals, in order, unmodified."""
+    adapters = list(engine.registry)
+    if tuple(adapter.name for adapter in adapters) != tuple(_BUILTIN_SIGNALS):
+        return False
+    for adapter in adapters:
+        compute = adapter.compute
+        if getattr(compute, "__self__", None) is not engine:
+            return False
+        if getattr(compute, "__func__", None) is not _BUILTIN_SIGNALS[adapter.name]:
+            return False
+        # Blocking adapters can time out, and a stricter threshold can turn file_history
+        # (completeness 0.9) into a pessimism bias; neither is folded in.
+        if adapter.blocking or adapter.min_completeness > MIN_COMPLETENESS:
+            return False
+    engine_type = type(engine)
+    return (
+        engine_type._prior_for is RiskInferenceEngine._prior_for
+        and engine_type._has_hotspots is RiskInferenceEngine._has_hotspots
+        and engine_type._map_lane is RiskInferenceEngine._map_lane
+        and engine_type._lookup_actions is RiskInferenceEngine._lookup_actions
+    )
+
+
+def compile_scorer(
+    engine: RiskInferenceEngine,
+    high_threshold: float = HIGH_RISK_THRESHOLD,
+    medium_threshold: float = MEDIUM_RISK_THRESHOLD,
+) -> CompiledScorer:
+    if not is_compilable(engine):
+        raise ValueError(f"Only the built-in signals compile, not {engine.registry.names()}")
+    priors = engine.priors
+    base_prior = engine.base_prior
+    pessimism_bias = engine.pessimism_bias
+    static_prior = type(priors) is PriorIndex and not priors.has_priors
+    prior_for = priors.prior_for
+    has_hotspots = priors.has_hotspots
+    health_risk = HEALTH_RISK.get
+    unknown_health = UNKNOWN_HEALTH_RISK
+    lines_scale, lines_cap = CHURN_LINES_SCALE, CHURN_LINES_CAP
+    complexity_weight, complexity_cap, churn_cap = COMPLEXITY_WEIGHT, COMPLEXITY_CAP, CHURN_CAP
+    incident_weight, incident_cap = INCIDENT_WEIGHT, INCIDENT_CAP
+    author_weight, author_floor = AUTHOR_WEIGHT, AUTHOR_FLOOR
+    hotspot_risk, regular_risk = HOTSPOT_RISK, REGULAR_FILE_RISK
+    low, medium, high = (lane.value for lane in DeploymentLane)
+    actions = {lane.value: LANE_ACTIONS[lane] for lane in DeploymentLane}
+    floor_actions = HARD_FLOOR_ACTIONS
+
+    # Each expression mirrors its `RiskInferenceEngine` signal, including the order of the
+    # float additions, so scores agree exactly; `x if x < cap else cap` is `min(cap, x)`.
+    def score(request: AssessmentRequest) -> Tuple[float, str]:
+        change = request.change_metadata
+        files = change.files_modified
+        if static_prior:
+            risk = base_prior
+        else:
+            prior = prior_for(files)
+            risk = base_prior if prior is None else prior
+
+        lines = (change.lines_added + change.lines_removed) / lines_scale
+        lines = lines if lines < lines_cap else lines_cap
+        complexity = change.cyclomatic_complexity_delta * complexity_weight
+        complexity = complexity if complexity < complexity_cap else complexity_cap
+        churn = lines + complexity
+        risk += churn if churn < churn_cap else churn_cap
+
+        health = request.environment_health
+        incidents = health.open_incidents * incident_weight
+        risk += health_risk(health.status, unknown_health) + (incidents if incidents < incident_cap else incident_cap)
+
+        author = request.author
+        expertise = (author.domain_familiarity_score + author.past_success_rate) / 2
+        persona = author_weight - expertise * author_weight
+        risk += persona if persona > author_floor else author_floor
+
+        if files:
+            risk += hotspot_risk if has_hotspots(files) else regular_risk
+        else:
+            risk += pessimism_bias
+
+        if risk > 1.0:
+            risk = 1.0
+        if not request.security_scan.passed or risk > high_threshold:
+            return round(risk * 100, 2), high
+        return round(risk * 100, 2), medium if risk >= medium_threshold else low
+
+    def response(request: AssessmentRequest) -> AssessmentResponse:
+        confidence_score, lane = score(request)
+        compliant = request.security_scan.passed
+        return AssessmentResponse(
+            confidence_score=confidence_score,
+            assigned_lane=lane,
+            risk_factors=[],
+            recommended_actions=list(actions[lane] if compliant else floor_actions),
+            is_security_compliant=compliant,
+        )
+
+    return CompiledScorer(score=score, response=response)
@@ -1,57 +1,124 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
+from .adapters import AdapterRegistry, SignalAdapter, SignalOutcome
 from .models import (
     AssessmentRequest,
     AssessmentResponse,
     DeploymentLane,
+    LazyRiskFactor,
     RiskFactor,
 )
+from .priors import PriorIndex, ReloadingPriorIndex
 
+if TYPE_CHECKING:
+    from .batch import BatchAssessment
+    from .compiled import CompiledScorer
+    from .learner import LearnedPriors
 
-@dataclass
-class _SignalOutcome:
-    name: str
-    delta: float
-    completeness: float
-    description: str
-    requires_pessimism: bool = False
+HEALTH_RISK = {"healthy": 0.0, "degraded": 0.25, "critical": 0.35}
+UNKNOWN_HEALTH_RISK = 0.2
+# Signal weights and caps, shared by `assess`, the columnar scorer (`batch`) and the
+# compiled scorer (`compiled`).
+CHURN_LINES_SCALE = 1200
+CHURN_LINES_CAP = 0.35
+COMPLEXITY_WEIGHT = 0.08
+COMPLEXITY_CAP = 0.15
+CHURN_CAP = 0.45
+INCIDENT_WEIGHT = 0.02
+INCIDENT_CAP = 0.1
+AUTHOR_WEIGHT = 0.18
+AUTHOR_FLOOR = -0.1
+HOTSPOT_RISK = 0.25
+REGULAR_FILE_RISK = 0.05
+HIGH_RISK_THRESHOLD = 0.7
+MEDIUM_RISK_THRESHOLD = 0.2
+NO_FILE_HISTORY_DESCRIPTION = "No file history metadata provided"
+# "full" renders every explanation, "lazy" renders a factor's description on first
+# access, "none" (score-only) returns no risk factors at all.
+EXPLANATION_MODES = ("full", "lazy", "none")
+HARD_FLOOR_ACTIONS = (
+    "Run security/compliance scans and wait for green",
+    "Do not proceed until senior review signs off",
+)
+LANE_ACTIONS = {
+    DeploymentLane.LOW_RISK: ("Auto-canary deployment", "Monitor metrics for 15 minutes"),
+    DeploymentLane.MEDIUM_RISK: ("Run full integration suite", "Pause for manual approval", "Notify product owner"),
+    DeploymentLane.HIGH_RISK: (
+        "Request senior review",
+        "Extend soak time before full rollout",
+        "Create incident readiness alert",
+    ),
+}
 
 
 class RiskInferenceEngine:
-    def __init__(self, base_prior: float = 0.1, pessimism_bias: float = 0.15):
+    def __init__(
+        self,
+        base_prior: float = 0.1,
+        pessimism_bias: float = 0.15,
+        registry: Optional[AdapterRegistry] = None,
+        adapter_deadline: Optional[float] = None,
+        priors: PriorIndex | ReloadingPriorIndex | LearnedPriors | None = None,
+        explanations: str = "full",
+    ):
+        if explanations not in EXPLANATION_MODES:
+            raise ValueError(f"explanations must be one of {EXPLANATION_MODES}, not {explanations!r}")
         self.base_prior = base_prior
         self.pessimism_bias = pessimism_bias
+        # Per-module priors and hotspot rules; `base_prior` applies where no rule sets a prior.
+        self.priors = priors if priors is not None else PriorIndex()
+        self.registry = registry if registry is not None else AdapterRegistry(self.builtin_adapters())
+        self.adapter_deadline = adapter_deadline
+        self.explanations = explanations
+        self._compiled: Optional[tuple] = None
+
+    def builtin_adapters(self) -> List[SignalAdapter]:
+        return [
+            SignalAdapter("code_churn", self._code_churn_signal, inputs=("change_metadata",)),
+            SignalAdapter("system_health", self._system_health_signal, inputs=("environment_health",)),
+            SignalAdapter("author_persona", self._author_persona_signal, inputs=("author",)),
+            SignalAdapter("file_history", self._file_history_signal, inputs=("change_metadata",)),
+        ]
+
+    def fingerprint(self) -> tuple:
+        """Engine state besides the request that determines `assess` output (result cache keys)."""
+        return (
+            self.base_prior,
+            self.pessimism_bias,
+            self.adapter_deadline,
+            self.explanations,
+            self.registry.names(),
+            self.registry.version,
+            getattr(self.priors, "version", None),
+        )
 
-    def assess(self, request: AssessmentRequest) -> AssessmentResponse:
-        signals = self._collect_signals(request)
-        score = self.base_prior
+    def assess(
+        self, request: AssessmentRequest, deadline: Optional[float] = None, explanations: Optional[str] = None
+    ) -> AssessmentResponse:
+        """Score `request`; `explanations` overrides the engine's mode for this call."""
+        mode = self.explanations if explanations is None else explanations
+        if mode == "none":
+            scorer = self._scorer()
+            if scorer is not None:
+                return scorer.response(request)
+        signals = self._collect_signals(request, self.adapter_deadline if deadline is None else deadline)
+        explain = mode != "none"
+        lazy = mode == "lazy"
+        score = self._prior_for(request)
         risk_factors: List[RiskFactor] = []
 
         for signal in signals:
-            delta = signal.delta
-            if signal.requires_pessimism or signal.completeness < 0.6:
+            if signal.requires_pessimism:
                 score += self.pessimism_bias
-                reason = f"{signal.name}: +{self.pessimism_bias:.2f} (missing or incomplete data)"
-                risk_factors.append(
-                    RiskFactor(
-                        vector=signal.name,
-                        impact_percentage=round(self.pessimism_bias * 100, 2),
-                        description=reason,
-                    )
-                )
+                if explain:
+                    risk_factors.append(self._pessimism_factor(signal.name, lazy))
                 continue
 
-            score += delta
-            risk_factors.append(
-                RiskFactor(
-                    vector=signal.name,
-                    impact_percentage=round(delta * 100, 2),
-                    description=signal.description,
-                )
-            )
+            score += signal.delta
+            if explain:
+                risk_factors.append(_signal_factor(signal, lazy))
 
         score = min(score, 1.0)
         confidence_score = round(score * 100, 2)
@@ -61,17 +128,9 @@ class RiskInferenceEngine:
 
         if not compliance:
             lane = DeploymentLane.HIGH_RISK
-            recommended_actions = [
-                "Run security/compliance scans and wait for green",
-                "Do not proceed until senior review signs off",
-            ]
-            risk_factors.append(
-                RiskFactor(
-                    vector="security_scan",
-                    impact_percentage=100.0,
-                    description="Security/compliance scan failed or missing; hard floor triggered",
-                )
-            )
+            recommended_actions = list(HARD_FLOOR_ACTIONS)
+            if explain:
+                risk_factors.append(_hard_floor_factor())
 
         return AssessmentResponse(
             confidence_score=confidence_score,
@@ -81,99 +140,172 @@ class RiskInferenceEngine:
             is_security_compliant=compliance,
         )
 
-    def _collect_signals(self, request: AssessmentRequest) -> List[_SignalOutcome]:
-        signals: List[_SignalOutcome] = []
-        signals.append(self._code_churn_signal(request.change_metadata))
-        signals.append(self._system_health_signal(request.environment_health))
-        signals.append(self._author_persona_signal(request.author))
-        signals.append(self._file_history_signal(request.change_metadata))
-        return signals
+    def compile(self) -> "CompiledScorer":
+        """Flat scorer for this configuration (see `prob_pipeline.compiled`), rebuilt after changes."""
+        scorer = self._scorer()
+        if scorer is None:
+            raise ValueError(f"Only the built-in signals compile, not {self.registry.names()}")
+        return scorer
+
+    def _scorer(self) -> Optional["CompiledScorer"]:
+        key = (self.registry, self.registry.version, self.priors, self.base_prior, self.pessimism_bias)
+        if self._compiled is None or self._compiled[0] != key:
+            from .compiled import compile_scorer, is_compilable
+
+            self._compiled = (key, compile_scorer(self) if is_compilable(self) else None)
+        return self._compiled[1]
 
-    def _code_churn_signal(self, change) -> _SignalOutcome:
+    def _prior_for(self, request: AssessmentRequest) -> float:
+        prior = self.priors.prior_for(request.change_metadata.files_modified)
+        return self.base_prior if prior is None else prior
+
+    def _collect_signals(self, request: AssessmentRequest, deadline: Optional[float] = None) -> List[SignalOutcome]:
+        return self.registry.collect(request, deadline)
+
+    def _code_churn_signal(self, request: AssessmentRequest) -> SignalOutcome:
+        change = request.change_metadata
         total_changes = change.lines_added + change.lines_removed
-        lines_component = min(0.35, total_changes / 1200)
-        complexity_component = min(0.15, change.cyclomatic_complexity_delta * 0.08)
-        churn_score = min(0.45, lines_component + complexity_component)
-        description = (
-            f"{total_changes} changed lines ({lines_component:.2f} risk) and complexity delta "
-            f"{change.cyclomatic_complexity_delta:.2f} ({complexity_component:.2f} risk) "
-            f"combine for {churn_score:.2f}"
-        )
-        explanation = (
-            f"Line churn contributes {round(lines_component * 100, 2)}% risk; complexity delta "
-            f"contributes {round(complexity_component * 100, 2)}% risk"
-        )
-        return _SignalOutcome(
+        lines_component = min(CHURN_LINES_CAP, total_changes / CHURN_LINES_SCALE)
+        complexity_component = min(COMPLEXITY_CAP, change.cyclomatic_complexity_delta * COMPLEXITY_WEIGHT)
+        churn_score = min(CHURN_CAP, lines_component + complexity_component)
+        return SignalOutcome(
             name="code_churn",
             delta=churn_score,
             completeness=1.0,
-            description=f"+{round(churn_score * 100, 2)}% risk ({description}); {explanation}",
+            description="",
+            render=_describe_churn,
+            details=(
+                total_changes,
+                lines_component,
+                change.cyclomatic_complexity_delta,
+                complexity_component,
+                churn_score,
+            ),
         )
 
-    def _system_health_signal(self, health) -> _SignalOutcome:
-        mapping = {"healthy": 0.0, "degraded": 0.25, "critical": 0.35}
-        delta = mapping.get(health.status, 0.2)
-        incident_penalty = min(0.1, health.open_incidents * 0.02)
+    def _system_health_signal(self, request: AssessmentRequest) -> SignalOutcome:
+        health = request.environment_health
+        delta = HEALTH_RISK.get(health.status, UNKNOWN_HEALTH_RISK)
+        incident_penalty = min(INCIDENT_CAP, health.open_incidents * INCIDENT_WEIGHT)
         delta += incident_penalty
-        description = (
-            f"{health.status} environment with {health.open_incidents} open incidents"
-        )
-        return _SignalOutcome(
+        return SignalOutcome(
             name="system_health",
             delta=delta,
             completeness=1.0,
-            description=f"+{round(delta * 100, 2)}% risk ({description})",
+            description="",
+            render=_describe_health,
+            details=(health.status, health.open_incidents, delta),
         )
 
-    def _author_persona_signal(self, author) -> _SignalOutcome:
+    def _author_persona_signal(self, request: AssessmentRequest) -> SignalOutcome:
+        author = request.author
         expertise = (author.domain_familiarity_score + author.past_success_rate) / 2
-        delta = max(-0.1, 0.18 - expertise * 0.18)
-        description = (
-            f"familiarity {author.domain_familiarity_score:.2f}, success {author.past_success_rate:.2f}"
-        )
-        return _SignalOutcome(
+        delta = max(AUTHOR_FLOOR, AUTHOR_WEIGHT - expertise * AUTHOR_WEIGHT)
+        return SignalOutcome(
             name="author_persona",
             delta=delta,
             completeness=1.0,
-            description=f"{round(delta * 100, 2)}% risk ({description})",
+            description="",
+            render=_describe_author,
+            details=(author.domain_familiarity_score, author.past_success_rate, delta),
         )
 
-    def _file_history_signal(self, change) -> _SignalOutcome:
-        hotspots = [f for f in change.files_modified if "critical" in f or "hotspot" in f]
+    def _file_history_signal(self, request: AssessmentRequest) -> SignalOutcome:
+        change = request.change_metadata
+        hotspots = self._has_hotspots(change.files_modified)
         if not change.files_modified:
-            return _SignalOutcome(
+            return SignalOutcome(
                 name="file_history",
                 delta=0.0,
                 completeness=0.0,
-                description="No file history metadata provided",
+                description=NO_FILE_HISTORY_DESCRIPTION,
                 requires_pessimism=True,
             )
 
-        delta = 0.25 if hotspots else 0.05
-        description = (
-            f"{'hotspot' if hotspots else 'regular'} files changed ({len(change.files_modified)} files)"
-        )
-        return _SignalOutcome(
+        delta = HOTSPOT_RISK if hotspots else REGULAR_FILE_RISK
+        return SignalOutcome(
             name="file_history",
             delta=delta,
             completeness=0.9,
-            description=f"+{round(delta * 100, 2)}% risk ({description})",
+            description="",
+            render=_describe_file_history,
+            details=(hotspots, len(change.files_modified), delta),
         )
 
+    def _has_hotspots(self, files: List[str]) -> bool:
+        return self.priors.has_hotspots(files)
+
+    def assess_batch(self, batch) -> "BatchAssessment":
+        """Score a columnar batch in one vectorized pass; see `prob_pipeline.batch`."""
+        from .batch import assess_columns
+
+        return assess_columns(self, batch)
+
+    def _pessimism_factor(self, name: str, lazy: bool = False) -> RiskFactor:
+        impact = round(self.pessimism_bias * 100, 2)
+        if lazy:
+            return LazyRiskFactor(name, impact, _describe_pessimism, (name, self.pessimism_bias))
+        description = _describe_pessimism(name, self.pessimism_bias)
+        return RiskFactor(vector=name, impact_percentage=impact, description=description)
+
     def _map_lane(self, score: float) -> DeploymentLane:
-        if score > 0.7:
+        if score > HIGH_RISK_THRESHOLD:
             return DeploymentLane.HIGH_RISK
-        if score >= 0.2:
+        if score >= MEDIUM_RISK_THRESHOLD:
             return DeploymentLane.MEDIUM_RISK
         return DeploymentLane.LOW_RISK
 
     def _lookup_actions(self, lane: DeploymentLane) -> List[str]:
-        if lane == DeploymentLane.LOW_RISK:
-            return ["Auto-canary deployment", "Monitor metrics for 15 minutes"]
-        if lane == DeploymentLane.MEDIUM_RISK:
-            return ["Run full integration suite", "Pause for manual approval", "Notify product owner"]
-        return [
-            "Request senior review",
-            "Extend soak time before full rollout",
-            "Create incident readiness alert",
-        ]
+        return list(LANE_ACTIONS[lane])
+
+
+def _signal_factor(signal: SignalOutcome, lazy: bool) -> RiskFactor:
+    impact = round(signal.delta * 100, 2)
+    if lazy and signal.render is not None:
+        return LazyRiskFactor(signal.name, impact, signal.render, signal.details)
+    return RiskFactor(vector=signal.name, impact_percentage=impact, description=signal.explain())
+
+
+def _describe_pessimism(name: str, bias: float) -> str:
+    return f"{name}: +{bias:.2f} (missing or incomplete data)"
+
+
+def _describe_churn(
+    total_changes: int,
+    lines_component: float,
+    complexity_delta: float,
+    complexity_component: float,
+    churn_score: float,
+) -> str:
+    description = (
+        f"{total_changes} changed lines ({lines_component:.2f} risk) and complexity delta "
+        f"{complexity_delta:.2f} ({complexity_component:.2f} risk) "
+        f"combine for {churn_score:.2f}"
+    )
+    explanation = (
+        f"Line churn contributes {round(lines_component * 100, 2)}% risk; complexity delta "
+        f"contributes {round(complexity_component * 100, 2)}% risk"
+    )
+    return f"+{round(churn_score * 100, 2)}% risk ({description}); {explanation}"
+
+
+def _describe_health(status: str, open_incidents: int, delta: float) -> str:
+    return f"+{round(delta * 100, 2)}% risk ({status} environment with {open_incidents} open incidents)"
+
+
+def _describe_author(familiarity: float, success_rate: float, delta: float) -> str:
+    description = f"familiarity {familiarity:.2f}, success {success_rate:.2f}"
+    return f"{round(delta * 100, 2)}% risk ({description})"
+
+
+def _describe_file_history(has_hotspots: bool, file_count: int, delta: float) -> str:
+    description = f"{'hotspot' if has_hotspots else 'regular'} files changed ({file_count} files)"
+    return f"+{round(delta * 100, 2)}% risk ({description})"
+
+
+def _hard_floor_factor() -> RiskFactor:
+    return RiskFactor(
+        vector="security_scan",
+        impact_percentage=100.0,
+        description="Security/compliance scan failed or missing; hard floor triggered",
+    )
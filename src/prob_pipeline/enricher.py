@@ -1,14 +1,39 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
 import subprocess
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache import TTLCache
+from .history import REVERT_KEYWORDS, CommitIndex, RepoRefs, history_cutoff
+from .metrics import METRICS
+from .paths import collapse_paths, intern_paths, pathspec_chunks
+from .shared_history import shared_index_from_env
+
+# One `git log` line per commit: hash and subject, so chunked pathspec queries can be
+# merged by hash before counting.
+_LOG_PRETTY = "%H%x1f%s"
+
 
 class ContextEnricher:
-    def __init__(self, repo_path: Path | str = Path("."), history_days: int = 90):
+    def __init__(
+        self,
+        repo_path: Path | str = Path("."),
+        history_days: int = 90,
+        index: CommitIndex | bool = True,
+        cache_size: int = 4096,
+        cache_ttl: float = 300.0,
+    ):
         self.repo_path = Path(repo_path)
         self.history_days = history_days
+        if index is True:
+            index = shared_index_from_env(self.repo_path, history_days) or CommitIndex(self.repo_path, history_days)
+        self.index: Optional[CommitIndex] = index or None
+        self.refs = self.index.refs if self.index is not None else RepoRefs(self.repo_path)
+        # Keyed by (author, normalized file set, HEAD): a new commit changes the key,
+        # the TTL bounds staleness from history-window drift.
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
 
     def enrich_payload(self, payload: dict) -> dict:
         data = payload.get("request", payload)
@@ -23,47 +48,134 @@ class ContextEnricher:
     def derive_author_scores(self, author_id: str | None, files: Iterable[str]) -> Tuple[float, float]:
         if not author_id:
             return 0.2, 0.3
-        commit_count = self._count_commits(author_id, files)
+        key = self._cache_key(author_id, files)
+        scores = self.cache.get(key)
+        if scores is None:
+            scores = self._scores(*self._history_counts(author_id, key[1]))
+            self.cache.set(key, scores)
+        return scores
+
+    def _cache_key(self, author_id: str, files: Iterable[str]) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+        return author_id, tuple(sorted(intern_paths(files))), self.refs.resolve_head()
+
+    @staticmethod
+    def _scores(commit_count: int, success_count: int) -> Tuple[float, float]:
         familiarity = min(1.0, commit_count / 20)
-        success_count = self._count_successful_commits(author_id, files)
         if commit_count:
             past_success = min(1.0, success_count / commit_count)
         else:
             past_success = 0.5
         return familiarity, past_success
 
-    def _count_commits(self, author_id: str, files: Iterable[str]) -> int:
-        since = (datetime.utcnow() - timedelta(days=self.history_days)).strftime("%Y-%m-%d")
-        args = ["log", f"--since={since}", "--author", author_id, "--pretty=format:%H"]
-        args.extend(self._file_args(files))
-        output = self._run_git(args)
-        return sum(1 for line in output.splitlines() if line)
-
-    def _count_successful_commits(self, author_id: str, files: Iterable[str]) -> int:
-        since = (datetime.utcnow() - timedelta(days=self.history_days)).strftime("%Y-%m-%d")
-        args = ["log", f"--since={since}", "--author", author_id, "--pretty=format:%s"]
-        args.extend(self._file_args(files))
-        output = self._run_git(args)
-        keywords = ("revert", "rollback")
-        return sum(1 for line in output.splitlines() if line and not any(keyword in line.lower() for keyword in keywords))
-
-    def _file_args(self, files: Iterable[str]) -> List[str]:
-        args: List[str] = []
-        files = [f for f in files if f]
-        if files:
-            args.append("--")
-            args.extend(files)
-        return args
+    def _history_counts(self, author_id: str, files: Iterable[str]) -> Tuple[int, int]:
+        if self.index is not None and self.index.available():
+            return self.index.counts(author_id, files)
+        return _count_log(self._run_git(args) for args in self._log_queries(author_id, files))
+
+    def _log_queries(self, author_id: str, files: Iterable[str]) -> List[List[str]]:
+        """`git log` argument lists for the author's commits touching `files`, one per pathspec chunk.
+
+        Specs are deduplicated and collapsed into directories past `MAX_PATHSPECS`, and
+        split so that no command line approaches ARG_MAX.
+        """
+        args = ["log", f"--since=@{history_cutoff(self.history_days)}", "--author", author_id]
+        args.append(f"--pretty=format:{_LOG_PRETTY}")
+        specs = collapse_paths(intern_paths(files))
+        if not specs:
+            return [args]
+        return [[*args, "--", *chunk] for chunk in pathspec_chunks(specs)]
 
     def _run_git(self, args: List[str]) -> str:
         try:
-            result = subprocess.run(
-                ["git", *args],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=False,
-            )
+            with METRICS.timer("git", args[0]):
+                result = subprocess.run(
+                    ["git", *args],
+                    cwd=self.repo_path,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
             return result.stdout.strip()
         except Exception:
             return ""
+
+
+class AsyncContextEnricher:
+    """Non-blocking front end for `ContextEnricher` used by the async API handlers.
+
+    Index lookups run on the event loop; only a HEAD move (which forks git to ingest
+    new commits) is pushed to a worker thread. Without an index the two `git log`
+    queries run as asyncio subprocesses. Concurrent lookups for the same author and
+    file set share one in-flight operation.
+    """
+
+    def __init__(self, enricher: Optional[ContextEnricher] = None):
+        self.enricher = enricher or ContextEnricher()
+        self._inflight: Dict[Tuple[str, Tuple[str, ...], Optional[str]], asyncio.Future] = {}
+
+    async def enrich_payload(self, payload: dict) -> dict:
+        data = payload.get("request", payload)
+        author = data.setdefault("author", {})
+        change = data.get("change_metadata", {})
+        files = change.get("files_modified", [])
+        familiarity, success_rate = await self.derive_author_scores(author.get("id"), files)
+        author.setdefault("domain_familiarity_score", familiarity)
+        author.setdefault("past_success_rate", success_rate)
+        return payload
+
+    async def derive_author_scores(self, author_id: str | None, files: Iterable[str]) -> Tuple[float, float]:
+        if not author_id:
+            return 0.2, 0.3
+        key = self.enricher._cache_key(author_id, files)
+        scores = self.enricher.cache.get(key)
+        if scores is not None:
+            return scores
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._derive(key))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _derive(self, key: Tuple[str, Tuple[str, ...], Optional[str]]) -> Tuple[float, float]:
+        author_id, files, _ = key
+        scores = self.enricher._scores(*await self._history_counts(author_id, files))
+        self.enricher.cache.set(key, scores)
+        return scores
+
+    async def _history_counts(self, author_id: str, files: Tuple[str, ...]) -> Tuple[int, int]:
+        index = self.enricher.index
+        if index is not None and index.available():
+            if index.resolve_head() != index.head:
+                await asyncio.to_thread(index.refresh)
+            return index.counts(author_id, files)
+        queries = self.enricher._log_queries(author_id, files)
+        # Chunks run one after another so a huge diff cannot fork a burst of git processes.
+        return _count_log([await self._run_git(args) for args in queries])
+
+    async def _run_git(self, args: List[str]) -> str:
+        try:
+            with METRICS.timer("git", args[0]):
+                process = await asyncio.create_subprocess_exec(
+                    "git",
+                    *args,
+                    cwd=self.enricher.repo_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                stdout, _ = await process.communicate()
+            return stdout.decode(errors="replace").strip()
+        except Exception:
+            return ""
+
+
+def _count_log(outputs: Iterable[str]) -> Tuple[int, int]:
+    """`(commits, successful commits)` from `_LOG_PRETTY` outputs, counting each hash once."""
+    subjects: Dict[str, str] = {}
+    for output in outputs:
+        for line in output.splitlines():
+            sha, _, subject = line.partition("\x1f")
+            if sha:
+                subjects[sha] = subject.lower()
+    successful = sum(1 for subject in subjects.values() if not any(keyword in subject for keyword in REVERT_KEYWORDS))
+    return len(subjects), successful
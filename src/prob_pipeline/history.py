@@ -0,0 +1,314 @@
+"""In-process index over recent git history used by the context enricher."""
+from __future__ import annotations
+
+import fnmatch
+import posixpath
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .metrics import METRICS
+
+REVERT_KEYWORDS = ("revert", "rollback")
+_RECORD_SEP = "\x1e"
+_FIELD_SEP = "\x1f"
+_LOG_FORMAT = f"--pretty=format:{_RECORD_SEP}%H{_FIELD_SEP}%ct{_FIELD_SEP}%an <%ae>{_FIELD_SEP}%s"
+_GLOB_CHARS = ("*", "?", "[")
+
+
+def history_cutoff(history_days: int) -> int:
+    """Unix timestamp of the oldest commit inside the history window."""
+    return int(time.time()) - history_days * 86400
+
+
+@dataclass(frozen=True)
+class CommitRecord:
+    sha: str
+    author: str
+    timestamp: int
+    paths: Tuple[str, ...]
+    is_revert: bool
+
+
+@dataclass
+class _Snapshot:
+    head: Optional[str]
+    by_author: Dict[str, List[CommitRecord]] = field(default_factory=dict)
+    # Inverted index: every touched path and each of its parent directories -> commits.
+    by_path: Dict[str, List[CommitRecord]] = field(default_factory=dict)
+    author_matches: Dict[str, List[str]] = field(default_factory=dict)
+
+
+class RepoRefs:
+    """Resolves HEAD by reading ref files directly, so callers can poll it without forking git."""
+
+    def __init__(self, repo_path: Path | str = Path(".")):
+        self.repo_path = Path(repo_path)
+        self.prefix = ""
+        self._located = False
+        self._git_dir: Optional[Path] = None
+        self._common_dir: Optional[Path] = None
+
+    def resolve_head(self) -> Optional[str]:
+        if not self._locate():
+            return None
+        try:
+            content = (self._git_dir / "HEAD").read_text().strip()
+        except OSError:
+            return None
+        if not content.startswith("ref:"):
+            return content or None
+        return self._read_ref(content[4:].strip())
+
+    def _read_ref(self, ref: str) -> Optional[str]:
+        for base in (self._git_dir, self._common_dir):
+            try:
+                value = (base / ref).read_text().strip()
+            except OSError:
+                continue
+            if value:
+                return value
+        try:
+            packed = (self._common_dir / "packed-refs").read_text()
+        except OSError:
+            return None
+        for line in packed.splitlines():
+            if line.endswith(" " + ref):
+                return line.split(" ", 1)[0]
+        return None
+
+    def _locate(self) -> bool:
+        if self._located:
+            return self._git_dir is not None
+        self._located = True
+        output = _git(self.repo_path, ["rev-parse", "--absolute-git-dir", "--git-common-dir", "--show-prefix"])
+        lines = output.split("\n") if output else []
+        if len(lines) < 2:
+            return False
+        self._git_dir = Path(lines[0])
+        common = Path(lines[1])
+        self._common_dir = common if common.is_absolute() else (self.repo_path / common).resolve()
+        self.prefix = lines[2].strip() if len(lines) > 2 else ""
+        return True
+
+
+class CommitIndex:
+    """Commit history for one repository, built from a single `git log --name-only` stream.
+
+    The index is refreshed lazily: every query resolves HEAD by reading the ref files
+    directly, and only when HEAD has moved does it fork git again to pull in the new
+    commits (or rebuild from scratch when history was rewritten).
+
+    Commits are indexed both by author and by path (each file and its parent
+    directories), and a query walks whichever candidate list is shorter, so its cost
+    follows the number of commits matching the author or the literal file specs rather
+    than the size of the history window. Glob specs always use the author list.
+    """
+
+    def __init__(self, repo_path: Path | str = Path("."), history_days: int = 90):
+        self.repo_path = Path(repo_path)
+        self.history_days = history_days
+        self.refs = RepoRefs(self.repo_path)
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(head=None)
+
+    @property
+    def head(self) -> Optional[str]:
+        return self._snapshot.head
+
+    def counts(self, author_id: str, files: Iterable[str]) -> Tuple[int, int]:
+        """Return `(commit_count, successful_commit_count)` for the author within the window."""
+        self.refresh()
+        specs = self._normalize_specs(files)
+        cutoff = history_cutoff(self.history_days)
+        snapshot = self._snapshot
+        identities = self._identities(author_id, snapshot)
+        by_author = [snapshot.by_author.get(identity, ()) for identity in identities]
+        if specs is not None and not specs[1]:
+            by_path = [snapshot.by_path.get(spec, ()) for spec in specs[0]]
+            if sum(map(len, by_path)) < sum(map(len, by_author)):
+                return self._count_path_matches(by_path, set(identities), cutoff)
+        total = 0
+        successful = 0
+        for records in by_author:
+            for record in records:
+                if record.timestamp < cutoff:
+                    continue
+                if specs is not None and not self._touches(record, specs):
+                    continue
+                total += 1
+                if not record.is_revert:
+                    successful += 1
+        return total, successful
+
+    def available(self) -> bool:
+        """False when HEAD cannot be read from the ref files (unborn branch, reftable, not a repo)."""
+        return self.resolve_head() is not None
+
+    @staticmethod
+    def _count_path_matches(
+        by_path: List[List[CommitRecord]], identities: set, cutoff: int
+    ) -> Tuple[int, int]:
+        seen = set()
+        total = 0
+        successful = 0
+        for records in by_path:
+            for record in records:
+                if record.author not in identities or record.timestamp < cutoff or id(record) in seen:
+                    continue
+                seen.add(id(record))
+                total += 1
+                if not record.is_revert:
+                    successful += 1
+        return total, successful
+
+    def refresh(self) -> None:
+        head = self.resolve_head()
+        if head == self._snapshot.head:
+            return
+        with self._lock:
+            current = self._snapshot
+            if head == current.head:
+                return
+            if head is not None and current.head is not None and self._is_ancestor(current.head, head):
+                by_author = dict(current.by_author)
+                by_path = dict(current.by_path)
+                added = self._parse(self._log(f"{current.head}..{head}"))
+                for author, records in added.items():
+                    by_author[author] = records + by_author.get(author, [])
+                for path, records in _path_index(added).items():
+                    by_path[path] = records + by_path.get(path, [])
+            else:
+                by_author = self._parse(self._log(head)) if head is not None else {}
+                by_path = _path_index(by_author)
+            # Readers cache author matches on the snapshot they hold, so a reader that
+            # raced this swap can only ever write into the retired snapshot.
+            self._snapshot = _Snapshot(head=head, by_author=by_author, by_path=by_path)
+
+    def resolve_head(self) -> Optional[str]:
+        return self.refs.resolve_head()
+
+    def _log(self, revision: str) -> str:
+        return self._git(
+            ["log", revision, f"--since=@{history_cutoff(self.history_days)}", "--name-only", "--no-renames", _LOG_FORMAT]
+        )
+
+    @staticmethod
+    def _parse(output: str) -> Dict[str, List[CommitRecord]]:
+        parsed: Dict[str, List[CommitRecord]] = {}
+        for chunk in output.split(_RECORD_SEP):
+            if not chunk.strip():
+                continue
+            header, _, body = chunk.partition("\n")
+            fields = header.split(_FIELD_SEP)
+            if len(fields) != 4:
+                continue
+            sha, timestamp, author, subject = fields
+            lowered = subject.lower()
+            record = CommitRecord(
+                sha=sha,
+                author=author,
+                timestamp=int(timestamp),
+                paths=tuple(line for line in body.splitlines() if line),
+                is_revert=any(keyword in lowered for keyword in REVERT_KEYWORDS),
+            )
+            parsed.setdefault(author, []).append(record)
+        return parsed
+
+    @staticmethod
+    def _identities(author_id: str, snapshot: _Snapshot) -> List[str]:
+        matches = snapshot.author_matches.get(author_id)
+        if matches is None:
+            try:
+                pattern = re.compile(author_id)
+            except re.error:
+                pattern = re.compile(re.escape(author_id))
+            matches = [identity for identity in snapshot.by_author if pattern.search(identity)]
+            snapshot.author_matches[author_id] = matches
+        return matches
+
+    def _normalize_specs(self, files: Iterable[str]) -> Optional[Tuple[frozenset, Tuple[str, ...]]]:
+        literal = set()
+        globs = []
+        for spec in files:
+            if not spec:
+                continue
+            path = posixpath.normpath(posixpath.join(self.refs.prefix, spec))
+            if any(char in path for char in _GLOB_CHARS):
+                globs.append(path)
+            else:
+                literal.add(path)
+        if not literal and not globs:
+            return None
+        return frozenset(literal), tuple(globs)
+
+    @staticmethod
+    def _touches(record: CommitRecord, specs: Tuple[frozenset, Tuple[str, ...]]) -> bool:
+        literal, globs = specs
+        for path in record.paths:
+            if path in literal:
+                return True
+            parent = path
+            while "/" in parent:
+                parent = parent.rsplit("/", 1)[0]
+                if parent in literal:
+                    return True
+            if globs and any(fnmatch.fnmatchcase(path, pattern) for pattern in globs):
+                return True
+        return False
+
+    def _is_ancestor(self, old: str, new: str) -> bool:
+        try:
+            result = subprocess.run(
+                ["git", "merge-base", "--is-ancestor", old, new],
+                cwd=self.repo_path,
+                capture_output=True,
+                check=False,
+            )
+        except Exception:
+            return False
+        return result.returncode == 0
+
+    def _git(self, args: List[str]) -> str:
+        return _git(self.repo_path, args)
+
+
+def _path_index(by_author: Dict[str, List[CommitRecord]]) -> Dict[str, List[CommitRecord]]:
+    """Map each path and parent directory to its commits, newest first like `by_author`."""
+    records = sorted(
+        (record for author_records in by_author.values() for record in author_records),
+        key=lambda record: record.timestamp,
+        reverse=True,
+    )
+    index: Dict[str, List[CommitRecord]] = {}
+    for record in records:
+        keys = set()
+        for path in record.paths:
+            keys.add(path)
+            while "/" in path:
+                path = path.rsplit("/", 1)[0]
+                keys.add(path)
+        for key in keys:
+            index.setdefault(key, []).append(record)
+    return index
+
+
+def _git(repo_path: Path, args: List[str]) -> str:
+    try:
+        with METRICS.timer("git", args[0]):
+            result = subprocess.run(
+                ["git", *args],
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+    except Exception:
+        return ""
+    if result.returncode != 0:
+        return ""
+    return result.stdout
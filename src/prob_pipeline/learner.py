@@ -0,0 +1,359 @@
+"""Online per-module Beta posteriors learned from the outcome log.
+
+`PriorLearner` consumes outcome events and keeps a Beta(alpha, beta) posterior per
+module, where alpha counts failed deployments and beta successful ones on top of a
+pseudo-count prior centred on `base_prior`. Each event is an O(1) update per module.
+
+Events are JSON objects, one per line, read from `OutcomeLogger` files and explicit
+label files:
+
+- Routed outcomes (as written by `OutcomeLogger.log`) carrying `commit_id` and
+  `files` register which modules a commit touched.
+- Labels carry `outcome` (`rollback`, `incident`, `failure`, `success`, ...) plus
+  either `files`/`modules` or a `commit_id` seen earlier in a routed outcome.
+
+Modules are the first `module_depth` directories of a path. The learner publishes
+its posteriors as an immutable snapshot file replaced atomically; `PosteriorSnapshot`
+memory-maps the current file and `LearnedPriors` exposes it to `RiskInferenceEngine`,
+so engines in any number of processes read fresh priors without reloading or locks.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import posixpath
+import struct
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .priors import PriorIndex
+
+FAILURE_OUTCOMES = frozenset(("rollback", "reverted", "incident", "failure", "failed"))
+SUCCESS_OUTCOMES = frozenset(("success", "succeeded", "deployed", "healthy"))
+SNAPSHOT_MAGIC = b"PPBETA01"
+# magic, module_depth, reserved, alpha0, beta0, record count
+_HEADER = struct.Struct("<8sIIddQ")
+_RECORD = np.dtype([("key", "<u8"), ("alpha", "<f8"), ("beta", "<f8")])
+
+
+def module_of(path: str, depth: int = 2) -> str:
+    parts = posixpath.normpath(path.strip().lstrip("/")).split("/")[:-1]
+    return "/".join(parts[:depth]) if parts else "."
+
+
+def module_key(module: str) -> int:
+    return int.from_bytes(hashlib.blake2b(module.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class PriorLearner:
+    def __init__(
+        self, base_prior: float = 0.1, strength: float = 10.0, module_depth: int = 2, max_commits: int = 100_000
+    ):
+        self.alpha0 = base_prior * strength
+        self.beta0 = (1.0 - base_prior) * strength
+        self.module_depth = module_depth
+        self.max_commits = max_commits
+        self.posteriors: Dict[str, List[float]] = {}
+        self._commit_modules: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self.events = 0
+
+    def observe(self, event: dict) -> int:
+        """Apply one event; returns the number of module posteriors it updated."""
+        self.events += 1
+        modules = self._modules(event)
+        commit_id = event.get("commit_id")
+        outcome = str(event.get("outcome", "")).lower()
+        if commit_id and modules and not outcome:
+            self._remember(commit_id, modules)
+        if not outcome:
+            return 0
+        if not modules and commit_id:
+            modules = self._commit_modules.get(commit_id, ())
+        if outcome in FAILURE_OUTCOMES:
+            failed = True
+        elif outcome in SUCCESS_OUTCOMES:
+            failed = False
+        else:
+            return 0
+        for module in modules:
+            self.update(module, failed)
+        return len(modules)
+
+    def update(self, module: str, failed: bool) -> None:
+        posterior = self.posteriors.get(module)
+        if posterior is None:
+            posterior = self.posteriors[module] = [self.alpha0, self.beta0]
+        posterior[0 if failed else 1] += 1.0
+
+    def mean(self, module: str) -> float:
+        alpha, beta = self.posteriors.get(module, (self.alpha0, self.beta0))
+        return alpha / (alpha + beta)
+
+    def write_snapshot(self, path: Path | str) -> None:
+        path = Path(path)
+        records = np.empty(len(self.posteriors), dtype=_RECORD)
+        for row, (module, (alpha, beta)) in enumerate(self.posteriors.items()):
+            records[row] = (module_key(module), alpha, beta)
+        records.sort(order="key")
+        header = _HEADER.pack(SNAPSHOT_MAGIC, self.module_depth, 0, self.alpha0, self.beta0, len(records))
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with temporary.open("wb") as handle:
+            handle.write(header)
+            handle.write(records.tobytes())
+        os.replace(temporary, path)
+
+    def _modules(self, event: dict) -> Tuple[str, ...]:
+        modules = event.get("modules")
+        if modules:
+            return tuple(dict.fromkeys(modules))
+        files = event.get("files")
+        if files:
+            return tuple(dict.fromkeys(module_of(path, self.module_depth) for path in files))
+        return ()
+
+    def _remember(self, commit_id: str, modules: Tuple[str, ...]) -> None:
+        self._commit_modules[commit_id] = modules
+        self._commit_modules.move_to_end(commit_id)
+        if len(self._commit_modules) > self.max_commits:
+            self._commit_modules.popitem(last=False)
+
+
+class OutcomeTailer:
+    """Follows JSONL files like `tail -F`, including `BufferedOutcomeLogger` rotation.
+
+    Only complete lines are returned; a rotated file is read to its end before the
+    new file at the same path is opened. Unparseable lines are skipped.
+    """
+
+    def __init__(self, paths: Iterable[Path | str]):
+        self.paths = [Path(path) for path in paths]
+        self._handles: Dict[Path, IO[bytes]] = {}
+        self._partial: Dict[Path, bytes] = {}
+
+    def poll(self) -> Iterator[dict]:
+        for path in self.paths:
+            yield from self._poll(path)
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    def _poll(self, path: Path) -> Iterator[dict]:
+        handle = self._handles.get(path)
+        if handle is None:
+            if not path.exists():
+                return
+            handle = self._handles[path] = path.open("rb")
+        yield from self._drain(path, handle)
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            return
+        opened = os.fstat(handle.fileno())
+        if (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev) or current.st_size < handle.tell():
+            handle.close()
+            self._partial.pop(path, None)
+            handle = self._handles[path] = path.open("rb")
+            yield from self._drain(path, handle)
+
+    def _drain(self, path: Path, handle: IO[bytes]) -> Iterator[dict]:
+        data = self._partial.pop(path, b"") + handle.read()
+        lines = data.split(b"\n")
+        if lines[-1]:
+            self._partial[path] = lines[-1]
+        for line in lines[:-1]:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(event, dict):
+                yield event
+
+
+class PosteriorSnapshot:
+    """Read-only, memory-mapped view of the latest snapshot written by `PriorLearner`.
+
+    The path is re-stat'ed at most every `check_interval` seconds; when the learner
+    has replaced the file, the new one is mapped (the old mapping stays valid for
+    readers still holding it). Lookups are a binary search over the mapped records.
+
+    A file that is not a valid snapshot (wrong magic, truncated, unsorted keys or
+    non-finite counts) is rejected when mapped: the previous snapshot stays in
+    service, or none at all, in which case `LearnedPriors` falls back to its base
+    priors. The error is reported on stderr and kept in `last_error`.
+    """
+
+    def __init__(self, path: Path | str, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.module_depth = 2
+        self.alpha0 = self.beta0 = 0.0
+        self.last_error: Optional[str] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._rejected: Optional[Tuple[int, int, int]] = None
+        self._records = np.empty(0, dtype=_RECORD)
+        self._next_check = 0.0
+
+    def posterior(self, module: str) -> Optional[Tuple[float, float]]:
+        records = self._current()
+        key = module_key(module)
+        row = int(np.searchsorted(records["key"], key))
+        if row < len(records) and records["key"][row] == key:
+            return float(records["alpha"][row]), float(records["beta"][row])
+        return None
+
+    def observations(self, module: str) -> int:
+        posterior = self.posterior(module)
+        if posterior is None:
+            return 0
+        return int(round(posterior[0] + posterior[1] - self.alpha0 - self.beta0))
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    @property
+    def version(self) -> str:
+        """Identity of the mapped file; changes whenever the learner publishes."""
+        self._current()
+        return "empty" if self._identity is None else "%d:%d:%d" % self._identity
+
+    def _current(self) -> np.ndarray:
+        if time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            self._remap()
+        return self._records
+
+    def _remap(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        identity = (stat.st_ino, stat.st_dev, stat.st_mtime_ns)
+        if identity in (self._identity, self._rejected):
+            return
+        try:
+            depth, alpha0, beta0, records = self._load()
+        except (OSError, ValueError, struct.error) as exc:
+            self._rejected = identity
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            print(f"Keeping previous posteriors; failed to load {self.path}: {self.last_error}", file=sys.stderr)
+            return
+        self.module_depth, self.alpha0, self.beta0 = depth, alpha0, beta0
+        self._records = records
+        self._identity = identity
+        self.last_error = None
+
+    def _load(self) -> Tuple[int, float, float, np.ndarray]:
+        with self.path.open("rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, depth, _, alpha0, beta0, count = _HEADER.unpack_from(mapped)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a posterior snapshot")
+        if len(mapped) != _HEADER.size + count * _RECORD.itemsize:
+            raise ValueError(f"expected {count} records, file is {len(mapped)} bytes")
+        if depth < 1 or not (math.isfinite(alpha0) and math.isfinite(beta0)):
+            raise ValueError("invalid header")
+        records = np.frombuffer(mapped, dtype=_RECORD, count=count, offset=_HEADER.size)
+        if count and (np.any(records["key"][1:] <= records["key"][:-1])):
+            raise ValueError("record keys are not strictly increasing")
+        if count and not (np.isfinite(records["alpha"]).all() and np.isfinite(records["beta"]).all()):
+            raise ValueError("non-finite posterior counts")
+        return depth, alpha0, beta0, records
+
+
+class LearnedPriors:
+    """Engine priors backed by a posterior snapshot, falling back to `base` (config rules).
+
+    A change's prior is the highest posterior mean among its modules with at least
+    `min_observations` labelled outcomes; otherwise `base.prior_for` decides. Hotspot
+    detection is delegated to `base`.
+    """
+
+    has_priors = True
+
+    def __init__(self, snapshot: PosteriorSnapshot | Path | str, base=None, min_observations: int = 5):
+        self.snapshot = snapshot if isinstance(snapshot, PosteriorSnapshot) else PosteriorSnapshot(snapshot)
+        self.base = base if base is not None else PriorIndex()
+        self.min_observations = min_observations
+
+    def prior_for(self, files: Iterable[str]) -> Optional[float]:
+        files = list(files)
+        snapshot = self.snapshot
+        means = []
+        for module in {module_of(path, snapshot.module_depth) for path in files}:
+            posterior = snapshot.posterior(module)
+            if posterior is None:
+                continue
+            alpha, beta = posterior
+            if alpha + beta - snapshot.alpha0 - snapshot.beta0 >= self.min_observations:
+                means.append(alpha / (alpha + beta))
+        if means:
+            return max(means)
+        return self.base.prior_for(files)
+
+    def has_hotspots(self, files: Iterable[str]) -> bool:
+        return self.base.has_hotspots(files)
+
+    @property
+    def version(self) -> str:
+        return f"{self.snapshot.version}/{self.base.version}"
+
+
+def run(
+    learner: PriorLearner,
+    tailer: OutcomeTailer,
+    snapshot: Path,
+    follow: bool = False,
+    interval: float = 1.0,
+) -> int:
+    """Consume events and publish snapshots; returns the number of events applied."""
+    applied = 0
+    while True:
+        updated = False
+        for event in tailer.poll():
+            applied += 1
+            updated = learner.observe(event) > 0 or updated
+        if updated or not snapshot.exists():
+            learner.write_snapshot(snapshot)
+        if not follow:
+            return applied
+        time.sleep(interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Learn per-module Beta priors from outcome logs and labels.")
+    parser.add_argument("logs", nargs="+", type=Path, help="Outcome JSONL files and label files to read")
+    parser.add_argument("--snapshot", type=Path, default=Path("demo/priors.snapshot"), help="Snapshot to publish")
+    parser.add_argument("--base-prior", type=float, default=0.1, help="Prior mean before any outcome")
+    parser.add_argument("--strength", type=float, default=10.0, help="Pseudo-observations behind the base prior")
+    parser.add_argument("--module-depth", type=int, default=2, help="Directory levels that name a module")
+    parser.add_argument("--follow", action="store_true", help="Keep tailing the logs")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls with --follow")
+    args = parser.parse_args()
+    learner = PriorLearner(args.base_prior, args.strength, args.module_depth)
+    tailer = OutcomeTailer(args.logs)
+    try:
+        applied = run(learner, tailer, args.snapshot, follow=args.follow, interval=args.interval)
+    except KeyboardInterrupt:
+        learner.write_snapshot(args.snapshot)
+        applied = learner.events
+    finally:
+        tailer.close()
+    print(f"Applied {applied} events; {len(learner.posteriors)} modules in {args.snapshot}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
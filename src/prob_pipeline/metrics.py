@@ -0,0 +1,171 @@
+"""Stage timers, latency histograms and counters rendered in Prometheus text format.
+
+Histograms are only updated when `METRICS.enabled` is set (`PROB_PIPELINE_METRICS=1`).
+Independently, code running inside `request_breakdown()` collects per-stage totals for
+that one request, which the API turns into a `Server-Timing` header. With both off,
+`timer()` returns a shared no-op context manager, so instrumented code pays one
+attribute check and one context-variable lookup per stage.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_BREAKDOWN: ContextVar[Optional[Dict[str, float]]] = ContextVar("prob_pipeline_breakdown", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("metrics", "family", "label", "start")
+
+    def __init__(self, metrics: "Metrics", family: str, label: str):
+        self.metrics = metrics
+        self.family = family
+        self.label = label
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.record(self.family, self.label, time.perf_counter() - self.start)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NOOP = _NoopTimer()
+
+
+class Metrics:
+    """Registry of labelled histograms (`family{label}`) and counters.
+
+    Families are rendered as `prob_pipeline_<family>_duration_seconds` with the
+    label named after the family (`stage="enrich"`, `git="log"`), counters as
+    `prob_pipeline_<name>_total`.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def timer(self, family: str, label: str):
+        if not self.enabled and _BREAKDOWN.get() is None:
+            return _NOOP
+        return _Timer(self, family, label)
+
+    def stage(self, name: str):
+        return self.timer("stage", name)
+
+    def record(self, family: str, label: str, seconds: float) -> None:
+        """Observe `seconds` and add it to the active breakdown under the stage name or family."""
+        if self.enabled:
+            self.observe(family, label, seconds)
+        breakdown = _BREAKDOWN.get()
+        if breakdown is not None:
+            key = label if family == "stage" else family
+            breakdown[key] = breakdown.get(key, 0.0) + seconds
+
+    def observe(self, family: str, label: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((family, label))
+            if histogram is None:
+                histogram = self._histograms[(family, label)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def histogram(self, family: str, label: str) -> Optional[Histogram]:
+        return self._histograms.get((family, label))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, gauges: Optional[Dict[str, float]] = None, counters: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition; `gauges`/`counters` add externally tracked values."""
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            labelled = sorted(self._counters.items())
+        declared = set()
+        for (family, label), histogram in histograms:
+            metric = f"prob_pipeline_{family}_duration_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{{family}="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{family}="{label}"}} {histogram.sum!r}')
+            lines.append(f'{metric}_count{{{family}="{label}"}} {histogram.count}')
+        for (name, labels), value in labelled:
+            metric = f"prob_pipeline_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            rendered = ",".join(f'{key}="{val}"' for key, val in labels)
+            lines.append(f"{metric}{{{rendered}}} {value:g}" if rendered else f"{metric} {value:g}")
+        for name, value in sorted((counters or {}).items()):
+            lines.append(f"# TYPE prob_pipeline_{name}_total counter")
+            lines.append(f"prob_pipeline_{name}_total {value:g}")
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE prob_pipeline_{name} gauge")
+            lines.append(f"prob_pipeline_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def request_breakdown() -> Iterator[Dict[str, float]]:
+    """Collect per-stage seconds for the code run inside the block."""
+    breakdown: Dict[str, float] = {}
+    token = _BREAKDOWN.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _BREAKDOWN.reset(token)
+
+
+def server_timing(breakdown: Dict[str, float]) -> str:
+    """Format a breakdown as a `Server-Timing` header value (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in breakdown.items())
+
+
+METRICS = Metrics(enabled=os.environ.get("PROB_PIPELINE_METRICS", "0") == "1")
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Literal
+from json.encoder import encode_basestring
+from typing import Callable, Dict, List, Literal, Tuple
+
+from .paths import intern_paths
 
 LaneLiteral = Literal["low_risk", "medium_risk", "high_risk"]
 
@@ -13,14 +17,14 @@ class DeploymentLane(Enum):
     HIGH_RISK = "high_risk"
 
 
-@dataclass
+@dataclass(slots=True)
 class Author:
     id: str
     domain_familiarity_score: float
     past_success_rate: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeMetadata:
     lines_added: int
     lines_removed: int
@@ -28,18 +32,18 @@ class ChangeMetadata:
     cyclomatic_complexity_delta: float
 
 
-@dataclass
+@dataclass(slots=True)
 class EnvironmentHealth:
     status: Literal["healthy", "degraded", "critical"]
     open_incidents: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityScan:
     passed: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class AssessmentRequest:
     commit_id: str
     author: Author
@@ -63,7 +67,7 @@ class AssessmentRequest:
             change_metadata=ChangeMetadata(
                 lines_added=int(change.get("lines_added", 0)),
                 lines_removed=int(change.get("lines_removed", 0)),
-                files_modified=list(change.get("files_modified", [])),
+                files_modified=intern_paths(change.get("files_modified", [])),
                 cyclomatic_complexity_delta=float(change.get("cyclomatic_complexity_delta", 0.0)),
             ),
             environment_health=EnvironmentHealth(
@@ -76,17 +80,119 @@ class AssessmentRequest:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskFactor:
     vector: str
     impact_percentage: float
     description: str
 
+    def copy(self) -> "RiskFactor":
+        return RiskFactor(self.vector, self.impact_percentage, self.description)
+
+
+class LazyRiskFactor(RiskFactor):
+    """`RiskFactor` that keeps its explanation as `render(*details)` until `description` is read.
+
+    It serializes (`asdict`, `to_json`) and compares equal exactly like the eager
+    factor it stands for; comparing renders the description.
+    """
+
+    __slots__ = ("render", "details")
+
+    def __init__(self, vector: str, impact_percentage: float, render: Callable[..., str], details: Tuple):
+        self.vector = vector
+        self.impact_percentage = impact_percentage
+        self.render = render
+        self.details = details
+
+    @property
+    def description(self) -> str:
+        try:
+            return _DESCRIPTION_SLOT.__get__(self, RiskFactor)
+        except AttributeError:
+            text = self.render(*self.details)
+            _DESCRIPTION_SLOT.__set__(self, text)
+            return text
+
+    @description.setter
+    def description(self, value: str) -> None:
+        _DESCRIPTION_SLOT.__set__(self, value)
+
+    def copy(self) -> "LazyRiskFactor":
+        factor = LazyRiskFactor(self.vector, self.impact_percentage, self.render, self.details)
+        try:
+            _DESCRIPTION_SLOT.__set__(factor, _DESCRIPTION_SLOT.__get__(self, RiskFactor))
+        except AttributeError:
+            pass
+        return factor
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RiskFactor):
+            return NotImplemented
+        return (self.vector, self.impact_percentage, self.description) == (
+            other.vector,
+            other.impact_percentage,
+            other.description,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
 
-@dataclass
+_DESCRIPTION_SLOT = RiskFactor.__dict__["description"]
+
+
+@dataclass(slots=True)
 class AssessmentResponse:
     confidence_score: float
     assigned_lane: LaneLiteral
     risk_factors: List[RiskFactor]
     recommended_actions: List[str]
     is_security_compliant: bool
+
+    @staticmethod
+    def from_dict(data: Dict) -> "AssessmentResponse":
+        return AssessmentResponse(
+            confidence_score=data["confidence_score"],
+            assigned_lane=data["assigned_lane"],
+            risk_factors=[RiskFactor(**factor) for factor in data["risk_factors"]],
+            recommended_actions=list(data["recommended_actions"]),
+            is_security_compliant=data["is_security_compliant"],
+        )
+
+    def copy(self) -> "AssessmentResponse":
+        """Independent copy: mutating its lists or factors leaves `self` untouched."""
+        return AssessmentResponse(
+            confidence_score=self.confidence_score,
+            assigned_lane=self.assigned_lane,
+            risk_factors=[factor.copy() for factor in self.risk_factors],
+            recommended_actions=list(self.recommended_actions),
+            is_security_compliant=self.is_security_compliant,
+        )
+
+    def to_json(self) -> bytes:
+        """Compact UTF-8 JSON, as the API's response model renders it (numbers as floats)."""
+        return ("{" + self.json_fields() + "}").encode("utf-8")
+
+    def json_fields(self) -> str:
+        """The members of `to_json` without the braces, for splicing into a larger object."""
+        factors = ",".join(
+            f'{{"vector":{encode_basestring(factor.vector)},'
+            f'"impact_percentage":{_json_float(factor.impact_percentage)},'
+            f'"description":{encode_basestring(factor.description)}}}'
+            for factor in self.risk_factors
+        )
+        actions = ",".join(map(encode_basestring, self.recommended_actions))
+        return (
+            f'"confidence_score":{_json_float(self.confidence_score)},'
+            f'"assigned_lane":{encode_basestring(self.assigned_lane)},'
+            f'"risk_factors":[{factors}],'
+            f'"recommended_actions":[{actions}],'
+            f'"is_security_compliant":{"true" if self.is_security_compliant else "false"}'
+        )
+
+
+def _json_float(value: float) -> str:
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+    return repr(value)
@@ -0,0 +1,88 @@
+"""Normalized, deduplicated file paths and git pathspecs for very large diffs.
+
+Generated-code changes can list tens of thousands of files. `intern_paths` turns a
+payload's `files_modified` into one normalized, deduplicated list whose strings are
+interned, so the same path shared by many requests (and by the prior and history
+indexes) is stored once and compares by identity first.
+
+For `git log` queries, `collapse_paths` drops paths already covered by a listed
+directory and, past `MAX_PATHSPECS` specs, replaces the files of the busiest
+directories with the directory itself. That widens the query to the rest of those
+directories, so it is only applied to diffs too large to query file by file.
+`pathspec_chunks` then splits what remains so that no single command line gets near
+`ARG_MAX`; callers run one `git log` per chunk and merge commits by hash.
+"""
+from __future__ import annotations
+
+import posixpath
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+MAX_PATHSPECS = 512
+# Bytes of pathspec per git invocation; far below Linux's ARG_MAX (usually 2 MiB) and
+# inside the 32 KiB Windows command-line limit.
+PATHSPEC_BUDGET = 24 * 1024
+_UNNORMALIZED = re.compile(r"(?:^|/)\.{1,2}(?:/|$)|//|^/|/$")
+
+
+def intern_paths(files: Iterable[str]) -> List[str]:
+    """`files` without empties and duplicates, `.`/`..`/slashes normalized, first occurrence order kept."""
+    paths: Dict[str, None] = {}
+    for path in files:
+        if not path:
+            continue
+        if _UNNORMALIZED.search(path):
+            path = posixpath.normpath(path).lstrip("/")
+            if path in (".", ""):
+                continue
+        paths[sys.intern(path)] = None
+    return list(paths)
+
+
+def collapse_paths(paths: Sequence[str], max_specs: int = MAX_PATHSPECS) -> List[str]:
+    """Sorted pathspecs covering `paths`, with at most `max_specs` entries where directories allow."""
+    specs = set(_uncovered(paths))
+    while len(specs) > max_specs:
+        depth = max(spec.count("/") for spec in specs)
+        if depth == 0:
+            break
+        groups: Dict[str, List[str]] = {}
+        for spec in specs:
+            if spec.count("/") == depth:
+                groups.setdefault(spec.rsplit("/", 1)[0], []).append(spec)
+        # Fold the directories holding the most specs first; single-child directories
+        # still move up a level so their parents can fold on the next pass.
+        for directory, children in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])):
+            specs.difference_update(children)
+            specs.add(directory)
+            if len(specs) <= max_specs:
+                break
+    return sorted(specs)
+
+
+def pathspec_chunks(specs: Sequence[str], budget: int = PATHSPEC_BUDGET) -> Iterator[List[str]]:
+    """Consecutive runs of `specs` whose encoded size (with separators) stays within `budget`."""
+    chunk: List[str] = []
+    size = 0
+    for spec in specs:
+        cost = len(spec.encode("utf-8", "surrogateescape")) + 1
+        if chunk and size + cost > budget:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(spec)
+        size += cost
+    if chunk:
+        yield chunk
+
+
+def _uncovered(paths: Iterable[str]) -> Iterator[str]:
+    listed = set(paths)
+    for path in listed:
+        parent = path
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            if parent in listed:
+                break
+        else:
+            yield path
@@ -1,27 +1,195 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, Optional
 
 from .models import AssessmentResponse
 
+log = logging.getLogger(__name__)
+
 
 class OutcomeLogger:
     def __init__(self, path: Path | str = Path("demo/outcomes.jsonl")):
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
-    def log(self, response: AssessmentResponse, triggers: Iterable[str]) -> None:
-        entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "lane": response.assigned_lane,
-            "confidence_score": response.confidence_score,
-            "is_security_compliant": response.is_security_compliant,
-            "triggers": list(triggers),
-            "risk_factors": [factor.__dict__ for factor in response.risk_factors],
-            "recommended_actions": response.recommended_actions,
-        }
+    def log(
+        self,
+        response: AssessmentResponse,
+        triggers: Iterable[str],
+        commit_id: Optional[str] = None,
+        files: Optional[Iterable[str]] = None,
+    ) -> None:
+        entry = outcome_entry(response, triggers, commit_id, files)
         with self.path.open("a", encoding="utf-8") as handle:
             handle.write(json.dumps(entry) + "\n")
+
+
+def outcome_entry(
+    response: AssessmentResponse,
+    triggers: Iterable[str],
+    commit_id: Optional[str] = None,
+    files: Optional[Iterable[str]] = None,
+) -> dict:
+    entry = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "lane": response.assigned_lane,
+        "confidence_score": response.confidence_score,
+        "is_security_compliant": response.is_security_compliant,
+        "triggers": list(triggers),
+        "risk_factors": [
+            {"vector": factor.vector, "impact_percentage": factor.impact_percentage, "description": factor.description}
+            for factor in response.risk_factors
+        ],
+        "recommended_actions": list(response.recommended_actions),
+    }
+    if commit_id is not None:
+        entry["commit_id"] = commit_id
+    if files is not None:
+        # Lets `prob_pipeline.learner` attribute later rollback/incident labels to modules.
+        entry["files"] = list(files)
+    return entry
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.written = False
+
+
+_STOP = object()
+
+
+class BufferedOutcomeLogger(OutcomeLogger):
+    """`OutcomeLogger` that hands entries to a background writer thread.
+
+    Entries are appended in batches once `flush_size` entries are pending or
+    `flush_interval` seconds have passed, and the active file is rotated to
+    `<path>.<n>` (n increasing) before a batch would push it past `max_bytes`.
+
+    Ordering: within one logger, entries reach disk in the order `log` was called and
+    a batch is never split across segments, so reading the rotated segments in
+    ascending `n` followed by the active file replays the log in order. Entries from
+    different processes writing the same path are not ordered relative to each other.
+
+    The queue is unbounded and failed writes are retried with the next batch, and
+    `flush` returns False while entries are still unwritten. `close` (also registered
+    with `atexit`) drains the queue, retrying a failing write up to `close_retries`
+    times `flush_interval` apart; entries still unwritten after that are dropped with
+    a logged error rather than hanging interpreter exit.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = Path("demo/outcomes.jsonl"),
+        flush_size: int = 256,
+        flush_interval: float = 1.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        close_retries: int = 3,
+    ):
+        super().__init__(path)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.close_retries = close_retries
+        self._segment = max((seq for seq, _ in self._segments()), default=0)
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="outcome-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(
+        self,
+        response: AssessmentResponse,
+        triggers: Iterable[str],
+        commit_id: Optional[str] = None,
+        files: Optional[Iterable[str]] = None,
+    ) -> None:
+        if self._closed:
+            raise RuntimeError("OutcomeLogger is closed")
+        self._queue.put(outcome_entry(response, triggers, commit_id, files))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """True once everything logged so far is on disk; False on timeout or a failed write."""
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout) and request.written
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def segment_paths(self) -> List[Path]:
+        """Rotated segments oldest first, followed by the active file if it exists."""
+        paths = [path for _, path in sorted(self._segments())]
+        if self.path.exists():
+            paths.append(self.path)
+        return paths
+
+    def __enter__(self) -> "BufferedOutcomeLogger":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        pending: List[str] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                pending.append(json.dumps(item) + "\n")
+                if len(pending) < self.flush_size:
+                    continue
+            pending = self._write(pending)
+            deadline = time.monotonic() + self.flush_interval
+            if isinstance(item, _FlushRequest):
+                item.written = not pending
+                item.done.set()
+            elif item is _STOP:
+                for _ in range(self.close_retries):
+                    if not pending:
+                        break
+                    time.sleep(self.flush_interval)
+                    pending = self._write(pending)
+                if pending:
+                    log.error("Dropping %d outcome entries that could not be written to %s", len(pending), self.path)
+                return
+
+    def _write(self, lines: List[str]) -> List[str]:
+        if not lines:
+            return lines
+        data = "".join(lines)
+        try:
+            size = self.path.stat().st_size if self.path.exists() else 0
+            if size and size + len(data.encode("utf-8")) > self.max_bytes:
+                self._segment += 1
+                self.path.replace(self.path.with_name(f"{self.path.name}.{self._segment}"))
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(data)
+        except OSError:
+            return lines
+        return []
+
+    def _segments(self) -> List[tuple]:
+        segments = []
+        for candidate in self.path.parent.glob(f"{self.path.name}.*"):
+            suffix = candidate.name[len(self.path.name) + 1 :]
+            if suffix.isdigit():
+                segments.append((int(suffix), candidate))
+        return segments
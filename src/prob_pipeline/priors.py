@@ -0,0 +1,283 @@
+"""Per-module priors and hotspot rules compiled into a path-segment trie.
+
+A config is JSON::
+
+    {
+      "rules": [
+        {"match": "services/payment", "prior": 0.25},
+        {"match": "services/*/migrations/**", "prior": 0.3, "hotspot": true},
+        {"match": "services/payment/tests", "hotspot": false}
+      ],
+      "hotspot_keywords": ["critical", "hotspot"]
+    }
+
+A rule matches the path it names and everything beneath it (a trailing `/**` is
+implied); segments may use `fnmatch` wildcards, but `**` is only allowed as the last
+segment. For each file, `prior` and `hotspot` each come from the most specific rule
+that sets them: the deepest match, then the one with more literal segments, then the
+later rule. Files no rule marks either way are hotspots when they contain one of the
+`hotspot_keywords` (by default the engine's historical "critical"/"hotspot" test).
+
+Lookups walk one trie level per path segment, with a dict hit for literal segments,
+so their cost depends on path depth and the wildcards at each level rather than on
+the number of rules. Both resolved paths and the trie state after each directory are
+memoized, so the files of a large diff that share directories cost one trie step each.
+"""
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_HOTSPOT_KEYWORDS = ("critical", "hotspot")
+PRIORS_ENV = "PROB_PIPELINE_PRIORS"
+LEARNED_PRIORS_ENV = "PROB_PIPELINE_LEARNED_PRIORS"
+_GLOB_CHARS = ("*", "?", "[")
+
+
+@dataclass(frozen=True)
+class ModuleRule:
+    match: str
+    prior: Optional[float] = None
+    hotspot: Optional[bool] = None
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    wildcards: List[Tuple[str, "_Node"]] = field(default_factory=list)
+    # (literal segment count, rule index, rule) for rules ending at this node.
+    rules: List[Tuple[int, int, ModuleRule]] = field(default_factory=list)
+
+
+class PriorIndex:
+    def __init__(
+        self,
+        rules: Sequence[ModuleRule] = (),
+        hotspot_keywords: Sequence[str] = DEFAULT_HOTSPOT_KEYWORDS,
+        cache_size: int = 65536,
+    ):
+        self.rules = tuple(rules)
+        self.hotspot_keywords = tuple(hotspot_keywords)
+        self.has_priors = any(rule.prior is not None for rule in self.rules)
+        self.version = hashlib.blake2b(repr((self.rules, self.hotspot_keywords)).encode(), digest_size=8).hexdigest()
+        self._root = _Node()
+        for index, rule in enumerate(self.rules):
+            self._insert(index, rule)
+        self._keywords = re.compile("|".join(map(re.escape, self.hotspot_keywords))) if self.hotspot_keywords else None
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+        self._directory = lru_cache(maxsize=cache_size)(self._walk_directory)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "PriorIndex":
+        rules = []
+        for entry in config.get("rules", []):
+            prior = entry.get("prior")
+            if prior is not None and not 0.0 <= float(prior) <= 1.0:
+                raise ValueError(f"Prior for {entry['match']!r} must be between 0 and 1")
+            hotspot = entry.get("hotspot")
+            rules.append(
+                ModuleRule(
+                    match=entry["match"],
+                    prior=None if prior is None else float(prior),
+                    hotspot=None if hotspot is None else bool(hotspot),
+                )
+            )
+        return cls(rules, config.get("hotspot_keywords", DEFAULT_HOTSPOT_KEYWORDS))
+
+    @classmethod
+    def load(cls, path: Path | str) -> "PriorIndex":
+        return cls.from_config(json.loads(Path(path).read_text()))
+
+    def prior_for(self, files: Iterable[str]) -> Optional[float]:
+        """Highest prior among the files' matching rules, or None when no rule sets one."""
+        if not self.has_priors:
+            return None
+        priors = [prior for prior, _ in map(self.resolve, files) if prior is not None]
+        return max(priors) if priors else None
+
+    def has_hotspots(self, files: Iterable[str]) -> bool:
+        if not self.rules:
+            keywords = self._keywords
+            return keywords is not None and any(keywords.search(path) for path in files)
+        return any(self.resolve(path)[1] for path in files)
+
+    def _resolve(self, path: str) -> Tuple[Optional[float], bool]:
+        segments = _segments(path)
+        state = self._directory("/".join(segments[:-1]))
+        if segments and state.frontier:
+            state = _step(state, segments[-1], len(segments))
+        hotspot = state.hotspot
+        if hotspot is None:
+            hotspot = self._keywords is not None and self._keywords.search(path) is not None
+        return state.prior, hotspot
+
+    def _walk_directory(self, directory: str) -> "_State":
+        """Trie state after `directory` (normalized, "" for the root); memoized per directory."""
+        if not directory:
+            return _reach(_ROOT_STATE, [self._root], 0)
+        parent, _, segment = directory.rpartition("/")
+        return _step(self._directory(parent), segment, directory.count("/") + 1)
+
+    def _insert(self, index: int, rule: ModuleRule) -> None:
+        segments = _segments(rule.match)
+        if segments and segments[-1] == "**":
+            segments.pop()
+        if "**" in segments:
+            raise ValueError(f"'**' is only supported as the last segment: {rule.match!r}")
+        node = self._root
+        literal = 0
+        for segment in segments:
+            if any(char in segment for char in _GLOB_CHARS):
+                for pattern, existing in node.wildcards:
+                    if pattern == segment:
+                        node = existing
+                        break
+                else:
+                    child = _Node()
+                    node.wildcards.append((segment, child))
+                    node = child
+            else:
+                literal += 1
+                node = node.children.setdefault(segment, _Node())
+        node.rules.append((literal, index, rule))
+
+
+@dataclass(frozen=True)
+class _State:
+    frontier: Tuple[_Node, ...]
+    # Most specific (depth, literal segments, rule index) setting each attribute so far.
+    prior_key: Optional[Tuple[int, int, int]]
+    prior: Optional[float]
+    hotspot_key: Optional[Tuple[int, int, int]]
+    hotspot: Optional[bool]
+
+
+_ROOT_STATE = _State(frontier=(), prior_key=None, prior=None, hotspot_key=None, hotspot=None)
+
+
+def _step(state: _State, segment: str, depth: int) -> _State:
+    """Advance `state` by one path segment at `depth`."""
+    frontier = []
+    for node in state.frontier:
+        child = node.children.get(segment)
+        if child is not None:
+            frontier.append(child)
+        for pattern, wildcard in node.wildcards:
+            if fnmatch.fnmatchcase(segment, pattern):
+                frontier.append(wildcard)
+    return _reach(state, frontier, depth)
+
+
+def _reach(state: _State, frontier: List[_Node], depth: int) -> _State:
+    """`state` moved to `frontier`, keeping the most specific rules seen so far."""
+    prior_key, prior, hotspot_key, hotspot = state.prior_key, state.prior, state.hotspot_key, state.hotspot
+    for node in frontier:
+        for literal, rule_index, rule in node.rules:
+            key = (depth, literal, rule_index)
+            if rule.prior is not None and (prior_key is None or key > prior_key):
+                prior_key, prior = key, rule.prior
+            if rule.hotspot is not None and (hotspot_key is None or key > hotspot_key):
+                hotspot_key, hotspot = key, rule.hotspot
+    return _State(tuple(frontier), prior_key, prior, hotspot_key, hotspot)
+
+
+class ReloadingPriorIndex:
+    """`PriorIndex` backed by a config file that is recompiled when its mtime or size changes.
+
+    The file is stat'ed at most once per `check_interval` seconds on lookup. A config
+    that fails to load keeps the previous index in service and reports the error on
+    stderr (and in `last_error`).
+    """
+
+    def __init__(self, path: Path | str, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime = self._stat()
+        self._index = PriorIndex.load(self.path)
+        self._next_check = time.monotonic() + check_interval
+
+    @property
+    def index(self) -> PriorIndex:
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._index
+
+    @property
+    def has_priors(self) -> bool:
+        return self.index.has_priors
+
+    @property
+    def version(self) -> str:
+        return self.index.version
+
+    def prior_for(self, files: Iterable[str]) -> Optional[float]:
+        return self.index.prior_for(files)
+
+    def has_hotspots(self, files: Iterable[str]) -> bool:
+        return self.index.has_hotspots(files)
+
+    def reload(self) -> bool:
+        """Recompile now; returns False (keeping the current index) if the config is invalid."""
+        with self._lock:
+            return self._load(self._stat())
+
+    def _maybe_reload(self) -> None:
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.check_interval
+            mtime = self._stat()
+            if mtime != self._mtime:
+                self._load(mtime)
+
+    def _load(self, mtime: Optional[Tuple[int, int]]) -> bool:
+        self._mtime = mtime
+        try:
+            self._index = PriorIndex.load(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            print(f"Keeping previous priors; failed to load {self.path}: {self.last_error}", file=sys.stderr)
+            return False
+        self.last_error = None
+        return True
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+def priors_from_env():
+    """Hot-reloading priors from the file named by `PROB_PIPELINE_PRIORS`, if set.
+
+    With `PROB_PIPELINE_LEARNED_PRIORS` naming a `prob_pipeline.learner` snapshot,
+    learned module posteriors take precedence and the config rules are the fallback.
+    """
+    path = os.environ.get(PRIORS_ENV)
+    index = ReloadingPriorIndex(path) if path else None
+    learned = os.environ.get(LEARNED_PRIORS_ENV)
+    if learned:
+        from .learner import LearnedPriors
+
+        return LearnedPriors(learned, base=index)
+    return index
+
+
+def _segments(path: str) -> List[str]:
+    path = posixpath.normpath(path.strip().lstrip("/"))
+    return [] if path in (".", "") else path.split("/")
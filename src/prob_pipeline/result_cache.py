@@ -0,0 +1,161 @@
+"""Content-addressed cache of assessment results.
+
+Keys are a BLAKE2b digest of the enriched `AssessmentRequest` (every field the
+engine reads) together with `RiskInferenceEngine.fingerprint()` (base prior,
+pessimism bias, registered adapters and the priors version), so a retry of the same
+commit with the same inputs hits, while any change to the payload, the enricher's
+derived author scores, the engine parameters or the prior configuration misses.
+
+Entries live in a bounded in-process `TTLCache`. With `directory` set, they are also
+written there as `<key>.json`, which lets separate processes (CLI invocations, uvicorn
+workers) share results; the directory is pruned oldest-first to `max_files` and
+entries older than `ttl` are ignored. Bump `CACHE_VERSION` whenever scoring logic
+changes, so stored results from older code stop matching.
+
+Callers always receive their own copy of a response, so mutating one (a router
+appending actions, say) cannot leak into later hits. Engines whose priors expose no
+`version` cannot be told apart by configuration and bypass the cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .cache import CacheStats, TTLCache
+from .models import AssessmentRequest, AssessmentResponse
+
+CACHE_VERSION = 1
+CACHE_SIZE_ENV = "PROB_PIPELINE_RESULT_CACHE_SIZE"
+CACHE_TTL_ENV = "PROB_PIPELINE_RESULT_CACHE_TTL"
+CACHE_DIR_ENV = "PROB_PIPELINE_RESULT_CACHE_DIR"
+
+
+@dataclass(frozen=True)
+class ResultCacheStats:
+    memory: CacheStats
+    disk_hits: int
+    disk_writes: int
+
+
+class ResultCache:
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float = 300.0,
+        directory: Path | str | None = None,
+        max_files: int = 100_000,
+    ):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self.max_files = max_files
+        self._disk_hits = 0
+        self._disk_writes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, default_size: int = 4096) -> "ResultCache":
+        """Sized by `PROB_PIPELINE_RESULT_CACHE_SIZE` (0 disables), shared on disk under `..._DIR`."""
+        return cls(
+            maxsize=int(os.environ.get(CACHE_SIZE_ENV, str(default_size))),
+            ttl=float(os.environ.get(CACHE_TTL_ENV, "300")),
+            directory=os.environ.get(CACHE_DIR_ENV) or None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.maxsize > 0 or self.directory is not None
+
+    def assess(self, engine, request: AssessmentRequest) -> Tuple[AssessmentResponse, bool]:
+        """`engine.assess(request)`, served from the cache when possible; returns `(response, cached)`."""
+        if not self.enabled or getattr(engine.priors, "version", None) is None:
+            return engine.assess(request), False
+        key = cache_key(engine, request)
+        response = self.get(key)
+        if response is not None:
+            return response, True
+        response = engine.assess(request)
+        self.set(key, response)
+        return response, False
+
+    def get(self, key: str) -> Optional[AssessmentResponse]:
+        """A copy of the cached response for `key`, or None."""
+        response = self.memory.get(key)
+        if response is None and self.directory is not None:
+            response = self._read(key)
+            if response is not None:
+                self._disk_hits += 1
+                self.memory.set(key, response)
+        return response.copy() if response is not None else None
+
+    def set(self, key: str, response: AssessmentResponse) -> None:
+        """Cache a copy of `response`; the caller keeps ownership of the original."""
+        self.memory.set(key, response.copy())
+        if self.directory is not None:
+            self._write(key, response)
+
+    def stats(self) -> ResultCacheStats:
+        return ResultCacheStats(memory=self.memory.stats(), disk_hits=self._disk_hits, disk_writes=self._disk_writes)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[AssessmentResponse]:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime + self.ttl <= time.time():
+                return None
+            return AssessmentResponse.from_dict(json.loads(path.read_bytes()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, key: str, response: AssessmentResponse) -> None:
+        path = self._path(key)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_bytes(response.to_json())
+            os.replace(temporary, path)
+        except OSError:
+            return
+        self._disk_writes += 1
+        if self._disk_writes % max(1, self.max_files // 10) == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_files)]:
+            path.unlink(missing_ok=True)
+
+
+def cache_key(engine, request: AssessmentRequest) -> str:
+    author = request.author
+    change = request.change_metadata
+    health = request.environment_health
+    fields = (
+        CACHE_VERSION,
+        engine.fingerprint(),
+        request.commit_id,
+        author.id,
+        author.domain_familiarity_score,
+        author.past_success_rate,
+        change.lines_added,
+        change.lines_removed,
+        tuple(change.files_modified),
+        change.cyclomatic_complexity_delta,
+        health.status,
+        health.open_incidents,
+        request.security_scan.passed,
+    )
+    return hashlib.blake2b(repr(fields).encode("utf-8"), digest_size=16).hexdigest()
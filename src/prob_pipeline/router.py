@@ -32,11 +32,11 @@ def _load_responses(paths: Iterable[Path]) -> Sequence[AssessmentResponse]:
         if not path.exists():
             raise FileNotFoundError(f"Response file {path} does not exist")
         payload = json.loads(path.read_text())
-        responses.append(_parse_response(payload))
+        responses.append(parse_response(payload))
     return responses
 
 
-def _parse_response(payload: dict) -> AssessmentResponse:
+def parse_response(payload: dict) -> AssessmentResponse:
     if "assigned_lane" not in payload:
         raise ValueError("Response payload must include `assigned_lane`")
     return AssessmentResponse(
@@ -53,15 +53,19 @@ logger = OutcomeLogger()
 
 def _execute_lane(response: AssessmentResponse) -> Iterable[str]:
     triggers = LANE_TRIGGERS.get(response.assigned_lane, [])
-    print(f"Assigned lane: {response.assigned_lane} ({response.confidence_score}% confidence)")
-    print("Risk factors:")
+    print(format_lane(response, triggers))
+    return triggers
+
+
+def format_lane(response: AssessmentResponse, triggers: Iterable[str]) -> str:
+    lines = [f"Assigned lane: {response.assigned_lane} ({response.confidence_score}% confidence)", "Risk factors:"]
     for factor in response.risk_factors:
-        print(f"  - {factor.vector}: {factor.impact_percentage}% -> {factor.description}")
-    print("Recommended triggers:")
+        lines.append(f"  - {factor.vector}: {factor.impact_percentage}% -> {factor.description}")
+    lines.append("Recommended triggers:")
     for action in triggers:
-        print(f"  * {action}")
-    print()
-    return triggers
+        lines.append(f"  * {action}")
+    lines.append("")
+    return "\n".join(lines)
 
 
 def main() -> int:
@@ -0,0 +1,439 @@
+"""Columnar binary segments of routed outcomes, read through memory maps.
+
+A segment holds the same entries `OutcomeLogger` writes as JSON lines, column by
+column. Every string (lanes, vectors, descriptions, triggers, actions, commit ids and
+files) is stored once in a string table and referenced by id, so the repeated
+description and action text of a JSONL log costs four bytes per use. Scores and
+impacts are float64 columns and timestamps int64 microseconds since the epoch (UTC).
+
+Layout (little-endian, every section 8-byte aligned)::
+
+    header           magic, version, reserved, rows, factors, triggers, actions, files, strings, blob bytes
+    timestamp        int64[rows]
+    confidence       float64[rows]
+    lane             uint32[rows]          string id
+    commit           uint32[rows]          string id, NO_STRING when absent
+    flags            uint8[rows]           bit 0 security compliant, bit 1 has files
+    factor_start     uint64[rows + 1]      slice of the factor columns for each row
+    factor_vector    uint32[factors]       string id
+    factor_impact    float64[factors]
+    factor_text      uint32[factors]       string id of the description
+    trigger_start    uint64[rows + 1]      and likewise for triggers, actions and files
+    triggers         uint32[triggers]
+    action_start     uint64[rows + 1]
+    actions          uint32[actions]
+    file_start       uint64[rows + 1]
+    files            uint32[files]
+    string_start     uint64[strings + 1]   slice of `blob` holding each string
+    blob             UTF-8 strings
+
+`OutcomeSegments` maps a directory of segments (or explicit files) and answers
+`lane_counts` and `impact_distribution`, the same questions as `OutcomeStore`, with
+NumPy reductions over the mapped columns; strings are only decoded for the distinct
+ids in a result. `SegmentLogger` is a drop-in for `OutcomeLogger` that writes one
+segment per `flush_size` entries. `python -m prob_pipeline.segments` converts JSONL
+logs to segments and back and prints aggregates. Conversion keeps the fields
+`outcome_entry` writes; timestamps come back in the logger's `...Z` form.
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import AssessmentResponse
+from .persistence import outcome_entry
+from .store import LANES, ImpactStats
+
+SEGMENT_MAGIC = b"PPOUTS01"
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = ".outseg"
+NO_STRING = 0xFFFFFFFF
+_COMPLIANT = 1
+_HAS_FILES = 2
+_EPOCH = datetime(1970, 1, 1)
+_HEADER = struct.Struct("<8sIIQQQQQQQ")
+_SECTIONS = (
+    ("timestamp", "<i8", "rows"),
+    ("confidence", "<f8", "rows"),
+    ("lane", "<u4", "rows"),
+    ("commit", "<u4", "rows"),
+    ("flags", "u1", "rows"),
+    ("factor_start", "<u8", "rows+1"),
+    ("factor_vector", "<u4", "factors"),
+    ("factor_impact", "<f8", "factors"),
+    ("factor_text", "<u4", "factors"),
+    ("trigger_start", "<u8", "rows+1"),
+    ("triggers", "<u4", "triggers"),
+    ("action_start", "<u8", "rows+1"),
+    ("actions", "<u4", "actions"),
+    ("file_start", "<u8", "rows+1"),
+    ("files", "<u4", "files"),
+    ("string_start", "<u8", "strings+1"),
+)
+_COUNTS = ("rows", "factors", "triggers", "actions", "files", "strings")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_segment(path: Path | str, entries: Iterable[dict]) -> int:
+    """Encode outcome entries into a segment at `path` atomically; returns the row count."""
+    path = Path(path)
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    columns: Dict[str, list] = {name: [] for name, _, _ in _SECTIONS}
+    for name in ("factor_start", "trigger_start", "action_start", "file_start"):
+        columns[name].append(0)
+    for entry in entries:
+        columns["timestamp"].append(_micros(entry["timestamp"]))
+        columns["confidence"].append(float(entry.get("confidence_score", 0.0)))
+        columns["lane"].append(intern(entry["lane"]))
+        commit_id = entry.get("commit_id")
+        columns["commit"].append(NO_STRING if commit_id is None else intern(commit_id))
+        flags = _COMPLIANT if entry.get("is_security_compliant", True) else 0
+        if entry.get("files") is not None:
+            flags |= _HAS_FILES
+        columns["flags"].append(flags)
+        for factor in entry.get("risk_factors", []):
+            columns["factor_vector"].append(intern(factor["vector"]))
+            columns["factor_impact"].append(float(factor["impact_percentage"]))
+            columns["factor_text"].append(intern(factor.get("description", "")))
+        columns["factor_start"].append(len(columns["factor_vector"]))
+        for key, items, starts in (
+            ("triggers", "triggers", "trigger_start"),
+            ("recommended_actions", "actions", "action_start"),
+            ("files", "files", "file_start"),
+        ):
+            columns[items].extend(intern(value) for value in entry.get(key) or ())
+            columns[starts].append(len(columns[items]))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    blob = b"".join(encoded)
+    columns["string_start"] = np.cumsum([0] + [len(value) for value in encoded])
+    counts = [len(columns["timestamp"]), len(columns["factor_vector"]), len(columns["triggers"])]
+    counts += [len(columns["actions"]), len(columns["files"]), len(strings)]
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with temporary.open("wb") as handle:
+        handle.write(_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, 0, *counts, len(blob)))
+        offset = _HEADER.size
+        for name, dtype, _ in _SECTIONS:
+            data = np.asarray(columns[name], dtype=dtype).tobytes()
+            handle.write(data)
+            offset += len(data)
+            handle.write(b"\0" * (_align(offset) - offset))
+            offset = _align(offset)
+        handle.write(blob)
+    os.replace(temporary, path)
+    return counts[0]
+
+
+class OutcomeSegment:
+    """Read-only view of one segment; columns are zero-copy views of the mapping."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, *counts, blob_size = _HEADER.unpack_from(self._mmap)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            raise ValueError(f"{self.path} is not a version {SEGMENT_VERSION} outcome segment")
+        sizes = dict(zip(_COUNTS, counts))
+        offset = _HEADER.size
+        for name, dtype, count in _SECTIONS:
+            length = sizes[count.split("+")[0]] + count.endswith("+1")
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=length, offset=offset))
+            offset = _align(offset + length * np.dtype(dtype).itemsize)
+        self._blob = memoryview(self._mmap)[offset : offset + blob_size]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def string(self, index: int) -> str:
+        return str(self._blob[int(self.string_start[index]) : int(self.string_start[index + 1])], "utf-8")
+
+    def rows(self, since: datetime | str | None = None, until: datetime | str | None = None) -> Optional[np.ndarray]:
+        """Boolean row mask for the time range, or None when unbounded."""
+        if since is None and until is None:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        if since is not None:
+            mask &= self.timestamp >= _micros(since)
+        if until is not None:
+            mask &= self.timestamp < _micros(until)
+        return mask
+
+    def lane_counts(self, since: datetime | str | None = None, until: datetime | str | None = None) -> Dict[str, int]:
+        mask = self.rows(since, until)
+        lanes = self.lane if mask is None else self.lane[mask]
+        ids, counts = np.unique(lanes, return_counts=True)
+        return {self.string(index): int(count) for index, count in zip(ids, counts)}
+
+    def impact_totals(
+        self, since: datetime | str | None = None, until: datetime | str | None = None
+    ) -> Dict[str, Tuple[int, float, float, float]]:
+        """`vector -> (count, sum, minimum, maximum)` of impact percentages."""
+        mask = self.rows(since, until)
+        vectors, impacts = self.factor_vector, self.factor_impact
+        if mask is not None:
+            factor_mask = np.repeat(mask, np.diff(self.factor_start).astype(np.int64))
+            vectors, impacts = vectors[factor_mask], impacts[factor_mask]
+        if not len(vectors):
+            return {}
+        ids, inverse = np.unique(vectors, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(ids))
+        sums = np.bincount(inverse, weights=impacts, minlength=len(ids))
+        minimum = np.full(len(ids), np.inf)
+        maximum = np.full(len(ids), -np.inf)
+        np.minimum.at(minimum, inverse, impacts)
+        np.maximum.at(maximum, inverse, impacts)
+        return {
+            self.string(index): (int(count), float(total), float(low), float(high))
+            for index, count, total, low, high in zip(ids, counts, sums, minimum, maximum)
+        }
+
+    def entries(self) -> Iterator[dict]:
+        """Decode every row back into an `outcome_entry` dict, in write order."""
+        strings = [self.string(index) for index in range(len(self.string_start) - 1)]
+        timestamps, confidence = self.timestamp.tolist(), self.confidence.tolist()
+        lanes, commits, flags = self.lane.tolist(), self.commit.tolist(), self.flags.tolist()
+        factor_start = self.factor_start.tolist()
+        vectors, impacts, texts = self.factor_vector.tolist(), self.factor_impact.tolist(), self.factor_text.tolist()
+        lists = {
+            name: (getattr(self, f"{prefix}_start").tolist(), [strings[i] for i in getattr(self, name).tolist()])
+            for name, prefix in (("triggers", "trigger"), ("actions", "action"), ("files", "file"))
+        }
+        for row in range(len(self)):
+            start, end = factor_start[row], factor_start[row + 1]
+            entry = {
+                "timestamp": _isoformat(timestamps[row]),
+                "lane": strings[lanes[row]],
+                "confidence_score": confidence[row],
+                "is_security_compliant": bool(flags[row] & _COMPLIANT),
+                "triggers": _slice(lists["triggers"], row),
+                "risk_factors": [
+                    {
+                        "vector": strings[vectors[index]],
+                        "impact_percentage": impacts[index],
+                        "description": strings[texts[index]],
+                    }
+                    for index in range(start, end)
+                ],
+                "recommended_actions": _slice(lists["actions"], row),
+            }
+            if commits[row] != NO_STRING:
+                entry["commit_id"] = strings[commits[row]]
+            if flags[row] & _HAS_FILES:
+                entry["files"] = _slice(lists["files"], row)
+            yield entry
+
+    def close(self) -> None:
+        self._blob.release()
+        for name, _, _ in _SECTIONS:
+            setattr(self, name, None)
+        self._mmap.close()
+
+
+class OutcomeSegments:
+    """Aggregates over many segments: a directory of `*.outseg` files or explicit paths, oldest first."""
+
+    def __init__(self, paths: Path | str | Sequence[Path | str]):
+        self.segments = [OutcomeSegment(path) for path in segment_paths(paths)]
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def count(self) -> int:
+        return len(self)
+
+    def lane_counts(self, since: datetime | str | None = None, until: datetime | str | None = None) -> Dict[str, int]:
+        counts = {lane: 0 for lane in LANES}
+        for segment in self.segments:
+            for lane, count in segment.lane_counts(since, until).items():
+                counts[lane] = counts.get(lane, 0) + count
+        return counts
+
+    def impact_distribution(
+        self, since: datetime | str | None = None, until: datetime | str | None = None
+    ) -> Dict[str, ImpactStats]:
+        totals: Dict[str, List[float]] = {}
+        for segment in self.segments:
+            for vector, (count, total, low, high) in segment.impact_totals(since, until).items():
+                current = totals.setdefault(vector, [0, 0.0, low, high])
+                current[0] += count
+                current[1] += total
+                current[2] = min(current[2], low)
+                current[3] = max(current[3], high)
+        return {
+            vector: ImpactStats(count, total / count, low, high) for vector, (count, total, low, high) in totals.items()
+        }
+
+    def entries(self) -> Iterator[dict]:
+        for segment in self.segments:
+            yield from segment.entries()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+
+
+class SegmentLogger:
+    """`OutcomeLogger` counterpart that writes columnar segments into `directory`.
+
+    Entries are buffered and written as one new segment every `flush_size` entries and
+    on `flush`/`close` (also registered with `atexit`); unflushed entries are lost if
+    the process dies. Segment names start with a nanosecond timestamp, so sorting them
+    replays the log in order, and concurrent processes never write the same file.
+    """
+
+    def __init__(self, directory: Path | str = Path("demo/outcomes"), flush_size: int = 4096):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def log(
+        self,
+        response: AssessmentResponse,
+        triggers: Iterable[str],
+        commit_id: Optional[str] = None,
+        files: Optional[Iterable[str]] = None,
+    ) -> None:
+        with self._lock:
+            self._pending.append(outcome_entry(response, triggers, commit_id, files))
+            if len(self._pending) >= self.flush_size:
+                self._write()
+
+    def flush(self) -> Optional[Path]:
+        with self._lock:
+            return self._write()
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _write(self) -> Optional[Path]:
+        if not self._pending:
+            return None
+        path = new_segment_path(self.directory)
+        write_segment(path, self._pending)
+        self._pending = []
+        return path
+
+
+def new_segment_path(directory: Path) -> Path:
+    return directory / f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+
+
+def segment_paths(paths: Path | str | Sequence[Path | str]) -> List[Path]:
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    found: List[Path] = []
+    for path in map(Path, paths):
+        found.extend(sorted(path.glob(f"*{SEGMENT_SUFFIX}")) if path.is_dir() else [path])
+    return found
+
+
+def _slice(column: Tuple[List[int], List[str]], row: int) -> List[str]:
+    starts, values = column
+    return values[starts[row] : starts[row + 1]]
+
+
+def _micros(value: datetime | str) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _isoformat(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat() + "Z"
+
+
+def _read_jsonl(paths: Sequence[Path]) -> Iterator[dict]:
+    for path in paths:
+        if str(path) == "-":
+            # stdin belongs to the process; read it but leave it open.
+            yield from _parse_lines(sys.stdin)
+            continue
+        with path.open(encoding="utf-8") as handle:
+            yield from _parse_lines(handle)
+
+
+def _parse_lines(handle) -> Iterator[dict]:
+    for line in handle:
+        if line.strip():
+            yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert outcome logs between JSONL and columnar segments.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    encode = commands.add_parser("encode", help="Write JSONL outcome logs ('-' for stdin) as segments")
+    encode.add_argument("logs", nargs="+", type=Path)
+    encode.add_argument("--output", type=Path, required=True, help="Segment directory")
+    encode.add_argument("--rows-per-segment", type=int, default=65536)
+    decode = commands.add_parser("decode", help="Print segments (files or directories) as JSONL")
+    decode.add_argument("segments", nargs="+", type=Path)
+    stats = commands.add_parser("stats", help="Print lane counts and impact per vector as JSON")
+    stats.add_argument("segments", nargs="+", type=Path)
+    stats.add_argument("--since", help="ISO-8601 lower bound (inclusive)")
+    stats.add_argument("--until", help="ISO-8601 upper bound (exclusive)")
+    args = parser.parse_args(argv)
+
+    if args.command == "encode":
+        args.output.mkdir(parents=True, exist_ok=True)
+        entries = _read_jsonl(args.logs)
+        written = segments = 0
+        while True:
+            chunk = list(itertools.islice(entries, args.rows_per_segment))
+            if not chunk:
+                break
+            segments += 1
+            written += write_segment(new_segment_path(args.output), chunk)
+        print(f"Wrote {written} entries in {segments} segments to {args.output}")
+        return 0
+    reader = OutcomeSegments(args.segments)
+    try:
+        if args.command == "decode":
+            for entry in reader.entries():
+                sys.stdout.write(json.dumps(entry) + "\n")
+        else:
+            lanes = reader.lane_counts(args.since, args.until)
+            impact = reader.impact_distribution(args.since, args.until)
+            report = {
+                "count": sum(lanes.values()),
+                "lanes": lanes,
+                "impact": {vector: asdict(stats) for vector, stats in impact.items()},
+            }
+            print(json.dumps(report, indent=2))
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,345 @@
+"""Git history snapshots shared between processes through read-only memory maps.
+
+`SharedCommitIndex` answers the same queries as `CommitIndex`, but instead of keeping
+parsed commits on the Python heap of every process it writes them once per HEAD to
+`<directory>/<head>-<history_days>.hist` and memory-maps that file. Under a
+multi-worker uvicorn deployment the first worker to see a new HEAD takes a file lock
+and runs `git log`; the others wait for the lock and map the finished file, so
+history is scanned once per HEAD and the pages are shared through the page cache.
+
+Snapshot layout (little-endian, every section 8-byte aligned)::
+
+    header       magic, version, history_days, built_at, commits, authors, paths, refs, blob bytes
+    commit_time  int64[commits]       committer timestamps, commits grouped by author
+    path_start   uint64[commits + 1]  slice of `refs` holding each commit's paths
+    author_str   uint64[authors + 1]  slice of `blob` holding each author (sorted)
+    path_str     uint64[paths + 1]    slice of `blob` holding each path (sorted)
+    author_start uint32[authors + 1]  slice of the commit arrays for each author
+    refs         uint32[refs]         path ids
+    is_revert    uint8[commits]
+    blob         UTF-8 author identities followed by paths
+
+Paths are sorted bytewise, so a directory spec resolves to one contiguous id range
+by binary search and commit filtering is a vectorized range test over `refs`.
+
+Builds are serialized with `fcntl.flock`; on platforms without `fcntl`,
+`shared_index_from_env` returns None and the enricher keeps a per-process
+`CommitIndex`.
+"""
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import mmap
+import os
+import re
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from .history import CommitIndex, CommitRecord, history_cutoff
+
+HISTORY_DIR_ENV = "PROB_PIPELINE_HISTORY_DIR"
+SNAPSHOT_MAGIC = b"PPHIST01"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<8sIIqQQQQQ")
+_SECTIONS = (
+    ("commit_time", "<i8", "commits"),
+    ("path_start", "<u8", "commits+1"),
+    ("author_str", "<u8", "authors+1"),
+    ("path_str", "<u8", "paths+1"),
+    ("author_start", "<u4", "authors+1"),
+    ("refs", "<u4", "refs"),
+    ("is_revert", "u1", "commits"),
+)
+
+
+def _section_lengths(commits: int, authors: int, paths: int, refs: int) -> Dict[str, int]:
+    sizes = {"commits": commits, "authors": authors, "paths": paths, "refs": refs}
+    return {name: sizes[count.split("+")[0]] + (1 if count.endswith("+1") else 0) for name, _, count in _SECTIONS}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _Strings:
+    """Sequence view over length-delimited strings in the blob, usable with `bisect`."""
+
+    def __init__(self, blob: memoryview, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return bytes(self._blob[int(self._offsets[index]) : int(self._offsets[index + 1])])
+
+
+class HistorySnapshot:
+    """Read-only view of one snapshot file; arrays are zero-copy views of the mapping."""
+
+    def __init__(self, path: Path | str, head: Optional[str] = None):
+        self.path = Path(path)
+        self.head = head
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.history_days, self.built_at, commits, authors, paths, refs, blob_size = (
+            _HEADER.unpack_from(self._mmap)
+        )
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{self.path} is not a version {SNAPSHOT_VERSION} history snapshot")
+        offset = _HEADER.size
+        for name, dtype, _ in _SECTIONS:
+            count = _section_lengths(commits, authors, paths, refs)[name]
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset))
+            offset = _align(offset + count * np.dtype(dtype).itemsize)
+        blob = memoryview(self._mmap)[offset : offset + blob_size]
+        self.authors = _Strings(blob, self.author_str)
+        self.paths = _Strings(blob, self.path_str)
+        # Process-local memo of author pattern -> author ids for this snapshot.
+        self.author_matches: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.commit_time)
+
+    def author_ids(self, author_id: str) -> List[int]:
+        matches = self.author_matches.get(author_id)
+        if matches is None:
+            try:
+                pattern = re.compile(author_id)
+            except re.error:
+                pattern = re.compile(re.escape(author_id))
+            matches = [index for index in range(len(self.authors)) if pattern.search(self.authors[index].decode())]
+            self.author_matches[author_id] = matches
+        return matches
+
+    def path_ranges(self, specs: Tuple[frozenset, Tuple[str, ...]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Disjoint, sorted `[lo, hi)` path-id ranges matched by normalized specs."""
+        literal, globs = specs
+        ranges = []
+        for spec in literal:
+            encoded = spec.encode()
+            exact = bisect.bisect_left(self.paths, encoded)
+            if exact < len(self.paths) and self.paths[exact] == encoded:
+                ranges.append((exact, exact + 1))
+            prefix = encoded + b"/"
+            lo = bisect.bisect_left(self.paths, prefix)
+            # "0" sorts directly after "/", so this bounds every path under the prefix.
+            hi = bisect.bisect_left(self.paths, encoded + b"0", lo)
+            if lo < hi:
+                ranges.append((lo, hi))
+        if globs:
+            for index in range(len(self.paths)):
+                path = self.paths[index].decode()
+                if any(fnmatch.fnmatchcase(path, pattern) for pattern in globs):
+                    ranges.append((index, index + 1))
+        merged: List[List[int]] = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        bounds = np.array(merged, dtype=np.int64).reshape(-1, 2)
+        return bounds[:, 0], bounds[:, 1]
+
+    def counts(
+        self, author_ids: Sequence[int], specs: Optional[Tuple[frozenset, Tuple[str, ...]]], cutoff: int
+    ) -> Tuple[int, int]:
+        ranges = self.path_ranges(specs) if specs is not None else None
+        total = 0
+        successful = 0
+        for author in author_ids:
+            start, end = int(self.author_start[author]), int(self.author_start[author + 1])
+            selected = self.commit_time[start:end] >= cutoff
+            if ranges is not None:
+                selected &= self._touches(start, end, *ranges)
+            total += int(selected.sum())
+            successful += int((selected & (self.is_revert[start:end] == 0)).sum())
+        return total, successful
+
+    def records(self) -> Iterator[CommitRecord]:
+        authors = [self.authors[index].decode() for index in range(len(self.authors))]
+        for author_index, author in enumerate(authors):
+            for commit in range(int(self.author_start[author_index]), int(self.author_start[author_index + 1])):
+                refs = self.refs[int(self.path_start[commit]) : int(self.path_start[commit + 1])]
+                yield CommitRecord(
+                    sha="",
+                    author=author,
+                    timestamp=int(self.commit_time[commit]),
+                    paths=tuple(self.paths[int(ref)].decode() for ref in refs),
+                    is_revert=bool(self.is_revert[commit]),
+                )
+
+    def _touches(self, start: int, end: int, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        if not len(lo):
+            return np.zeros(end - start, dtype=bool)
+        first, last = int(self.path_start[start]), int(self.path_start[end])
+        refs = self.refs[first:last].astype(np.int64)
+        slot = np.searchsorted(lo, refs, side="right") - 1
+        hits = (slot >= 0) & (refs < hi[np.maximum(slot, 0)])
+        cumulative = np.concatenate(([0], np.cumsum(hits)))
+        bounds = self.path_start[start : end + 1].astype(np.int64) - first
+        return cumulative[bounds[1:]] > cumulative[bounds[:-1]]
+
+
+def write_snapshot(path: Path | str, by_author: Dict[str, List[CommitRecord]], history_days: int) -> None:
+    """Serialize parsed commits to `path` atomically (temporary file plus rename)."""
+    path = Path(path)
+    authors = sorted(author for author, records in by_author.items() if records)
+    paths = sorted({p.encode() for records in by_author.values() for record in records for p in record.paths})
+    path_ids = {p: index for index, p in enumerate(paths)}
+    encoded_authors = [author.encode() for author in authors]
+
+    commit_time: List[int] = []
+    is_revert: List[int] = []
+    path_start = [0]
+    refs: List[int] = []
+    author_start = [0]
+    for author in authors:
+        for record in by_author[author]:
+            commit_time.append(record.timestamp)
+            is_revert.append(int(record.is_revert))
+            refs.extend(path_ids[p.encode()] for p in record.paths)
+            path_start.append(len(refs))
+        author_start.append(len(commit_time))
+
+    blob = b"".join(encoded_authors) + b"".join(paths)
+    author_str = np.cumsum([0] + [len(a) for a in encoded_authors])
+    path_str = np.cumsum([0] + [len(p) for p in paths]) + author_str[-1]
+    arrays = {
+        "commit_time": commit_time,
+        "path_start": path_start,
+        "author_str": author_str,
+        "path_str": path_str,
+        "author_start": author_start,
+        "refs": refs,
+        "is_revert": is_revert,
+    }
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        history_days,
+        int(time.time()),
+        len(commit_time),
+        len(authors),
+        len(paths),
+        len(refs),
+        len(blob),
+    )
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with temporary.open("wb") as handle:
+        handle.write(header)
+        offset = _HEADER.size
+        for name, dtype, _ in _SECTIONS:
+            data = np.asarray(arrays[name], dtype=dtype).tobytes()
+            handle.write(data)
+            offset += len(data)
+            handle.write(b"\0" * (_align(offset) - offset))
+            offset = _align(offset)
+        handle.write(blob)
+    os.replace(temporary, path)
+
+
+class SharedCommitIndex(CommitIndex):
+    """`CommitIndex` whose per-HEAD history lives in a memory-mapped snapshot file.
+
+    Snapshots for the newest `keep` HEADs are kept in `directory`; older files are
+    unlinked (processes still mapping them keep a valid view until they move on).
+    """
+
+    def __init__(
+        self,
+        repo_path: Path | str = Path("."),
+        history_days: int = 90,
+        directory: Path | str = Path(".prob_pipeline/history"),
+        keep: int = 4,
+    ):
+        super().__init__(repo_path, history_days)
+        self.directory = Path(directory)
+        self.keep = keep
+        self._mapped: Optional[HistorySnapshot] = None
+        self.builds = 0
+
+    @property
+    def head(self) -> Optional[str]:
+        return self._mapped.head if self._mapped is not None else None
+
+    @property
+    def snapshot(self) -> Optional[HistorySnapshot]:
+        return self._mapped
+
+    def counts(self, author_id: str, files) -> Tuple[int, int]:
+        self.refresh()
+        snapshot = self._mapped
+        if snapshot is None:
+            return 0, 0
+        authors = snapshot.author_ids(author_id)
+        if not authors:
+            return 0, 0
+        return snapshot.counts(authors, self._normalize_specs(files), history_cutoff(self.history_days))
+
+    def refresh(self) -> None:
+        head = self.resolve_head()
+        if head == self.head:
+            return
+        with self._lock:
+            if head == self.head:
+                return
+            self._mapped = self._open(head) if head is not None else None
+
+    def snapshot_path(self, head: str) -> Path:
+        return self.directory / f"{head}-{self.history_days}.hist"
+
+    def _open(self, head: str) -> HistorySnapshot:
+        path = self.snapshot_path(head)
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with _locked(self.directory / ".lock"):
+                if not path.exists():
+                    self._build(head, path)
+        return HistorySnapshot(path, head)
+
+    def _build(self, head: str, path: Path) -> None:
+        previous = self._mapped
+        if previous is not None and self._is_ancestor(previous.head, head):
+            by_author = self._parse(self._log(f"{previous.head}..{head}"))
+            cutoff = history_cutoff(self.history_days)
+            for record in previous.records():
+                # Carry forward only what a full `git log --since` would still return.
+                if record.timestamp >= cutoff:
+                    by_author.setdefault(record.author, []).append(record)
+        else:
+            by_author = self._parse(self._log(head))
+        write_snapshot(path, by_author, self.history_days)
+        self.builds += 1
+        stale = sorted(self.directory.glob(f"*-{self.history_days}.hist"), key=lambda p: p.stat().st_mtime_ns)
+        for old in stale[: -self.keep]:
+            if old != path:
+                old.unlink(missing_ok=True)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    with path.open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def shared_index_from_env(repo_path: Path | str, history_days: int) -> Optional[SharedCommitIndex]:
+    """`SharedCommitIndex` in the directory named by `PROB_PIPELINE_HISTORY_DIR`, if set and supported."""
+    directory = os.environ.get(HISTORY_DIR_ENV)
+    return SharedCommitIndex(repo_path, history_days, directory) if directory and fcntl is not None else None
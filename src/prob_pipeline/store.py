@@ -0,0 +1,266 @@
+"""Indexed SQLite store for routed outcomes, queried by the UI and feedback jobs."""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .models import AssessmentResponse
+from .persistence import outcome_entry
+
+LANES = ("low_risk", "medium_risk", "high_risk")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    commit_id TEXT,
+    lane TEXT NOT NULL,
+    confidence_score REAL NOT NULL,
+    is_security_compliant INTEGER NOT NULL,
+    triggers TEXT NOT NULL,
+    recommended_actions TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS risk_factors (
+    outcome_id INTEGER NOT NULL REFERENCES outcomes(id),
+    vector TEXT NOT NULL,
+    impact_percentage REAL NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_timestamp ON outcomes(timestamp);
+CREATE INDEX IF NOT EXISTS outcomes_lane_timestamp ON outcomes(lane, timestamp);
+CREATE INDEX IF NOT EXISTS outcomes_commit ON outcomes(commit_id);
+CREATE INDEX IF NOT EXISTS risk_factors_outcome ON risk_factors(outcome_id);
+CREATE INDEX IF NOT EXISTS risk_factors_vector_impact ON risk_factors(vector, impact_percentage);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class ImpactStats:
+    count: int
+    mean: float
+    minimum: float
+    maximum: float
+
+
+class OutcomeStore:
+    """SQLite-backed sibling of `OutcomeLogger` with indexed range and aggregate queries.
+
+    Timestamps are stored in the logger's ISO-8601 `...Z` form, so string comparison
+    orders them chronologically and range filters use the timestamp indexes.
+    `import_jsonl` remembers how far it has read each log, so processes that only
+    append to the JSONL log (router, worker) can be synced by re-importing it.
+    """
+
+    def __init__(self, path: Path | str = Path("demo/outcomes.db")):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def log(
+        self,
+        response: AssessmentResponse,
+        triggers: Iterable[str],
+        commit_id: Optional[str] = None,
+        files: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.insert_entries([outcome_entry(response, triggers, commit_id, files)])
+
+    def insert_entries(self, entries: Iterable[dict], imported: Optional[tuple] = None) -> int:
+        inserted = 0
+        with self._lock, self._conn:
+            if imported is not None:
+                self._conn.execute("INSERT OR REPLACE INTO imports (path, offset) VALUES (?, ?)", imported)
+            for entry in entries:
+                cursor = self._conn.execute(
+                    "INSERT INTO outcomes (timestamp, commit_id, lane, confidence_score, is_security_compliant,"
+                    " triggers, recommended_actions) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry["timestamp"],
+                        entry.get("commit_id"),
+                        entry["lane"],
+                        float(entry.get("confidence_score", 0.0)),
+                        int(bool(entry.get("is_security_compliant", True))),
+                        json.dumps(entry.get("triggers", [])),
+                        json.dumps(entry.get("recommended_actions", [])),
+                    ),
+                )
+                self._conn.executemany(
+                    "INSERT INTO risk_factors (outcome_id, vector, impact_percentage, description) VALUES (?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, factor["vector"], float(factor["impact_percentage"]), factor.get("description", ""))
+                        for factor in entry.get("risk_factors", [])
+                    ],
+                )
+                inserted += 1
+        return inserted
+
+    def import_jsonl(self, path: Path | str) -> int:
+        """Load `OutcomeLogger` JSONL entries appended since the last import of `path`.
+
+        Only complete lines are consumed; the byte offset reached is stored with the
+        entries, so repeated imports are incremental and never duplicate entries. A log
+        that shrank below the stored offset (rotated or truncated) is read from the start.
+        """
+        path = Path(path)
+        key = str(path.resolve())
+        rows = self._query("SELECT offset FROM imports WHERE path = ?", (key,))
+        offset = rows[0]["offset"] if rows else 0
+        with path.open("rb") as handle:
+            if handle.seek(0, 2) < offset:
+                offset = 0
+            handle.seek(offset)
+            data = handle.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        if not complete:
+            return 0
+        entries = [json.loads(line) for line in complete.splitlines() if line.strip()]
+        return self.insert_entries(entries, imported=(key, offset + len(complete)))
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) AS total FROM outcomes")[0]["total"]
+
+    def lane_counts(self, since: datetime | str | None = None, until: datetime | str | None = None) -> Dict[str, int]:
+        clauses, params = _time_range("timestamp", since, until)
+        rows = self._query(f"SELECT lane, COUNT(*) AS total FROM outcomes{_where(clauses)} GROUP BY lane", params)
+        counts = {lane: 0 for lane in LANES}
+        counts.update({row["lane"]: row["total"] for row in rows})
+        return counts
+
+    def impact_distribution(
+        self, since: datetime | str | None = None, until: datetime | str | None = None
+    ) -> Dict[str, ImpactStats]:
+        clauses, params = _time_range("o.timestamp", since, until)
+        rows = self._query(
+            "SELECT r.vector AS vector, COUNT(*) AS total, AVG(r.impact_percentage) AS mean,"
+            " MIN(r.impact_percentage) AS minimum, MAX(r.impact_percentage) AS maximum"
+            f" FROM risk_factors r JOIN outcomes o ON o.id = r.outcome_id{_where(clauses)} GROUP BY r.vector",
+            params,
+        )
+        return {
+            row["vector"]: ImpactStats(row["total"], row["mean"], row["minimum"], row["maximum"])
+            for row in rows
+        }
+
+    def impact_histogram(
+        self,
+        vector: str,
+        bucket_width: float = 10.0,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+    ) -> List[tuple]:
+        """`(bucket_start, count)` pairs of a vector's impact percentages; buckets are `[start, start + width)`."""
+        clauses, params = _time_range("o.timestamp", since, until)
+        # Floor, not truncation: -5 belongs to [-10, 0), not to [0, 10).
+        rows = self._query(
+            "SELECT CAST(r.impact_percentage / ? AS INTEGER)"
+            " - (r.impact_percentage / ? < CAST(r.impact_percentage / ? AS INTEGER)) AS bucket, COUNT(*) AS total"
+            " FROM risk_factors r JOIN outcomes o ON o.id = r.outcome_id"
+            f"{_where(['r.vector = ?', *clauses])} GROUP BY bucket ORDER BY bucket",
+            (bucket_width, bucket_width, bucket_width, vector, *params),
+        )
+        return [(row["bucket"] * bucket_width, row["total"]) for row in rows]
+
+    def history(
+        self,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        lane: Optional[str] = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+    ) -> List[dict]:
+        """Newest-first page of entries; pass the last entry's `id` as `before_id` for the next page."""
+        clauses, params = _time_range("timestamp", since, until)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if lane is not None:
+            clauses.append("lane = ?")
+            params.append(lane)
+        rows = self._query(f"SELECT * FROM outcomes{_where(clauses)} ORDER BY id DESC LIMIT ?", (*params, limit))
+        factors: Dict[int, List[dict]] = {}
+        if rows:
+            placeholders = ",".join("?" for _ in rows)
+            for factor in self._query(
+                f"SELECT * FROM risk_factors WHERE outcome_id IN ({placeholders}) ORDER BY rowid",
+                [row["id"] for row in rows],
+            ):
+                factors.setdefault(factor["outcome_id"], []).append(
+                    {
+                        "vector": factor["vector"],
+                        "impact_percentage": factor["impact_percentage"],
+                        "description": factor["description"],
+                    }
+                )
+        return [
+            {
+                "id": row["id"],
+                "timestamp": row["timestamp"],
+                "commit_id": row["commit_id"],
+                "lane": row["lane"],
+                "confidence_score": row["confidence_score"],
+                "is_security_compliant": bool(row["is_security_compliant"]),
+                "triggers": json.loads(row["triggers"]),
+                "risk_factors": factors.get(row["id"], []),
+                "recommended_actions": json.loads(row["recommended_actions"]),
+            }
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def _time_range(column: str, since: datetime | str | None, until: datetime | str | None) -> tuple:
+    clauses, params = [], []
+    if since is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(_timestamp(since))
+    if until is not None:
+        clauses.append(f"{column} < ?")
+        params.append(_timestamp(until))
+    return clauses, params
+
+
+def _where(clauses: List[str]) -> str:
+    return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def _timestamp(value: datetime | str) -> str:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    return value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import OutcomeLogger JSONL files into the SQLite outcome store.")
+    parser.add_argument("logs", nargs="+", type=Path, help="JSONL outcome logs to import")
+    parser.add_argument("--db", type=Path, default=Path("demo/outcomes.db"), help="SQLite database path")
+    args = parser.parse_args()
+    store = OutcomeStore(args.db)
+    for log in args.logs:
+        print(f"Imported {store.import_jsonl(log)} entries from {log}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""Long-lived worker that keeps the engine, enricher caches and outcome logger warm.
+
+The worker speaks NDJSON: each request line is `{"op": ..., "id": ...}` plus op
+fields, and each reply line echoes `id` with either `{"ok": true, "result": ...}` or
+`{"ok": false, "error": ...}`. Supported ops:
+
+- `assess` (`payload`): enrich and score one payload, returning the response dict.
+- `route` (`response`): pick lane triggers for a response and append it to the log.
+- `stats`: enricher cache counters.
+- `ping`: liveness check.
+
+Run it over stdin/stdout (`python -m prob_pipeline.worker`) or on a Unix socket
+(`python -m prob_pipeline.worker --socket /tmp/prob-pipeline.sock`).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import subprocess
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from .core import RiskInferenceEngine
+from .enricher import ContextEnricher
+from .models import AssessmentRequest
+from .persistence import BufferedOutcomeLogger, OutcomeLogger
+from .priors import priors_from_env
+from .router import LANE_TRIGGERS, format_lane, parse_response
+
+SOCKET_ENV = "PROB_PIPELINE_WORKER_SOCKET"
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class Worker:
+    def __init__(
+        self,
+        enricher: Optional[ContextEnricher] = None,
+        engine: Optional[RiskInferenceEngine] = None,
+        logger: Optional[OutcomeLogger] = None,
+    ):
+        self.enricher = enricher or ContextEnricher()
+        self.engine = engine or RiskInferenceEngine(priors=priors_from_env())
+        self.logger = logger or BufferedOutcomeLogger()
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        reply: Dict[str, Any] = {"id": message.get("id")}
+        try:
+            reply["result"] = self._dispatch(message)
+            reply["ok"] = True
+        except Exception as exc:
+            reply["ok"] = False
+            reply["error"] = f"{type(exc).__name__}: {exc}"
+        return reply
+
+    def handle_line(self, line: str) -> str:
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return json.dumps({"id": None, "ok": False, "error": f"Invalid request line: {exc}"})
+        if not isinstance(message, dict):
+            return json.dumps({"id": None, "ok": False, "error": "Request must be a JSON object"})
+        return json.dumps(self.handle(message))
+
+    def close(self) -> None:
+        close = getattr(self.logger, "close", None)
+        if close is not None:
+            close()
+
+    def _dispatch(self, message: Dict[str, Any]) -> Any:
+        op = message.get("op")
+        if op == "assess":
+            enriched = self.enricher.enrich_payload(message["payload"])
+            return asdict(self.engine.assess(AssessmentRequest.from_payload(enriched)))
+        if op == "route":
+            response = parse_response(message["response"])
+            triggers = LANE_TRIGGERS.get(response.assigned_lane, [])
+            self.logger.log(response, triggers, commit_id=message.get("commit_id"), files=message.get("files"))
+            return {"triggers": triggers, "report": format_lane(response, triggers)}
+        if op == "stats":
+            return {"enricher_cache": asdict(self.enricher.cache.stats())}
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"Unknown op {op!r}")
+
+
+def serve_stdio(worker: Worker, stdin: IO[str] = sys.stdin, stdout: IO[str] = sys.stdout) -> None:
+    for line in stdin:
+        if line.strip():
+            stdout.write(worker.handle_line(line) + "\n")
+            stdout.flush()
+
+
+def serve_socket(worker: Worker, path: Path | str) -> None:
+    path = Path(path)
+    _remove_stale_socket(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                if raw.strip():
+                    self.wfile.write((worker.handle_line(raw.decode("utf-8")) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+    with socketserver.ThreadingUnixStreamServer(str(path), Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Unlink a socket left behind by a dead worker; refuse to touch anything else."""
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        path.unlink(missing_ok=True)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"A worker is already listening on {path}")
+
+
+class WorkerClient:
+    """Synchronous NDJSON client for a worker subprocess or Unix socket."""
+
+    def __init__(self, reader: IO[str], writer: IO[str], process: Optional[subprocess.Popen] = None, sock=None):
+        self._reader = reader
+        self._writer = writer
+        self._process = process
+        self._socket = sock
+        self._next_id = 0
+
+    @classmethod
+    def spawn(cls, *args: str, env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> "WorkerClient":
+        process = subprocess.Popen(
+            [sys.executable, "-m", "prob_pipeline.worker", *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env,
+            cwd=cwd,
+        )
+        return cls(process.stdout, process.stdin, process=process)
+
+    @classmethod
+    def connect(cls, path: Path | str) -> "WorkerClient":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(path))
+        stream = sock.makefile("rw", encoding="utf-8", newline="\n")
+        return cls(stream, stream, sock=sock)
+
+    def request(self, op: str, **fields: Any) -> Any:
+        self._next_id += 1
+        self._writer.write(json.dumps({"op": op, "id": self._next_id, **fields}) + "\n")
+        self._writer.flush()
+        line = self._reader.readline()
+        if not line:
+            raise WorkerError("Worker closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise WorkerError(reply.get("error", "unknown worker error"))
+        return reply["result"]
+
+    def assess(self, payload: dict) -> dict:
+        return self.request("assess", payload=payload)
+
+    def route(self, response: dict, commit_id: Optional[str] = None, files: Optional[List[str]] = None) -> dict:
+        return self.request("route", response=response, commit_id=commit_id, files=files)
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._writer.close()
+            self._process.wait()
+        if self._socket is not None:
+            self._socket.close()
+
+    def __enter__(self) -> "WorkerClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve assessments and routing from one warm process.")
+    parser.add_argument("--socket", default=os.environ.get(SOCKET_ENV), help="Unix socket path (default: stdin/stdout)")
+    parser.add_argument("--log", type=Path, default=Path("demo/outcomes.jsonl"), help="Outcome log path")
+    parser.add_argument("--repo", type=Path, default=Path("."), help="Repository used for enrichment")
+    args = parser.parse_args()
+    worker = Worker(enricher=ContextEnricher(repo_path=args.repo), logger=BufferedOutcomeLogger(args.log))
+    try:
+        if args.socket:
+            serve_socket(worker, args.socket)
+        else:
+            serve_stdio(worker)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from prob_pipeline.adapters import SignalAdapter, SignalOutcome
+from prob_pipeline.batch import columns_from_requests
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest
+
+SAMPLE = Path(__file__).resolve().parent.parent / "demo" / "sample_payload_medium.json"
+
+
+def _request() -> AssessmentRequest:
+    return AssessmentRequest.from_payload(json.loads(SAMPLE.read_text()))
+
+
+def _sleeping(name: str, seconds: float, delta: float = 0.05, completeness: float = 1.0):
+    def compute(request):
+        time.sleep(seconds)
+        return SignalOutcome(name, delta, completeness, f"{name} looked up")
+
+    return compute
+
+
+def test_blocking_adapters_run_concurrently_in_registration_order():
+    engine = RiskInferenceEngine()
+    baseline = engine.assess(_request())
+    for name in ("cmdb", "incidents"):
+        engine.registry.register(SignalAdapter(name, _sleeping(name, 0.2), blocking=True, timeout=2.0))
+
+    started = time.perf_counter()
+    response = engine.assess(_request())
+
+    assert time.perf_counter() - started < 0.35
+    assert tuple(factor.vector for factor in response.risk_factors) == engine.registry.names()
+    assert response.confidence_score == pytest.approx(baseline.confidence_score + 10.0)
+
+
+def test_timed_out_or_incomplete_adapter_applies_pessimism_bias():
+    engine = RiskInferenceEngine(adapter_deadline=0.1)
+    engine.registry.register(SignalAdapter("telemetry", _sleeping("telemetry", 1.0), blocking=True))
+    engine.registry.register(SignalAdapter("cmdb", _sleeping("cmdb", 0.0, completeness=0.7), min_completeness=0.8))
+
+    started = time.perf_counter()
+    response = engine.assess(_request())
+
+    assert time.perf_counter() - started < 0.5
+    factors = {factor.vector: factor for factor in response.risk_factors}
+    for name in ("telemetry", "cmdb"):
+        assert factors[name].impact_percentage == 15.0
+        assert "missing or incomplete data" in factors[name].description
+    engine.registry.close()
+
+
+def test_batch_scoring_rejects_custom_adapters():
+    engine = RiskInferenceEngine()
+    engine.registry.register(SignalAdapter("cmdb", _sleeping("cmdb", 0.0)))
+    with pytest.raises(ValueError):
+        engine.assess_batch(columns_from_requests([_request()], engine))
+
+
+def test_inline_adapters_fail_soft_and_respect_the_deadline():
+    def broken(request):
+        raise RuntimeError("cmdb down")
+
+    engine = RiskInferenceEngine(adapter_deadline=0.1)
+    engine.registry.register(SignalAdapter("cmdb", broken))
+    engine.registry.register(SignalAdapter("slow", _sleeping("slow", 0.15)))
+    engine.registry.register(SignalAdapter("late", _sleeping("late", 0.0)))
+
+    factors = {factor.vector: factor for factor in engine.assess(_request()).risk_factors}
+
+    for name in ("cmdb", "slow", "late"):
+        assert factors[name].impact_percentage == 15.0
+        assert "missing or incomplete data" in factors[name].description
+    assert engine.registry.blocking is False
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from prob_pipeline import api
+from prob_pipeline.models import AssessmentRequest
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "demo"
+NDJSON = {"content-type": "application/x-ndjson"}
+
+
+def _envelopes():
+    return [json.loads(path.read_text()) for path in sorted(DEMO_DIR.glob("sample_payload_*.json"))]
+
+
+def _within(seconds, func):
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("value", func()), daemon=True)
+    worker.start()
+    worker.join(seconds)
+    assert not worker.is_alive(), f"request did not finish within {seconds}s"
+    return result["value"]
+
+
+def _lines(response):
+    return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+
+
+def test_assess_batch_streams_one_line_per_envelope():
+    client = TestClient(api.app)
+    envelopes = _envelopes()
+    single = [client.post("/assess", json=envelope).json() for envelope in envelopes]
+    body = "\n".join(json.dumps(envelope) for envelope in envelopes) + "\n"
+    response = _within(30, lambda: client.post("/assess_batch", content=body, headers=NDJSON))
+    assert response.status_code == 200
+    lines = _lines(response)
+    assert [line["commit_id"] for line in lines] == [envelope["request"]["commit_id"] for envelope in envelopes]
+    for line, expected in zip(lines, single):
+        assert {key: line[key] for key in expected} == expected
+
+
+def test_assess_batch_reports_bad_lines_without_aborting(monkeypatch):
+    client = TestClient(api.app)
+    monkeypatch.setattr(api, "BATCH_MAX_LINE_BYTES", 4096)
+    envelope = json.dumps(_envelopes()[0])
+    body = "\n".join([envelope, "{not json", '"x' * 5000, json.dumps({"request": {}}), envelope])
+    response = _within(30, lambda: client.post("/assess_batch", content=body, headers=NDJSON))
+    lines = _lines(response)
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert ["error" in line for line in lines] == [False, True, True, True, False]
+
+
+def test_assess_batch_enforces_size_limits(monkeypatch):
+    client = TestClient(api.app)
+    envelopes = _envelopes()
+    monkeypatch.setattr(api, "BATCH_MAX_SIZE", 1)
+    assert client.post("/assess_batch", json=envelopes).status_code == 413
+    monkeypatch.setattr(api, "BATCH_MAX_SIZE", 100)
+    monkeypatch.setattr(api, "BATCH_MAX_BYTES", 64)
+    assert client.post("/assess_batch", json=envelopes).status_code == 413
+
+
+def test_server_timing_header_is_opt_in():
+    client = TestClient(api.app)
+    envelope = _envelopes()[0]
+    assert "server-timing" not in client.post("/assess", json=envelope).headers
+    response = client.post("/assess", json=envelope, headers={"X-Server-Timing": "1"})
+    stages = dict(part.split(";dur=") for part in response.headers["server-timing"].split(", "))
+    assert set(api.ASSESS_STAGES) | {"respond", "total"} <= set(stages)
+    assert sum(float(stages[name]) for name in (*api.ASSESS_STAGES, "respond")) <= float(stages["total"]) + 0.01
+
+
+def test_metrics_endpoint_exposes_stage_histograms(monkeypatch):
+    monkeypatch.setattr(api.METRICS, "enabled", True)
+    api.METRICS.reset()
+    client = TestClient(api.app)
+    client.post("/assess", json=_envelopes()[0])
+    client.post("/assess", json={"request": {}})
+    text = client.get("/metrics").text
+    assert 'prob_pipeline_stage_duration_seconds_count{stage="enrich"} 1' in text
+    assert 'prob_pipeline_request_duration_seconds_count{request="/assess"} 2' in text
+    assert 'prob_pipeline_requests_total{route="/assess",status="422"} 1' in text
+    assert "prob_pipeline_enricher_cache_misses_total" in text
+    api.METRICS.reset()
+
+
+def test_assess_encodes_like_the_response_model():
+    client = TestClient(api.app)
+    for envelope in _envelopes():
+        for variant in (envelope, {**envelope, "security_scan_passed": False}):
+            scored = api.engine.assess(AssessmentRequest.from_payload(json.loads(json.dumps(variant))))
+            expected = api.AssessmentResponsePayload(**asdict(scored))
+            response = client.post("/assess", json=variant)
+            assert response.headers["content-type"] == "application/json"
+            assert response.content == json.dumps(
+                expected.model_dump(), separators=(",", ":"), ensure_ascii=False
+            ).encode()
+
+
+def test_assess_validation_matches_pydantic():
+    client = TestClient(api.app)
+    envelope = _envelopes()[0]
+    coerced = json.loads(json.dumps(envelope))
+    coerced["request"]["change_metadata"]["lines_added"] = str(envelope["request"]["change_metadata"]["lines_added"])
+    assert client.post("/assess", json=coerced).json() == client.post("/assess", json=envelope).json()
+
+    invalid = json.loads(json.dumps(envelope))
+    invalid["request"]["author"]["past_success_rate"] = 1.5
+    del invalid["request"]["environment_health"]
+    detail = client.post("/assess", json=invalid).json()["detail"]
+    assert {tuple(error["loc"]) for error in detail} == {
+        ("body", "request", "author", "past_success_rate"),
+        ("body", "request", "environment_health"),
+    }
+    bad_json = client.post("/assess", content=b"{", headers={"content-type": "application/json"})
+    assert bad_json.status_code == 422 and bad_json.json()["detail"][0]["type"] == "json_invalid"
+
+    body = client.get("/openapi.json").json()["paths"]["/assess"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"]["$ref"] == "#/components/schemas/AssessmentEnvelope"
+
+
+def test_unhashable_health_status_is_a_validation_error():
+    client = TestClient(api.app)
+    envelopes = []
+    for status in (["healthy"], {"status": "healthy"}):
+        envelope = _envelopes()[0]
+        envelope["request"]["environment_health"]["status"] = status
+        envelopes.append(envelope)
+        response = client.post("/assess", json=envelope)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "request", "environment_health", "status"]
+    lines = _lines(_within(30, lambda: client.post("/assess_batch", json=envelopes)))
+    assert [line["index"] for line in lines] == [0, 1]
+    assert all("error" in line for line in lines)
+
+
+def test_assess_batch_turns_unexpected_errors_into_error_lines(monkeypatch):
+    client = TestClient(api.app)
+    envelopes = _envelopes()[:2]
+    real = api._validate_envelope
+
+    def flaky(item):
+        if item == envelopes[1]:
+            raise RuntimeError("validator exploded")
+        return real(item)
+
+    monkeypatch.setattr(api, "_validate_envelope", flaky)
+    lines = _lines(_within(30, lambda: client.post("/assess_batch", json=envelopes)))
+    assert "error" not in lines[0]
+    assert lines[1] == {"index": 1, "error": "Invalid envelope: validator exploded"}
+
+
+def test_closing_the_batch_stream_cancels_outstanding_work(monkeypatch):
+    async def score(index, item):
+        return f"{index}\n"
+
+    monkeypatch.setattr(api, "BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(api, "_score_item", score)
+
+    async def run():
+        stream = api._stream_assessments(list(range(20)))
+        await stream.__anext__()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await stream.aclose()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task() and not task.done()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_blocking_adapters_do_not_stall_the_event_loop(monkeypatch):
+    from prob_pipeline.adapters import SignalAdapter, SignalOutcome
+
+    def lookup(request):
+        time.sleep(0.3)
+        return SignalOutcome("cmdb", 0.0, 1.0, "cmdb looked up")
+
+    engine = api.RiskInferenceEngine()
+    engine.registry.register(SignalAdapter("cmdb", lookup, blocking=True, timeout=2.0))
+    monkeypatch.setattr(api, "engine", engine)
+    monkeypatch.setattr(api, "result_cache", api.ResultCache(maxsize=0))
+    payloads = []
+    for index in range(3):
+        payload = api._validate_envelope(_envelopes()[0])
+        payload["request"]["commit_id"] = f"concurrent-{index}"
+        payloads.append(payload)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(api._assess_payload(payload) for payload in payloads))
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.75
+    engine.registry.close()
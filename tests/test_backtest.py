@@ -0,0 +1,47 @@
+import gzip
+import json
+from collections import Counter
+from pathlib import Path
+
+from prob_pipeline.backtest import BASELINE, Setting, backtest, grid, read_records
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest
+
+DEMO = Path(__file__).resolve().parent.parent / "demo"
+
+
+def _corpus(tmp_path: Path) -> Path:
+    records = []
+    for index, path in enumerate(sorted(DEMO.glob("sample_payload_*.json")) * 5):
+        payload = json.loads(path.read_text())
+        payload["request"]["change_metadata"]["lines_added"] += index * 40
+        outcome = ("rollback", "success", None)[index % 3]
+        records.append({"payload": payload, "outcome": outcome} if outcome else payload)
+    records.append({"payload": {"request": {}}, "outcome": "success"})
+    corpus = tmp_path / "history.jsonl.gz"
+    with gzip.open(corpus, "wt") as handle:
+        handle.writelines(json.dumps(record) + "\n" for record in records)
+    return corpus
+
+
+def test_baseline_matches_engine_and_grid_reports_shifts(tmp_path):
+    corpus = _corpus(tmp_path)
+    records = list(read_records([corpus]))
+    engine = RiskInferenceEngine()
+    expected = Counter(
+        engine.assess(AssessmentRequest.from_payload(record.get("payload", record))).assigned_lane
+        for record in records[:-1]
+    )
+    settings = grid(base_priors=(0.1, 0.3), high_thresholds=(0.7, 0.95))
+    report = backtest(read_records([corpus]), settings, chunk_size=4)
+    assert (report["rows"], report["skipped"]) == (10, 1)
+    assert {lane: count for lane, count in report["baseline"]["lanes"].items() if count} == dict(expected)
+    by_setting = {Setting(**entry["setting"]): entry for entry in report["settings"]}
+    assert by_setting[BASELINE]["lane_shift"] == {"low_risk": 0.0, "medium_risk": 0.0, "high_risk": 0.0}
+    relaxed = by_setting[Setting(high_threshold=0.95)]
+    assert relaxed["lane_shift"]["high_risk"] <= 0 <= relaxed["lane_shift"]["medium_risk"]
+    assert relaxed["transitions_from_baseline"]["low_risk"]["high_risk"] == 0
+    calibration = by_setting[Setting(base_prior=0.3)]["calibration"]
+    assert calibration["labelled"] == 7
+    assert sum(row["count"] for row in calibration["reliability"]) == 7
+    assert 0.0 <= calibration["brier"] <= 1.0
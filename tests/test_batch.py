@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from prob_pipeline.batch import columns_from_requests
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import (
+    AssessmentRequest,
+    Author,
+    ChangeMetadata,
+    EnvironmentHealth,
+    SecurityScan,
+)
+
+
+def _random_request(rng: random.Random, index: int) -> AssessmentRequest:
+    files = rng.choice([[], ["lib.py"], ["src/critical/auth.py", "lib.py"], ["hotspot/x.py"]])
+    return AssessmentRequest(
+        commit_id=f"c{index}",
+        author=Author(
+            id="dev",
+            domain_familiarity_score=round(rng.uniform(0, 1), rng.choice([2, 6])),
+            past_success_rate=round(rng.uniform(0, 1), rng.choice([2, 6])),
+        ),
+        change_metadata=ChangeMetadata(
+            lines_added=rng.randint(0, 900),
+            lines_removed=rng.randint(0, 400),
+            files_modified=files,
+            cyclomatic_complexity_delta=round(rng.uniform(-1, 4), 2),
+        ),
+        environment_health=EnvironmentHealth(
+            status=rng.choice(["healthy", "degraded", "critical", "unknown"]),
+            open_incidents=rng.randint(0, 8),
+        ),
+        security_scan=SecurityScan(passed=rng.random() > 0.2),
+    )
+
+
+def test_assess_batch_matches_scalar_path():
+    rng = random.Random(7)
+    engine = RiskInferenceEngine()
+    requests = [_random_request(rng, index) for index in range(2000)]
+    batch = engine.assess_batch(columns_from_requests(requests, engine))
+    for index, request in enumerate(requests):
+        expected = engine.assess(request)
+        assert batch.confidence_scores[index] == expected.confidence_score
+        assert batch.assigned_lanes[index] == expected.assigned_lane
+        assert batch.response(index) == expected
+
+
+def test_assess_batch_accepts_structured_array():
+    engine = RiskInferenceEngine()
+    batch = np.array(
+        [(7, 0.01, 0, 0, 0.9, 0.95, False, 1, True), (240, 2.0, 2, 4, 0.2, 0.3, True, 1, False)],
+        dtype=[
+            ("churn", "i8"),
+            ("complexity_delta", "f8"),
+            ("health_status", "i1"),
+            ("open_incidents", "i4"),
+            ("familiarity", "f8"),
+            ("success_rate", "f8"),
+            ("hotspot", "?"),
+            ("files_count", "i4"),
+            ("security_passed", "?"),
+        ],
+    )
+    result = engine.assess_batch(batch)
+    assert list(result.assigned_lanes) == ["low_risk", "high_risk"]
+    assert result.lane_counts() == {"low_risk": 1, "medium_risk": 0, "high_risk": 1}
+    assert result.risk_factors(1)[1].description.startswith("+43.0% risk (critical environment")
+
+
+def test_assess_batch_requires_files_count():
+    engine = RiskInferenceEngine()
+    columns = columns_from_requests([], engine)
+    del columns["files_count"]
+    with pytest.raises(ValueError, match="files_count"):
+        engine.assess_batch(columns)
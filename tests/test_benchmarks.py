@@ -0,0 +1,28 @@
+import importlib.util
+import json
+from pathlib import Path
+
+HOT_PATHS = Path(__file__).resolve().parent.parent / "benchmarks" / "hot_paths.py"
+
+
+def _load_hot_paths():
+    spec = importlib.util.spec_from_file_location("hot_paths", HOT_PATHS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_hot_paths_benchmark_runs_with_tiny_counts(tmp_path: Path):
+    hot_paths = _load_hot_paths()
+    args = ["--payloads", "4", "--commits", "20", "--authors", "3", "--repeat", "1", "--porcelain-sample", "2"]
+    first = tmp_path / "first.json"
+    hot_paths.main([*args, "--output", str(first)])
+    report = json.loads(first.read_text())
+    assert report["meta"]["params"]["payloads"] == 4
+    assert {"RiskInferenceEngine.assess", "POST /assess", "POST /assess[cached]"} <= set(report["results"])
+    assert all(result["calls"] > 0 for result in report["results"].values())
+
+    second = tmp_path / "second.json"
+    hot_paths.main([*args, "--skip-api", "--output", str(second), "--compare", str(first)])
+    comparison = json.loads(second.read_text())["comparison"]
+    assert "RiskInferenceEngine.assess" in comparison and "POST /assess" not in comparison
@@ -0,0 +1,24 @@
+from prob_pipeline.cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expired_entries():
+    clock = _Clock()
+    cache = TTLCache(maxsize=2, ttl=10.0, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    clock.now = 11.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (1, 2, 1, 1)
+    assert stats.size == 1
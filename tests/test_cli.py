@@ -0,0 +1,49 @@
+import io
+import json
+import shutil
+from pathlib import Path
+
+from prob_pipeline import cli
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest
+
+DEMO = Path(__file__).resolve().parent.parent / "demo"
+SAMPLES = [DEMO / "sample_payload_high.json", DEMO / "sample_payload_medium.json"]
+
+
+def _expected(path: Path) -> float:
+    request = AssessmentRequest.from_payload(json.loads(path.read_text()))
+    return RiskInferenceEngine().assess(request).confidence_score
+
+
+def _run(capsys, argv) -> tuple:
+    code = cli.main(argv)
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_batch_directory_streams_ordered_ndjson(tmp_path: Path, monkeypatch, capsys):
+    payloads = tmp_path / "payloads"
+    payloads.mkdir()
+    for index, sample in enumerate(SAMPLES * 3):
+        shutil.copy(sample, payloads / f"{index:02d}.json")
+    monkeypatch.chdir(tmp_path)
+    expected = [_expected(path) for path in sorted(payloads.glob("*.json"))]
+
+    for workers in ("1", "2"):
+        code, results = _run(capsys, [str(payloads), "--workers", workers, "--chunksize", "2"])
+        assert code == 0
+        assert [result["source"] for result in results] == [str(p) for p in sorted(payloads.glob("*.json"))]
+        assert [result["confidence_score"] for result in results] == expected
+
+
+def test_ndjson_stdin_reports_bad_lines(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    lines = [json.dumps(json.loads(SAMPLES[0].read_text())), "{not json", json.dumps({"commit_id": "x"})]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+
+    code, results = _run(capsys, ["--ndjson", "--workers", "1"])
+
+    assert code == 1
+    assert [result["source"] for result in results] == ["stdin:1", "stdin:2", "stdin:3"]
+    assert results[0]["confidence_score"] == _expected(SAMPLES[0])
+    assert "error" in results[1] and "error" in results[2]
@@ -0,0 +1,65 @@
+import random
+from dataclasses import asdict
+
+import pytest
+
+from prob_pipeline.adapters import SignalAdapter, SignalOutcome
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest, Author, ChangeMetadata, EnvironmentHealth, SecurityScan
+from prob_pipeline.priors import ModuleRule, PriorIndex
+
+PATHS = ["lib.py", "services/payment/api.py", "services/payment/migrations/001.py", "critical/db.py", "docs/a.md"]
+
+
+def _corpus(size: int, seed: int):
+    rng = random.Random(seed)
+    for index in range(size):
+        yield AssessmentRequest(
+            commit_id=str(index),
+            author=Author(
+                id="dev",
+                domain_familiarity_score=rng.choice([0.0, 1.0, rng.random()]),
+                past_success_rate=rng.choice([0.0, 1.0, rng.random()]),
+            ),
+            change_metadata=ChangeMetadata(
+                lines_added=rng.choice([0, rng.randrange(50), rng.randrange(5000)]),
+                lines_removed=rng.randrange(600),
+                files_modified=rng.sample(PATHS, rng.randrange(len(PATHS) + 1)),
+                cyclomatic_complexity_delta=rng.choice([0.0, rng.uniform(-3, 3), rng.uniform(0, 0.5)]),
+            ),
+            environment_health=EnvironmentHealth(
+                status=rng.choice(["healthy", "degraded", "critical", "unknown"]), open_incidents=rng.randrange(8)
+            ),
+            security_scan=SecurityScan(passed=rng.random() > 0.1),
+        )
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [
+        RiskInferenceEngine(),
+        RiskInferenceEngine(base_prior=0.3, pessimism_bias=0.05),
+        RiskInferenceEngine(
+            priors=PriorIndex(
+                [ModuleRule("services/payment", prior=0.25), ModuleRule("services/*/migrations/**", hotspot=True)]
+            )
+        ),
+    ],
+)
+def test_compiled_scorer_matches_assess_on_a_randomized_corpus(engine):
+    scorer = engine.compile()
+    for request in _corpus(5000, seed=2024):
+        full = engine.assess(request)
+        assert scorer.score(request) == (full.confidence_score, full.assigned_lane)
+        assert asdict(scorer.response(request)) == {**asdict(full), "risk_factors": []}
+
+
+def test_custom_adapters_keep_the_general_path():
+    engine = RiskInferenceEngine()
+    assert engine.compile() is engine.compile()
+    engine.registry.register(SignalAdapter("cmdb", lambda request: SignalOutcome("cmdb", 0.3, 1.0, "cmdb risk")))
+    with pytest.raises(ValueError):
+        engine.compile()
+    request = next(_corpus(1, seed=1))
+    full = engine.assess(request)
+    assert engine.assess(request, explanations="none").confidence_score == full.confidence_score
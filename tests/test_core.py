@@ -1,4 +1,5 @@
 import json
+from dataclasses import asdict
 from pathlib import Path
 
 from prob_pipeline.cli import main
@@ -40,3 +41,20 @@ def test_assessment_response_high_risk_when_security_missing():
     response = engine.assess(request)
     assert response.assigned_lane == "high_risk"
     assert not response.is_security_compliant
+
+
+def test_lazy_and_score_only_explanations_keep_the_decision():
+    root = Path(__file__).resolve().parent.parent / "demo"
+    names = ("sample_payload_medium.json", "sample_payload_high.json")
+    payloads = [json.loads((root / name).read_text()) for name in names]
+    payloads.append({key: value for key, value in payloads[0].items() if key != "environment_health"})
+    for payload in payloads:
+        request = AssessmentRequest.from_payload(payload)
+        full = RiskInferenceEngine().assess(request)
+        lazy = RiskInferenceEngine(explanations="lazy").assess(request)
+        assert lazy.to_json() == full.to_json()
+        assert asdict(lazy) == asdict(full)
+        assert lazy == full and full == lazy
+        score_only = RiskInferenceEngine().assess(request, explanations="none")
+        assert score_only.risk_factors == []
+        assert asdict(score_only) == {**asdict(full), "risk_factors": []}
@@ -1,8 +1,9 @@
+import asyncio
 import os
 import subprocess
 from pathlib import Path
 
-from prob_pipeline.enricher import ContextEnricher
+from prob_pipeline.enricher import AsyncContextEnricher, ContextEnricher
 
 
 def _run_git(commands, repo: Path):
@@ -40,3 +41,178 @@ def test_derive_author_scores_from_git(tmp_path: Path):
     familiarity, past_success = enricher.derive_author_scores("Demo Dev", ["module.py"])
     assert familiarity == 0.15
     assert past_success == 1.0
+
+
+def _commit(repo: Path, name: str, content: str, message: str) -> None:
+    (repo / name).parent.mkdir(parents=True, exist_ok=True)
+    (repo / name).write_text(content)
+    _run_git(["add", name], repo)
+    _run_git(["commit", "-m", message, "--author", "Demo Dev <demo@example.com>"], repo)
+
+
+def _init_repo(repo: Path) -> None:
+    repo.mkdir()
+    _run_git(["init"], repo)
+    _run_git(["config", "user.name", "Demo Dev"], repo)
+    _run_git(["config", "user.email", "demo@example.com"], repo)
+
+
+def test_commit_index_matches_git_log_and_updates_on_new_head(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "src/app/module.py", "a\n", "feat: first")
+    _commit(repo, "src/app/module.py", "b\n", "Revert feat: first")
+    _commit(repo, "docs/readme.md", "c\n", "docs")
+
+    indexed = ContextEnricher(repo_path=repo)
+    porcelain = ContextEnricher(repo_path=repo, index=False)
+    for files in (["src/app/module.py"], ["src"], ["docs/readme.md"], []):
+        assert indexed.derive_author_scores("Demo Dev", files) == porcelain.derive_author_scores("Demo Dev", files)
+    assert indexed.index.counts("Demo Dev", ["src/app/module.py"]) == (2, 1)
+
+    _commit(repo, "src/app/module.py", "d\n", "feat: second")
+    assert indexed.index.counts("Demo Dev", ["src/app/module.py"]) == (3, 2)
+    assert indexed.index.counts("Other Dev", []) == (0, 0)
+
+    (repo / "other.py").write_text("e\n")
+    _run_git(["add", "other.py"], repo)
+    _run_git(["commit", "-m", "feat: other", "--author", "Other Dev <other@example.com>"], repo)
+    assert indexed.index.counts("Other Dev", []) == (1, 1)
+
+
+def test_async_enricher_matches_sync_and_coalesces_lookups(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "module.py", "a\n", "feat: first")
+    _commit(repo, "module.py", "b\n", "rollback first")
+
+    sync = ContextEnricher(repo_path=repo, index=False)
+    enricher = AsyncContextEnricher(ContextEnricher(repo_path=repo, index=False))
+    calls = []
+    run_git = enricher._run_git
+
+    async def counting_run_git(args):
+        calls.append(args)
+        return await run_git(args)
+
+    enricher._run_git = counting_run_git
+
+    async def scenario():
+        return await asyncio.gather(
+            *(enricher.derive_author_scores("Demo Dev", ["module.py"]) for _ in range(10))
+        )
+
+    results = asyncio.run(scenario())
+    assert set(results) == {sync.derive_author_scores("Demo Dev", ["module.py"])}
+    assert len(calls) == 1
+
+    indexed = AsyncContextEnricher(ContextEnricher(repo_path=repo))
+    assert asyncio.run(indexed.derive_author_scores("Demo Dev", ["module.py"])) == results[0]
+
+
+def test_author_scores_are_cached_until_head_moves(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "module.py", "a\n", "feat: first")
+    enricher = ContextEnricher(repo_path=repo, index=False)
+    first = enricher.derive_author_scores("Demo Dev", ["module.py", "module.py"])
+    assert enricher.derive_author_scores("Demo Dev", ["module.py"]) == first
+    assert (enricher.cache.stats().hits, enricher.cache.stats().misses) == (1, 1)
+
+    _commit(repo, "module.py", "b\n", "feat: second")
+    assert enricher.derive_author_scores("Demo Dev", ["module.py"]) == (0.1, 1.0)
+    assert enricher.cache.stats().misses == 2
+
+
+def test_shared_index_matches_commit_index_and_is_built_once_per_head(tmp_path: Path):
+    from prob_pipeline.history import CommitIndex
+    from prob_pipeline.shared_history import SharedCommitIndex
+
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "src/app/module.py", "a\n", "feat: first")
+    _commit(repo, "src/app0.py", "a\n", "feat: sibling")
+    _commit(repo, "src/app/module.py", "b\n", "Revert feat: first")
+    _commit(repo, "docs/readme.md", "c\n", "docs")
+    snapshots = tmp_path / "snapshots"
+    first = SharedCommitIndex(repo, directory=snapshots)
+    second = SharedCommitIndex(repo, directory=snapshots)
+    reference = CommitIndex(repo)
+    specs = (["src/app/module.py"], ["src/app"], ["src"], ["src/*.py"], ["docs/readme.md"], ["missing"], [])
+    for files in specs:
+        assert first.counts("Demo Dev", files) == reference.counts("Demo Dev", files)
+    assert first.counts("Other Dev", []) == (0, 0)
+    assert second.counts("Demo Dev", ["src/app"]) == (2, 1)
+    assert (first.builds, second.builds) == (1, 0)
+
+    _commit(repo, "src/app/module.py", "d\n", "feat: second")
+    assert second.counts("Demo Dev", ["src/app/module.py"]) == reference.counts("Demo Dev", ["src/app/module.py"])
+    assert first.counts("Demo Dev", []) == reference.counts("Demo Dev", []) == (5, 4)
+    assert (first.builds, second.builds) == (1, 1)
+    assert len(list(snapshots.glob("*.hist"))) == 2
+
+
+def test_incremental_snapshot_drops_commits_outside_the_window(tmp_path: Path, monkeypatch):
+    import time
+
+    from prob_pipeline import shared_history
+
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "src/app/module.py", "a\n", "feat: first")
+    _commit(repo, "src/app/module.py", "b\n", "feat: second")
+    index = shared_history.SharedCommitIndex(repo, directory=tmp_path / "snapshots")
+    assert index.counts("Demo Dev", []) == (2, 2)
+
+    # Everything already in the snapshot has aged out by the time HEAD moves.
+    monkeypatch.setattr(shared_history, "history_cutoff", lambda days: int(time.time()) + 3600)
+    _commit(repo, "src/app/module.py", "c\n", "feat: third")
+    index.refresh()
+    assert [record.paths for record in index.snapshot.records()] == [("src/app/module.py",)]
+
+
+def test_shared_index_falls_back_without_fcntl(tmp_path: Path, monkeypatch):
+    from prob_pipeline import shared_history
+    from prob_pipeline.history import CommitIndex
+
+    monkeypatch.setenv(shared_history.HISTORY_DIR_ENV, str(tmp_path / "snapshots"))
+    assert isinstance(ContextEnricher(repo_path=tmp_path).index, shared_history.SharedCommitIndex)
+    monkeypatch.setattr(shared_history, "fcntl", None)
+    index = ContextEnricher(repo_path=tmp_path).index
+    assert type(index) is CommitIndex
+
+
+def test_path_index_and_porcelain_fallback_agree(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    for idx in range(6):
+        _commit(repo, f"src/other/file{idx}.py", f"{idx}\n", f"feat: other {idx}")
+    _commit(repo, "src/app/module.py", "a\n", "feat: app")
+    _commit(repo, "src/app/module.py", "b\n", "rollback app")
+    _commit(repo, "src/app/module.py", "c\n", "feat: app again")
+    porcelain = ContextEnricher(repo_path=repo, index=False)
+    indexed = ContextEnricher(repo_path=repo)
+    for files in (["src/app/module.py"], ["src/app", "src/app/module.py"], ["src"], ["src/app/*.py"]):
+        assert indexed.index.counts("Demo Dev", files) == porcelain._history_counts("Demo Dev", files)
+    snapshot = indexed.index._snapshot
+    assert len(snapshot.by_path["src/app"]) == 3 and len(snapshot.by_path["src"]) == 9
+
+    # Without readable refs the enricher falls back to porcelain `git log`.
+    fallback = ContextEnricher(repo_path=repo)
+    fallback.index.resolve_head = lambda: None
+    assert fallback._history_counts("Demo Dev", ["src/app"]) == (3, 2)
+
+
+def test_porcelain_counts_survive_diffs_beyond_arg_max(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    _commit(repo, "gen/pkg0/real.py", "a\n", "feat: generated")
+    _commit(repo, "src/app/module.py", "a\n", "feat: app")
+    _commit(repo, "src/app/module.py", "b\n", "Revert feat: app")
+    _commit(repo, "docs/readme.md", "a\n", "docs")
+    # ~3 MB of pathspecs: passed verbatim this fails to exec and would count nothing.
+    files = [f"gen/pkg{index % 10}/generated_module_{index:06d}_pb2.py" for index in range(60_000)]
+    files += ["gen/pkg0/real.py", "src/app/module.py"]
+    porcelain = ContextEnricher(repo_path=repo, index=False)
+    indexed = ContextEnricher(repo_path=repo)
+    assert porcelain._history_counts("Demo Dev", files) == indexed.index.counts("Demo Dev", files) == (3, 2)
@@ -0,0 +1,136 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.learner import LearnedPriors, OutcomeTailer, PosteriorSnapshot, PriorLearner, module_of
+from prob_pipeline.models import AssessmentRequest, AssessmentResponse
+from prob_pipeline.persistence import OutcomeLogger
+from prob_pipeline.priors import ModuleRule, PriorIndex
+
+SAMPLE = Path(__file__).resolve().parent.parent / "demo" / "sample_payload_medium.json"
+
+
+def _request(files):
+    payload = json.loads(SAMPLE.read_text())
+    payload["request"]["change_metadata"]["files_modified"] = files
+    return AssessmentRequest.from_payload(payload)
+
+
+def _append(path: Path, *events):
+    with path.open("a") as handle:
+        handle.writelines(json.dumps(event) + "\n" for event in events)
+
+
+def test_labels_update_module_posteriors():
+    learner = PriorLearner(base_prior=0.1, strength=10)
+    assert module_of("services/payment/api/charge.py") == "services/payment"
+    assert module_of("setup.py") == "."
+    learner.observe({"commit_id": "abc", "files": ["services/payment/a.py", "services/payment/b.py", "lib/x.py"]})
+    assert learner.observe({"commit_id": "abc", "outcome": "rollback"}) == 2
+    assert learner.observe({"modules": ["lib"], "outcome": "success"}) == 1
+    assert learner.observe({"commit_id": "unknown", "outcome": "incident"}) == 0
+    assert learner.posteriors["services/payment"] == [2.0, 9.0]
+    assert learner.posteriors["lib"] == [2.0, 10.0]
+    assert learner.mean("services/payment") == pytest.approx(2 / 11)
+    assert learner.mean("never/seen") == pytest.approx(0.1)
+
+
+def test_tailer_follows_appends_partial_lines_and_rotation(tmp_path):
+    log = tmp_path / "outcomes.jsonl"
+    tailer = OutcomeTailer([log])
+    assert list(tailer.poll()) == []
+    _append(log, {"n": 1})
+    with log.open("a") as handle:
+        handle.write('{"n": ')
+    assert [event["n"] for event in tailer.poll()] == [1]
+    with log.open("a") as handle:
+        handle.write("2}\nnot json\n")
+    assert [event["n"] for event in tailer.poll()] == [2]
+    _append(log, {"n": 3})
+    log.rename(tmp_path / "outcomes.jsonl.1")
+    _append(log, {"n": 4})
+    assert [event["n"] for event in tailer.poll()] == [3, 4]
+    tailer.close()
+
+
+def test_snapshot_is_read_by_an_independent_process(tmp_path):
+    snapshot = tmp_path / "priors.snapshot"
+    learner = PriorLearner(base_prior=0.1, strength=10)
+    for _ in range(6):
+        learner.update("services/payment", failed=True)
+    learner.write_snapshot(snapshot)
+    script = (
+        "import sys; from prob_pipeline.learner import PosteriorSnapshot;"
+        "s = PosteriorSnapshot(sys.argv[1]);"
+        "print(s.posterior('services/payment'), s.observations('services/payment'), s.posterior('lib'))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script, str(snapshot)], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split() == ["(7.0,", "9.0)", "6", "None"]
+
+
+def test_learned_priors_drive_engine_and_pick_up_new_snapshots(tmp_path):
+    snapshot_path = tmp_path / "priors.snapshot"
+    log = tmp_path / "outcomes.jsonl"
+    response = AssessmentResponse(
+        confidence_score=10.0,
+        assigned_lane="LOW_RISK",
+        risk_factors=[],
+        recommended_actions=[],
+        is_security_compliant=True,
+    )
+    OutcomeLogger(log).log(response, [], commit_id="c1", files=["services/payment/api.py"])
+    base = PriorIndex([ModuleRule("lib", prior=0.2)])
+    priors = LearnedPriors(PosteriorSnapshot(snapshot_path, check_interval=0.0), base=base, min_observations=3)
+    engine = RiskInferenceEngine(priors=priors)
+    payment = _request(["services/payment/api.py"])
+    assert priors.prior_for(["services/payment/api.py"]) is None
+    assert priors.prior_for(["lib/util.py"]) == 0.2
+
+    learner = PriorLearner(base_prior=0.1, strength=10)
+    tailer = OutcomeTailer([log])
+    _append(log, *({"commit_id": "c1", "outcome": "incident"} for _ in range(2)))
+    for event in tailer.poll():
+        learner.observe(event)
+    learner.write_snapshot(snapshot_path)
+    # Below `min_observations`, the engine still uses the base prior.
+    assert engine._prior_for(payment) == engine.base_prior
+
+    _append(log, {"commit_id": "c1", "outcome": "rollback"})
+    for event in tailer.poll():
+        learner.observe(event)
+    learner.write_snapshot(snapshot_path)
+    assert engine._prior_for(payment) == pytest.approx(4 / 13)
+    assert engine.assess(payment).confidence_score > RiskInferenceEngine().assess(payment).confidence_score
+
+
+def test_corrupt_snapshots_fall_back_instead_of_failing_assessments(tmp_path, capsys):
+    snapshot_path = tmp_path / "priors.snapshot"
+    learner = PriorLearner(base_prior=0.1, strength=10)
+    for _ in range(6):
+        learner.update("services/payment", failed=True)
+    learner.update("services/search", failed=False)
+    learner.write_snapshot(snapshot_path)
+    base = PriorIndex([ModuleRule("services", prior=0.2)])
+    priors = LearnedPriors(PosteriorSnapshot(snapshot_path, check_interval=0.0), base=base, min_observations=3)
+    payment = ["services/payment/api.py"]
+    learned = priors.prior_for(payment)
+    assert learned == pytest.approx(7 / 16)
+
+    good = snapshot_path.read_bytes()
+    truncated = tmp_path / "truncated"
+    truncated.write_bytes(good[:-10])
+    truncated.replace(snapshot_path)
+    assert priors.prior_for(payment) == learned
+    assert "failed to load" in capsys.readouterr().err
+
+    fresh = LearnedPriors(PosteriorSnapshot(snapshot_path, check_interval=0.0), base=base, min_observations=3)
+    engine = RiskInferenceEngine(priors=fresh)
+    assert fresh.prior_for(payment) == 0.2
+    assert engine.assess(_request(payment)).confidence_score > 0
+    assert fresh.snapshot.last_error.startswith("ValueError")
@@ -0,0 +1,35 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from demo import mock_data  # noqa: E402
+
+COUNT = 2 * mock_data.BLOCK_SIZE + 300
+
+
+def _ndjson(**options) -> bytes:
+    output = io.BytesIO()
+    mock_data.write_ndjson(output, COUNT, seed=7, **options)
+    return output.getvalue()
+
+
+def test_corpus_is_identical_for_any_worker_count_and_sharding():
+    single = _ndjson()
+    assert single.count(b"\n") == COUNT
+    assert _ndjson(workers=3) == single
+    shards = [_ndjson(shard=(index, 3), workers=2) for index in range(3)]
+    assert all(shards) and b"".join(shards) == single
+    compressed = b"".join(_ndjson(shard=(index, 2), compress=True) for index in range(2))
+    assert gzip.decompress(compressed) == single
+
+
+def test_cli_streams_the_same_bytes_as_write_ndjson(tmp_path: Path):
+    paths = [tmp_path / f"shard-{index}.ndjson" for index in range(2)]
+    for index, path in enumerate(paths):
+        mock_data.main(["--ndjson", str(path), "--count", str(COUNT), "--seed", "7", "--shard", f"{index}/2"])
+    assert b"".join(path.read_bytes() for path in paths) == _ndjson()
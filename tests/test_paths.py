@@ -0,0 +1,32 @@
+from prob_pipeline.models import AssessmentRequest
+from prob_pipeline.paths import collapse_paths, intern_paths, pathspec_chunks
+
+
+def test_intern_paths_normalizes_and_deduplicates():
+    files = ["./src/app.py", "src/app.py", "", "src//lib/", "/docs/../README.md", ".", "src/app.py"]
+    assert intern_paths(files) == ["src/app.py", "src/lib", "README.md"]
+    payload = {
+        "commit_id": "c",
+        "author": {"id": "dev"},
+        "change_metadata": {"files_modified": ["a.py", "./a.py", "b.py"]},
+        "environment_health": {"status": "healthy"},
+    }
+    first = AssessmentRequest.from_payload(payload).change_metadata.files_modified
+    second = AssessmentRequest.from_payload(payload).change_metadata.files_modified
+    assert first == ["a.py", "b.py"] and first[1] is second[1]
+
+
+def test_collapse_paths_covers_every_file_within_the_budget():
+    files = [f"gen/pkg{index % 40}/file{index}.py" for index in range(5000)] + ["src/app.py", "src", "a-b", "a/x"]
+    assert collapse_paths(["a", "a-b", "a/x", "a/y/z"]) == ["a", "a-b"]
+    specs = collapse_paths(files, max_specs=64)
+    assert len(specs) <= 64 and "src" in specs and "src/app.py" not in specs
+    assert all(any(path == spec or path.startswith(spec + "/") for spec in specs) for path in files)
+    assert collapse_paths(files, max_specs=10_000) == sorted(set(files) - {"src/app.py"})
+
+
+def test_pathspec_chunks_stay_within_budget():
+    specs = [f"dir{index}/" + "x" * (index % 50) for index in range(3000)]
+    chunks = list(pathspec_chunks(specs, budget=1000))
+    assert [spec for chunk in chunks for spec in chunk] == specs
+    assert all(sum(len(spec) + 1 for spec in chunk) <= 1000 for chunk in chunks)
@@ -1,6 +1,8 @@
+import json
+import threading
 from pathlib import Path
 from prob_pipeline.models import AssessmentResponse, RiskFactor
-from prob_pipeline.persistence import OutcomeLogger
+from prob_pipeline.persistence import BufferedOutcomeLogger, OutcomeLogger
 
 
 def test_logger_writes_jsonl(tmp_path: Path):
@@ -17,3 +19,46 @@ def test_logger_writes_jsonl(tmp_path: Path):
     assert contents
     assert "medium_risk" in contents
     assert "risk_factors" in contents
+
+
+def _response(score: float) -> AssessmentResponse:
+    return AssessmentResponse(
+        confidence_score=score,
+        assigned_lane="low_risk",
+        risk_factors=[RiskFactor(vector="code_churn", impact_percentage=1.0, description="foo")],
+        recommended_actions=["action"],
+        is_security_compliant=True,
+    )
+
+
+def test_buffered_logger_rotates_and_preserves_order(tmp_path: Path):
+    path = tmp_path / "log.jsonl"
+    logger = BufferedOutcomeLogger(path=path, flush_size=10, flush_interval=60.0, max_bytes=2048)
+    for index in range(50):
+        logger.log(_response(float(index)), ["trigger"])
+    assert logger.flush(timeout=5)
+    logger.log(_response(50.0), ["trigger"])
+    logger.close()
+
+    segments = logger.segment_paths()
+    assert len(segments) > 1
+    scores = [
+        json.loads(line)["confidence_score"]
+        for segment in segments
+        for line in segment.read_text().splitlines()
+    ]
+    assert scores == [float(index) for index in range(51)]
+
+
+def test_buffered_logger_reports_and_bounds_failed_writes(tmp_path: Path, caplog):
+    path = tmp_path / "log.jsonl"
+    path.mkdir()  # appending to a directory fails with an OSError on every attempt
+    logger = BufferedOutcomeLogger(path=path, flush_size=10, flush_interval=0.01, close_retries=2)
+    logger.log(_response(1.0), ["trigger"])
+    assert logger.flush(timeout=5) is False
+    with caplog.at_level("ERROR", logger="prob_pipeline.persistence"):
+        closer = threading.Thread(target=logger.close, daemon=True)
+        closer.start()
+        closer.join(5)
+    assert not closer.is_alive()
+    assert "Dropping 1 outcome entries" in caplog.text
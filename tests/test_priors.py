@@ -0,0 +1,83 @@
+import json
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from prob_pipeline.batch import columns_from_requests
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest
+from prob_pipeline.priors import ModuleRule, PriorIndex, ReloadingPriorIndex
+
+SAMPLE = Path(__file__).resolve().parent.parent / "demo" / "sample_payload_medium.json"
+
+
+def _request(files):
+    payload = json.loads(SAMPLE.read_text())
+    payload["request"]["change_metadata"]["files_modified"] = files
+    return AssessmentRequest.from_payload(payload)
+
+
+def test_most_specific_rule_wins_per_attribute():
+    index = PriorIndex(
+        [
+            ModuleRule("services", prior=0.1),
+            ModuleRule("services/*/migrations/**", prior=0.3, hotspot=True),
+            ModuleRule("services/payment", prior=0.25),
+            ModuleRule("services/payment/migrations/seed.sql", hotspot=False),
+            ModuleRule("services/billing/migrations", prior=0.35),
+        ]
+    )
+    assert index.resolve("services/user/api.py") == (0.1, False)
+    assert index.resolve("services/user/migrations/001.sql") == (0.3, True)
+    assert index.resolve("services/payment/api.py") == (0.25, False)
+    assert index.resolve("services/payment/migrations/001.sql") == (0.3, True)
+    assert index.resolve("services/payment/migrations/seed.sql") == (0.3, False)
+    # Same depth: the literal `billing` segment beats the `*` wildcard.
+    assert index.resolve("services/billing/migrations/001.sql") == (0.35, True)
+    assert index.resolve("src/critical/auth.py") == (None, True)
+    assert index.prior_for(["services/user/api.py", "services/payment/api.py"]) == 0.25
+    assert index.prior_for(["docs/readme.md"]) is None
+    with pytest.raises(ValueError):
+        PriorIndex([ModuleRule("**/migrations")])
+
+
+def test_default_index_matches_substring_hotspots():
+    engine = RiskInferenceEngine()
+    rng = random.Random(7)
+    words = ["src", "critical", "hotspot", "lib", "crit", "hot", "spotty", "x"]
+    for _ in range(500):
+        files = ["/".join(rng.choices(words, k=rng.randint(1, 4))) + ".py" for _ in range(rng.randint(0, 3))]
+        assert engine._has_hotspots(files) == any("critical" in f or "hotspot" in f for f in files)
+
+
+def test_engine_and_batch_use_module_priors():
+    engine = RiskInferenceEngine(priors=PriorIndex([ModuleRule("src/payment", prior=0.3)]))
+    plain = RiskInferenceEngine()
+    requests = [_request(["src/payment/module.py"]), _request(["src/user/module.py"])]
+    responses = [engine.assess(request) for request in requests]
+    assert responses[0].confidence_score == pytest.approx(min(100.0, plain.assess(requests[0]).confidence_score + 20))
+    assert responses[1].confidence_score == plain.assess(requests[1]).confidence_score
+
+    batch = engine.assess_batch(columns_from_requests(requests, engine))
+    assert list(batch.confidence_scores) == [response.confidence_score for response in responses]
+    columns = columns_from_requests(requests, plain)
+    with pytest.raises(ValueError):
+        engine.assess_batch(columns)
+
+
+def test_reloading_index_picks_up_edits_and_survives_bad_config(tmp_path: Path):
+    path = tmp_path / "priors.json"
+    path.write_text(json.dumps({"rules": [{"match": "src/payment", "prior": 0.2}]}))
+    priors = ReloadingPriorIndex(path, check_interval=0.0)
+    assert priors.prior_for(["src/payment/a.py"]) == 0.2
+
+    path.write_text(json.dumps({"rules": [{"match": "src/payment", "prior": 0.4}]}))
+    os.utime(path, ns=(0, 10**9))
+    assert priors.prior_for(["src/payment/a.py"]) == 0.4
+
+    path.write_text("{broken")
+    os.utime(path, ns=(0, 2 * 10**9))
+    assert priors.prior_for(["src/payment/a.py"]) == 0.4
+    assert priors.last_error is not None
@@ -0,0 +1,96 @@
+import json
+from dataclasses import asdict, replace
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from prob_pipeline import api, cli
+from prob_pipeline.adapters import SignalAdapter, SignalOutcome
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.models import AssessmentRequest
+from prob_pipeline.priors import ModuleRule, PriorIndex
+from prob_pipeline.result_cache import ResultCache, cache_key
+
+SAMPLE = Path(__file__).resolve().parent.parent / "demo" / "sample_payload_medium.json"
+
+
+def _request() -> AssessmentRequest:
+    return AssessmentRequest.from_payload(json.loads(SAMPLE.read_text()))
+
+
+def test_key_covers_request_engine_parameters_and_priors():
+    request = _request()
+    engine = RiskInferenceEngine()
+    key = cache_key(engine, request)
+    assert cache_key(RiskInferenceEngine(), _request()) == key
+    assert cache_key(engine, replace(request, commit_id="other")) != key
+    assert cache_key(RiskInferenceEngine(pessimism_bias=0.2), request) != key
+    priors = PriorIndex([ModuleRule("src", prior=0.3)])
+    assert cache_key(RiskInferenceEngine(priors=priors), request) != key
+    assert cache_key(RiskInferenceEngine(priors=PriorIndex([ModuleRule("src", prior=0.3)])), request) == cache_key(
+        RiskInferenceEngine(priors=priors), request
+    )
+    engine.registry.register(
+        SignalAdapter("code_churn", lambda r: SignalOutcome("code_churn", 0.0, 1.0, "flat")), replace_existing=True
+    )
+    assert cache_key(engine, request) != key
+
+
+def test_hits_are_shared_through_the_directory(tmp_path):
+    engine = RiskInferenceEngine()
+    request = _request()
+    first = ResultCache(directory=tmp_path)
+    response, cached = first.assess(engine, request)
+    assert not cached
+    assert first.assess(engine, request) == (response, True)
+    second = ResultCache(directory=tmp_path)
+    assert second.assess(engine, request) == (response, True)
+    assert second.stats().disk_hits == 1
+    assert ResultCache(directory=tmp_path, ttl=0).assess(engine, request) == (response, False)
+    assert ResultCache(maxsize=0).assess(engine, request) == (response, False)
+
+
+def test_assess_reports_cache_hits(monkeypatch):
+    monkeypatch.setattr(api, "result_cache", ResultCache())
+    client = TestClient(api.app)
+    payload = json.loads(SAMPLE.read_text())
+    first = client.post("/assess", json=payload)
+    second = client.post("/assess", json=payload)
+    assert (first.headers["x-assessment-cache"], second.headers["x-assessment-cache"]) == ("miss", "hit")
+    assert first.content == second.content
+    monkeypatch.setattr(api, "result_cache", ResultCache(maxsize=0))
+    assert "x-assessment-cache" not in client.post("/assess", json=payload).headers
+
+
+def test_cli_cache_dir_marks_cached_results(tmp_path, capsys):
+    argv = [str(SAMPLE), "--cache-dir", str(tmp_path / "cache")]
+    assert cli.main(argv) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert cli.main(argv) == 0
+    second = json.loads(capsys.readouterr().out)
+    assert (first.pop("cached"), second.pop("cached")) == (False, True)
+    assert first == second == asdict(RiskInferenceEngine().assess(_request()))
+
+
+def test_callers_get_independent_copies():
+    engine = RiskInferenceEngine(explanations="lazy")
+    request = _request()
+    cache = ResultCache()
+    response, _ = cache.assess(engine, request)
+    expected = asdict(response)
+    response.recommended_actions.append("leaked")
+    response.risk_factors[0].description = "leaked"
+    hit, cached = cache.assess(engine, request)
+    assert cached and asdict(hit) == expected
+    hit.risk_factors.clear()
+    assert asdict(cache.assess(engine, request)[0]) == expected
+
+
+def test_priors_without_a_version_bypass_the_cache():
+    priors = PriorIndex([ModuleRule("src", prior=0.3)])
+    del priors.version  # stands in for a custom priors object with no version
+    engine = RiskInferenceEngine(priors=priors)
+    cache = ResultCache()
+    assert cache.assess(engine, _request())[1] is False
+    assert cache.assess(engine, _request())[1] is False
+    assert len(cache.memory) == 0
@@ -0,0 +1,73 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from prob_pipeline.models import AssessmentResponse, RiskFactor
+from prob_pipeline.segments import OutcomeSegments, SegmentLogger, main
+from prob_pipeline.store import OutcomeStore
+
+DEMO_LOG = Path(__file__).resolve().parent.parent / "demo" / "outcomes.jsonl"
+
+
+def test_segments_round_trip_and_match_the_store(tmp_path: Path, capsys):
+    entries = [json.loads(line) for line in DEMO_LOG.read_text().splitlines() if line.strip()]
+    assert main(["encode", str(DEMO_LOG), "--output", str(tmp_path / "segments"), "--rows-per-segment", "3"]) == 0
+    assert len(list((tmp_path / "segments").iterdir())) == 3
+    capsys.readouterr()
+    assert main(["decode", str(tmp_path / "segments")]) == 0
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == entries
+
+    store = OutcomeStore(tmp_path / "outcomes.db")
+    store.import_jsonl(DEMO_LOG)
+    reader = OutcomeSegments(tmp_path / "segments")
+    assert reader.count() == store.count()
+    assert reader.lane_counts() == store.lane_counts()
+    middle = entries[4]["timestamp"]
+    assert reader.lane_counts(since=middle) == store.lane_counts(since=middle)
+    assert reader.lane_counts(until=middle) == store.lane_counts(until=middle)
+    expected = store.impact_distribution(since=middle)
+    for vector, stats in reader.impact_distribution(since=middle).items():
+        assert (stats.count, stats.minimum, stats.maximum) == (
+            expected[vector].count,
+            expected[vector].minimum,
+            expected[vector].maximum,
+        )
+        assert stats.mean == pytest.approx(expected[vector].mean)
+    reader.close()
+
+
+def test_segment_logger_writes_readable_segments(tmp_path: Path):
+    logger = SegmentLogger(tmp_path, flush_size=2)
+    response = AssessmentResponse(
+        confidence_score=42.0,
+        assigned_lane="medium_risk",
+        risk_factors=[RiskFactor(vector="code_churn", impact_percentage=10.0, description="foo")],
+        recommended_actions=["action"],
+        is_security_compliant=False,
+    )
+    for index in range(3):
+        logger.log(response, ["trigger"], commit_id=f"c{index}", files=["src/a.py"] if index else None)
+    logger.close()
+    reader = OutcomeSegments(tmp_path)
+    entries = list(reader.entries())
+    assert [entry["commit_id"] for entry in entries] == ["c0", "c1", "c2"]
+    assert "files" not in entries[0] and entries[1]["files"] == ["src/a.py"]
+    assert not entries[2]["is_security_compliant"] and entries[2]["risk_factors"][0]["description"] == "foo"
+    assert reader.lane_counts()["medium_risk"] == 3
+    reader.close()
+    (tmp_path / "bad.outseg").write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        OutcomeSegments(tmp_path / "bad.outseg")
+
+
+def test_encode_reads_stdin_without_closing_it(tmp_path: Path, monkeypatch):
+    stdin = io.StringIO(DEMO_LOG.read_text())
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert main(["encode", "-", "--output", str(tmp_path / "segments")]) == 0
+    assert not stdin.closed
+    reader = OutcomeSegments(tmp_path / "segments")
+    assert reader.count() == len(DEMO_LOG.read_text().splitlines())
+    reader.close()
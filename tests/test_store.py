@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from prob_pipeline.models import AssessmentResponse, RiskFactor
+from prob_pipeline.store import OutcomeStore
+
+DEMO_LOG = Path(__file__).resolve().parent.parent / "demo" / "outcomes.jsonl"
+
+
+def test_store_imports_jsonl_and_matches_full_scan(tmp_path: Path):
+    store = OutcomeStore(tmp_path / "outcomes.db")
+    entries = [json.loads(line) for line in DEMO_LOG.read_text().splitlines() if line.strip()]
+    assert store.import_jsonl(DEMO_LOG) == len(entries)
+
+    expected = {lane: sum(entry["lane"] == lane for entry in entries) for lane in ("low_risk", "medium_risk", "high_risk")}
+    assert store.lane_counts() == expected
+    assert store.lane_counts(since="9999-01-01T00:00:00Z") == {lane: 0 for lane in expected}
+
+    churn = [f["impact_percentage"] for e in entries for f in e["risk_factors"] if f["vector"] == "code_churn"]
+    stats = store.impact_distribution()["code_churn"]
+    assert (stats.count, stats.maximum) == (len(churn), max(churn))
+    assert sum(count for _, count in store.impact_histogram("code_churn")) == len(churn)
+
+
+def test_store_history_paginates_newest_first(tmp_path: Path):
+    store = OutcomeStore(tmp_path / "outcomes.db")
+    for index in range(5):
+        response = AssessmentResponse(
+            confidence_score=float(index),
+            assigned_lane="medium_risk",
+            risk_factors=[RiskFactor(vector="code_churn", impact_percentage=1.0, description="foo")],
+            recommended_actions=["action"],
+            is_security_compliant=True,
+        )
+        store.log(response, ["trigger"], commit_id=f"c{index}")
+    first = store.history(limit=3)
+    second = store.history(limit=3, before_id=first[-1]["id"])
+    assert [entry["commit_id"] for entry in first + second] == ["c4", "c3", "c2", "c1", "c0"]
+    assert first[0]["risk_factors"] == [{"vector": "code_churn", "impact_percentage": 1.0, "description": "foo"}]
+
+
+def test_store_import_is_incremental_and_idempotent(tmp_path: Path):
+    log = tmp_path / "outcomes.jsonl"
+    lines = [line for line in DEMO_LOG.read_text().splitlines() if line.strip()][:3]
+    log.write_text(lines[0] + "\n" + lines[1][:10])
+    store = OutcomeStore(tmp_path / "outcomes.db")
+    assert store.import_jsonl(log) == 1
+    assert store.import_jsonl(log) == 0
+    log.write_text(lines[0] + "\n" + lines[1] + "\n" + lines[2] + "\n")
+    assert store.import_jsonl(log) == 2
+    assert store.import_jsonl(log) == 0
+    assert store.count() == 3
+
+
+def test_store_histogram_floors_negative_impacts_and_filters_by_time(tmp_path: Path):
+    store = OutcomeStore(tmp_path / "outcomes.db")
+    factors = ((1, -5.0), (2, 5.0), (3, -10.0), (4, 15.0))
+    entries = [
+        {
+            "timestamp": f"2024-01-0{day}T00:00:00Z",
+            "lane": "low_risk",
+            "risk_factors": [{"vector": "author_persona", "impact_percentage": impact}],
+        }
+        for day, impact in factors
+    ]
+    store.insert_entries(entries)
+    assert store.impact_histogram("author_persona") == [(-10.0, 2), (0.0, 1), (10.0, 1)]
+    assert store.impact_histogram("author_persona", since="2024-01-02T00:00:00Z", until="2024-01-04T00:00:00Z") == [
+        (-10.0, 1),
+        (0.0, 1),
+    ]
+    assert [entry["timestamp"][:10] for entry in store.history(since="2024-01-03T00:00:00Z")] == [
+        "2024-01-04",
+        "2024-01-03",
+    ]
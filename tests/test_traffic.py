@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from demo import traffic  # noqa: E402
+
+
+def _args(**overrides) -> argparse.Namespace:
+    defaults = dict(
+        in_process=True,
+        url=traffic.API_URL,
+        model="closed",
+        concurrency=2,
+        rps=None,
+        duration=0.3,
+        warmup=0.0,
+        payloads=5,
+        seed=1,
+        timeout=3.0,
+    )
+    return argparse.Namespace(**{**defaults, **overrides})
+
+
+def test_in_process_client_matches_the_http_configuration():
+    for in_process in (True, False):
+        client = traffic._client(_args(in_process=in_process))
+        assert client.timeout == httpx.Timeout(3.0)
+
+
+def test_in_process_load_smoke():
+    report = asyncio.run(traffic._load(_args()))
+    assert report["requests"] > 0
+    assert report["errors"] == 0 and report["statuses"] == {"200": report["requests"]}
+    assert report["latency_ms"]["p50"] is not None
+
+    report = asyncio.run(traffic._load(_args(model="open", rps=20.0)))
+    assert 0 < report["requests"] <= 7 and report["errors"] == 0
+
+
+def test_run_load_enforces_the_timeout_on_asgi_transports():
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def run():
+        transport = httpx.ASGITransport(app=slow_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            return await traffic.run_load(client, [{}], concurrency=2, duration=0.1, warmup=0.0, timeout=0.02)
+
+    report = asyncio.run(run())
+    assert report["requests"] > 0
+    assert report["statuses"] == {"TimeoutError": report["requests"]} and report["errors"] == report["requests"]
@@ -0,0 +1,74 @@
+import io
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from prob_pipeline.core import RiskInferenceEngine
+from prob_pipeline.enricher import ContextEnricher
+from prob_pipeline.models import AssessmentRequest
+from prob_pipeline.persistence import OutcomeLogger
+from prob_pipeline.worker import Worker, WorkerClient, serve_socket, serve_stdio
+
+SAMPLE = Path(__file__).resolve().parent.parent / "demo" / "sample_payload_high.json"
+
+
+def _worker(tmp_path: Path) -> Worker:
+    return Worker(enricher=ContextEnricher(repo_path=tmp_path), logger=OutcomeLogger(tmp_path / "log.jsonl"))
+
+
+def test_worker_handles_many_requests_over_stdio(tmp_path: Path):
+    payload = json.loads(SAMPLE.read_text())
+    expected = RiskInferenceEngine().assess(AssessmentRequest.from_payload(json.loads(SAMPLE.read_text())))
+    requests = [{"op": "assess", "id": index, "payload": payload} for index in range(3)]
+    requests.append({"op": "route", "id": 3, "response": {"assigned_lane": "low_risk", "confidence_score": 5.0}})
+    requests.append({"op": "bogus", "id": 4})
+    stdout = io.StringIO()
+    serve_stdio(_worker(tmp_path), io.StringIO("\n".join(json.dumps(r) for r in requests) + "\n"), stdout)
+
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [reply["id"] for reply in replies] == [0, 1, 2, 3, 4]
+    assert all(reply["result"]["confidence_score"] == expected.confidence_score for reply in replies[:3])
+    assert replies[3]["result"]["triggers"][0] == "Trigger auto-canary workflow"
+    assert not replies[4]["ok"]
+    assert (tmp_path / "log.jsonl").read_text().count("\n") == 1
+
+
+def test_worker_serves_unix_socket(tmp_path: Path):
+    path = tmp_path / "worker.sock"
+    threading.Thread(target=serve_socket, args=(_worker(tmp_path), path), daemon=True).start()
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.05)
+    with WorkerClient.connect(path) as client:
+        assert client.request("ping") == "pong"
+        assert client.assess(json.loads(SAMPLE.read_text()))["assigned_lane"] == "high_risk"
+
+
+def test_serve_socket_only_replaces_stale_sockets(tmp_path: Path):
+    regular = tmp_path / "not-a-socket"
+    regular.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        serve_socket(_worker(tmp_path), regular)
+    assert regular.read_text() == "keep me"
+
+    stale = tmp_path / "stale.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(stale))
+    listener.close()
+    threading.Thread(target=serve_socket, args=(_worker(tmp_path), stale), daemon=True).start()
+    for _ in range(100):
+        try:
+            with WorkerClient.connect(stale) as client:
+                assert client.request("ping") == "pong"
+            break
+        except OSError:
+            time.sleep(0.05)
+    else:
+        raise AssertionError("worker did not take over the stale socket")
+    with pytest.raises(FileExistsError):
+        serve_socket(_worker(tmp_path), stale)